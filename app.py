@@ -19,6 +19,8 @@ Prerequisites:
 
 Installation:
 pip install flask opencv-python numpy psutil ultralytics opencv-python
+Optional CPU inference runtimes (HYDRACAT_INFERENCE_BACKEND=onnx|openvino):
+pip install onnx onnxruntime openvino
 
 Usage:
 python app.py
@@ -29,7 +31,7 @@ Access:
 """
 
 from flask import Flask, render_template, jsonify, Response, request
-from ultralytics import YOLO
+from inference_backend import InferenceBackend
 from datetime import datetime, timedelta
 import random
 import cv2
@@ -37,6 +39,7 @@ import threading
 import time
 import numpy as np
 import atexit
+import bisect
 import os
 import platform
 import subprocess
@@ -44,12 +47,1151 @@ import sys
 import json
 import csv
 from io import StringIO
+from collections import OrderedDict, deque
+from event_logging import AsyncEventWriter, EventStore
+from lidar_data import DEFAULT_POINT_BUDGET, PointCapture, PointCloudLOD, load_point_csv, parse_time_value
+from spatial_index import SpatialIndex
+from bathymetry import BathymetryRaster
+from detection_utils import (Detections, ZoneMap, extract_detections, load_zone_config,
+                             rect_to_polygon, save_zone_config)
 
 app = Flask(__name__)
 
 # Configuration
 app.config['SECRET_KEY'] = 'marine-surveillance-secret-key-2024'
 
+# Streaming JPEG settings (clients may request lower quality / smaller size)
+DEFAULT_JPEG_QUALITY = 85
+
+# Inference striding: run YOLO every N frames and track boxes in between
+# ("auto" adapts N to the measured inference latency)
+DETECTION_STRIDE = os.environ.get('HYDRACAT_DETECTION_STRIDE', '1')
+
+# Motion gate: skip YOLO (reuse last detections) while the scene is static
+MOTION_GATE_ENABLED = os.environ.get('HYDRACAT_MOTION_GATE', '1') != '0'
+
+# Startup camera probing: indices are probed concurrently, each with its own timeout (seconds)
+PROBE_INDICES = (0, 1, 2, 3, 4, 5)
+PROBE_TIMEOUT = float(os.environ.get('HYDRACAT_PROBE_TIMEOUT', '3'))
+
+# Background device health probe: refresh interval and minimum spacing of ?refresh=1 (seconds)
+HEALTH_CHECK_INTERVAL = float(os.environ.get('HYDRACAT_HEALTH_INTERVAL', '60'))
+HEALTH_MIN_REFRESH = float(os.environ.get('HYDRACAT_HEALTH_MIN_REFRESH', '10'))
+
+# Camera reconnection backoff: first retry delay and cap (seconds)
+RECONNECT_BASE_DELAY = float(os.environ.get('HYDRACAT_RECONNECT_BASE', '1'))
+RECONNECT_MAX_DELAY = float(os.environ.get('HYDRACAT_RECONNECT_MAX', '60'))
+
+# Recorded PC camera source for reproducible load tests: a video file or an image directory,
+# replayed at the file's fps ("native"), unpaced ("fast") or a fixed fps (e.g. "15")
+PC_SOURCE = os.environ.get('HYDRACAT_PC_SOURCE')
+REPLAY_MODE = os.environ.get('HYDRACAT_REPLAY_MODE', 'native')
+REPLAY_LOOP = os.environ.get('HYDRACAT_REPLAY_LOOP', '1') != '0'
+
+# Hot-path stage metrics (served at /metrics): rolling window for fps / percentiles (seconds)
+METRICS_ENABLED = os.environ.get('HYDRACAT_METRICS', '1') != '0'
+METRICS_WINDOW = float(os.environ.get('HYDRACAT_METRICS_WINDOW', '10'))
+
+# Dashboard server push (SSE): payload rebuild interval and idle keep-alive (seconds)
+DASHBOARD_PUSH_INTERVAL = float(os.environ.get('HYDRACAT_DASHBOARD_INTERVAL', '3'))
+DASHBOARD_KEEPALIVE = 15.0
+
+# Camera stats fields the dashboard displays (the full payload stays on /api/camera/<id>/stats)
+DASHBOARD_CAMERA_FIELDS = ('camera_name', 'status', 'connected', 'active_objects', 'accuracy', 'viewers')
+
+# Build metadata that changes on every rebuild (per section; list items too): not compared
+# for deltas, so it goes out along with a real change, or at least every max-age seconds
+DASHBOARD_VOLATILE_FIELDS = {
+    'stats': ('last_updated',),
+    'detections': ('timestamp',)
+}
+DASHBOARD_VOLATILE_MAX_AGE = float(os.environ.get('HYDRACAT_DASHBOARD_VOLATILE_MAX_AGE', '30'))
+
+# LiDAR point CSV served to the 3D viewer (ingested once, re-read when the file changes)
+LIDAR_POINTS_PATH = os.environ.get('HYDRACAT_LIDAR_POINTS') or os.path.join(app.static_folder, 'point.csv')
+
+# Converted captures (python lidar_data.py convert point.csv lidar_captures/<name>)
+LIDAR_CAPTURE_DIR = os.environ.get('HYDRACAT_LIDAR_CAPTURES', 'lidar_captures')
+
+# Replay streaming: capture seconds per chunk, point cap per chunk, and how far (wall seconds) chunks run ahead
+REPLAY_CHUNK_SECONDS = float(os.environ.get('HYDRACAT_REPLAY_CHUNK', '0.5'))
+REPLAY_CHUNK_POINTS = int(os.environ.get('HYDRACAT_REPLAY_CHUNK_POINTS', '20000'))
+REPLAY_LEAD = 1.0
+
+# Hidden-map layers indexed for spatial queries (x, y in metres), and the result cap per query
+MAP_FEATURE_LAYERS = ('bathymetry', 'structures', 'hazards', 'wildlife_zones', 'scan_grid')
+SPATIAL_QUERY_LIMIT = int(os.environ.get('HYDRACAT_SPATIAL_QUERY_LIMIT', '10000'))
+
+class CameraMetrics:
+    """
+    Per-camera hot-path latency and frame-rate metrics
+    - observe() is O(log buckets): one bisect, two additions and a ring-buffer append
+    - Cumulative latency histogram per stage (Prometheus histogram buckets)
+    - Rolling-window fps and p50/p95/p99, computed only when read
+    - HYDRACAT_METRICS=0 turns every observation into a no-op
+    """
+
+    STAGES = ('capture', 'inference', 'postprocess', 'draw', 'encode', 'stream_write', 'end_to_end')
+    BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, window=METRICS_WINDOW, enabled=METRICS_ENABLED, max_samples=2048):
+        self.window = window
+        self.enabled = enabled
+        self.started = time.time()
+        self.stages = {stage: {'buckets': [0] * (len(self.BUCKETS) + 1), 'count': 0, 'sum': 0.0,
+                               'recent': deque(maxlen=max_samples)} for stage in self.STAGES}
+        self.frames = 0
+        self.frame_times = deque(maxlen=max_samples)
+
+    def observe(self, stage, seconds):
+        """Record one stage duration (seconds)"""
+        if not self.enabled:
+            return
+        now = time.time()
+        entry = self.stages[stage]
+        entry['buckets'][bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        entry['count'] += 1
+        entry['sum'] += seconds
+        entry['recent'].append((now, seconds))
+
+    def frame(self):
+        """Record one frame published to viewers"""
+        if not self.enabled:
+            return
+        self.frames += 1
+        self.frame_times.append(time.time())
+
+    def rolling_fps(self, now=None):
+        """Frames per second over the rolling window (drops to 0 during a stall)"""
+        now = now or time.time()
+        cutoff = now - self.window
+        recent = sum(1 for t in list(self.frame_times) if t >= cutoff)
+        return recent / max(min(self.window, now - self.started), 1e-3)
+
+    def window_latencies(self, stage, now=None):
+        """Stage durations (seconds) observed within the rolling window"""
+        cutoff = (now or time.time()) - self.window
+        return np.array([seconds for t, seconds in list(self.stages[stage]['recent']) if t >= cutoff])
+
+    def summary(self):
+        """Rolling fps and per-stage p50/p95/p99 in milliseconds"""
+        now = time.time()
+        stages = {}
+        for stage, entry in self.stages.items():
+            if entry['count'] == 0:
+                continue
+            latencies = self.window_latencies(stage, now) * 1000
+            stage_summary = {'count': entry['count'], 'window_count': len(latencies),
+                             'avg_ms': round(entry['sum'] / entry['count'] * 1000, 2)}
+            if len(latencies):
+                p50, p95, p99 = np.percentile(latencies, (50, 95, 99))
+                stage_summary.update({'p50_ms': round(float(p50), 2), 'p95_ms': round(float(p95), 2),
+                                      'p99_ms': round(float(p99), 2), 'max_ms': round(float(latencies.max()), 2)})
+            stages[stage] = stage_summary
+        return {
+            'enabled': self.enabled,
+            'window_seconds': self.window,
+            'fps_rolling': round(self.rolling_fps(now), 2),
+            'frames': self.frames,
+            'stages': stages
+        }
+
+    def render_prometheus(self, camera):
+        """Prometheus text-format samples for this camera (HELP/TYPE lines are added by the caller)"""
+        now = time.time()
+        samples = {
+            'hydracat_camera_fps': [f'hydracat_camera_fps{{camera="{camera}"}} {self.rolling_fps(now):.3f}'],
+            'hydracat_camera_frames_total': [f'hydracat_camera_frames_total{{camera="{camera}"}} {self.frames}'],
+            'hydracat_stage_latency_seconds': [],
+            'hydracat_stage_latency_window_seconds': []
+        }
+        for stage, entry in self.stages.items():
+            if entry['count'] == 0:
+                continue
+            labels = f'camera="{camera}",stage="{stage}"'
+            histogram = samples['hydracat_stage_latency_seconds']
+            cumulative = 0
+            for bound, count in zip(self.BUCKETS, entry['buckets']):
+                cumulative += count
+                histogram.append(f'hydracat_stage_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            histogram.append(f'hydracat_stage_latency_seconds_bucket{{{labels},le="+Inf"}} {entry["count"]}')
+            histogram.append(f'hydracat_stage_latency_seconds_sum{{{labels}}} {entry["sum"]:.6f}')
+            histogram.append(f'hydracat_stage_latency_seconds_count{{{labels}}} {entry["count"]}')
+
+            latencies = self.window_latencies(stage, now)
+            window = samples['hydracat_stage_latency_window_seconds']
+            if len(latencies):
+                for quantile, value in zip(('0.5', '0.95', '0.99'), np.percentile(latencies, (50, 95, 99))):
+                    window.append(f'hydracat_stage_latency_window_seconds{{{labels},quantile="{quantile}"}} {value:.6f}')
+            window.append(f'hydracat_stage_latency_window_seconds_sum{{{labels}}} {latencies.sum():.6f}')
+            window.append(f'hydracat_stage_latency_window_seconds_count{{{labels}}} {len(latencies)}')
+        return samples
+
+class FrameBroadcaster:
+    """
+    Latest-frame broadcaster shared by every viewer of one camera
+    - Holds only the most recent frame and its sequence number
+    - Wakes all waiting stream subscribers when a new frame is published
+    - Counts subscribers so the producer can idle when nobody is watching
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.frame = None
+        self.sequence = 0
+        self.subscribers = 0
+
+    def publish(self, frame, sequence=None):
+        """Publish a new frame and wake every waiting subscriber"""
+        with self.condition:
+            self.frame = frame
+            self.sequence = sequence if sequence is not None else self.sequence + 1
+            self.condition.notify_all()
+
+    def wait_for_frame(self, last_sequence, timeout=1.0):
+        """Block until a frame newer than last_sequence exists (or timeout)"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence != last_sequence, timeout)
+            return self.sequence, self.frame
+
+    def subscribe(self):
+        with self.condition:
+            self.subscribers += 1
+            return self.subscribers
+
+    def unsubscribe(self):
+        with self.condition:
+            self.subscribers = max(0, self.subscribers - 1)
+            return self.subscribers
+
+class EncodedFrameCache:
+    """
+    Encode-once JPEG cache for one camera
+    - Keyed by frame sequence number and encode parameters (quality, size)
+    - Every stream client with the same parameters gets the same bytes object
+    - Read-only frames (cached placeholders) are encoded once per frame object,
+      however many sequence numbers they are published under
+    - Hit/miss counters show how much encoding is saved across viewers
+    - Actual encodes (misses) are timed into the camera's metrics
+    """
+
+    def __init__(self, max_entries=8, metrics=None):
+        self.entries = OrderedDict()
+        self.metrics = metrics
+        self.static_entries = {}  # (quality, size) -> (read-only frame, bytes)
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sequence, frame, quality=DEFAULT_JPEG_QUALITY, size=None):
+        """Return JPEG bytes for a frame, encoding it only on first request"""
+        key = (sequence, quality, size)
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.hits += 1
+                return data
+
+            # A read-only frame cannot have changed since it was last encoded
+            static = not frame.flags.writeable
+            if static:
+                cached = self.static_entries.get((quality, size))
+                if cached is not None and cached[0] is frame:
+                    self.hits += 1
+                    return cached[1]
+
+            # Encode under the lock: concurrent viewers wait for one encode
+            # instead of all encoding the same frame
+            self.misses += 1
+            started = time.perf_counter()
+            source = frame  # the published object, which the static entry is matched on
+            if size is not None and (frame.shape[1], frame.shape[0]) != size:
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                return None
+            data = buffer.tobytes()
+            if self.metrics is not None:
+                self.metrics.observe('encode', time.perf_counter() - started)
+            if static:
+                self.static_entries[(quality, size)] = (source, data)
+
+            self.entries[key] = data
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            return data
+
+    def get_stats(self):
+        """Hit/miss counters for diagnostics"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total * 100, 2) if total else 0.0,
+            'cached_frames': len(self.entries)
+        }
+
+class FileFrameSource:
+    """
+    Recorded video or image directory standing in for a camera
+    - Same read()/isOpened()/get()/set()/release() surface as cv2.VideoCapture,
+      so frames go through the regular capture, YOLO and red-zone pipeline
+    - Replay at the file's fps ('native'), unpaced ('fast') or a fixed fps
+    - Optional looping; without it the last frame is held once the recording ends
+      (a terminal state, not a lost camera: nothing to reconnect)
+    - Unreadable images / frames are skipped and counted instead of ending the replay
+    """
+
+    IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+    MAX_SKIPPED_FRAMES = 30  # consecutive undecodable video frames before the file counts as ended
+
+    def __init__(self, path, mode=REPLAY_MODE, loop=REPLAY_LOOP, default_fps=30.0):
+        self.path = path
+        self.mode = mode
+        self.loop = loop
+        self.capture = None
+        self.images = None
+        self.frame_shape = None
+        if os.path.isdir(path):
+            self.images = sorted(os.path.join(path, name) for name in os.listdir(path)
+                                 if name.lower().endswith(self.IMAGE_EXTENSIONS))
+            native_fps = default_fps
+        else:
+            self.capture = cv2.VideoCapture(path)
+            native_fps = self.capture.get(cv2.CAP_PROP_FPS) or default_fps
+
+        if mode == 'fast':
+            self.fps = None
+        elif mode == 'native':
+            self.fps = native_fps
+        else:
+            self.fps = float(mode)  # raises ValueError for unknown modes
+        self.native_fps = native_fps
+        self.index = 0
+        self.next_due = None
+        self.frames_read = 0
+        self.skipped = 0
+        self.loops = 0
+        self.ended = False
+        self.last_frame = None  # clean copy of the latest frame, held once a non-looping replay ends
+
+    def isOpened(self):
+        return bool(self.images) if self.images is not None else self.capture.isOpened()
+
+    def _read_next(self):
+        if self.images is None:
+            for _ in range(self.MAX_SKIPPED_FRAMES):
+                ret, frame = self.capture.read()
+                if ret and frame is not None:
+                    return True, frame
+                # A corrupt frame before the end of the file is skipped, not taken as the end
+                total = self.capture.get(cv2.CAP_PROP_FRAME_COUNT)
+                if not total or self.capture.get(cv2.CAP_PROP_POS_FRAMES) >= total - 1:
+                    break
+                self.skipped += 1
+            return False, None
+        while self.index < len(self.images):
+            path = self.images[self.index]
+            self.index += 1
+            frame = cv2.imread(path)
+            if frame is not None:
+                return True, frame
+            self.skipped += 1
+            print(f"⚠️  Skipping unreadable image {path}")
+        return False, None
+
+    def rewind(self):
+        if self.images is None:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        else:
+            self.index = 0
+
+    def _pace(self):
+        """Block like a real camera until the next frame is due"""
+        if not self.fps:
+            return
+        now = time.perf_counter()
+        if self.next_due is None or now - self.next_due > 1.0:
+            self.next_due = now  # first frame, or resync after a stall
+        elif self.next_due > now:
+            time.sleep(self.next_due - now)
+        self.next_due += 1.0 / self.fps
+
+    def read(self):
+        if not self.ended:
+            ret, frame = self._read_next()
+            if not ret and self.loop:
+                self.rewind()
+                self.loops += 1
+                ret, frame = self._read_next()
+            if ret:
+                self._pace()
+                self.frames_read += 1
+                self.frame_shape = frame.shape
+                if not self.loop:
+                    self.last_frame = frame.copy()  # the pipeline draws on the frame it gets
+                return True, frame
+            if self.last_frame is None:
+                return False, None  # nothing readable at all
+            self.ended = True
+            print(f"🏁 Recording {self.path} finished - holding the last frame")
+
+        # End of a non-looping replay: keep serving the last frame at the replay rate
+        # (the file's own rate in 'fast' mode, so the capture loop does not spin)
+        if self.fps:
+            self._pace()
+        else:
+            time.sleep(1.0 / self.native_fps)
+        return True, self.last_frame.copy()
+
+    def get(self, prop):
+        if self.capture is not None:
+            return self.capture.get(prop)
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps or 0
+        if self.frame_shape is not None and prop in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT):
+            return self.frame_shape[1] if prop == cv2.CAP_PROP_FRAME_WIDTH else self.frame_shape[0]
+        return 0
+
+    def set(self, prop, value):
+        return False  # recorded sources ignore camera settings
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+
+    def get_stats(self):
+        """Replay configuration and progress"""
+        return {
+            'path': self.path,
+            'kind': 'images' if self.images is not None else 'video',
+            'mode': self.mode,
+            'fps': round(self.fps, 2) if self.fps else None,
+            'loop': self.loop,
+            'frames_read': self.frames_read,
+            'skipped': self.skipped,
+            'loops': self.loops,
+            'ended': self.ended
+        }
+
+class StaticFrameLayer:
+    """
+    Pre-rendered static layer of a simulated source
+    - Each frame starts as a copy of the layer, so only the moving content is drawn
+    - Every frame is a fresh array: published frames are encoded lazily by viewers
+      (any quality / size, at any time), so a published buffer is never rewritten
+    """
+
+    def __init__(self, background):
+        self.background = background
+
+    def next_frame(self):
+        """New frame initialized to the static layer"""
+        return self.background.copy()
+
+class ParticleStamper:
+    """
+    Vectorized filled-circle drawing for many small particles
+    - Pixel offsets of the largest disk are precomputed once
+    - All particles are written with a single fancy-indexed assignment
+    """
+
+    def __init__(self, max_radius=8):
+        oy, ox = np.mgrid[-max_radius:max_radius + 1, -max_radius:max_radius + 1]
+        self.ox, self.oy = ox.ravel(), oy.ravel()
+        self.distance2 = self.ox ** 2 + self.oy ** 2
+
+    def draw(self, frame, xs, ys, radii, color):
+        """Fill disks centered at (xs, ys) with per-particle radii"""
+        height, width = frame.shape[:2]
+        px = np.asarray(xs)[:, None] + self.ox[None, :]
+        py = np.asarray(ys)[:, None] + self.oy[None, :]
+        mask = (self.distance2[None, :] <= (np.asarray(radii) ** 2)[:, None]) & \
+               (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        frame[py[mask], px[mask]] = color
+
+class CameraProducer:
+    """
+    Single background producer for one camera
+    - Captures, runs inference and annotates once per frame
+    - Publishes the result to a FrameBroadcaster for any number of viewers
+    - Sleeps while the camera has no subscribers
+    """
+
+    def __init__(self, name, frame_source, broadcaster, target_fps=30, metrics=None):
+        self.name = name
+        self.frame_source = frame_source
+        self.broadcaster = broadcaster
+        self.metrics = metrics or CameraMetrics()
+        self.encoded_cache = EncodedFrameCache(metrics=self.metrics)
+        self.frame_interval = 1.0 / target_fps
+        self.running = False
+        self.thread = None
+        self.wake_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def ensure_started(self):
+        """Start the producer thread on first use and wake it if idle"""
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.running = True
+                self.thread = threading.Thread(target=self._run, name=f"producer-{self.name}", daemon=True)
+                self.thread.start()
+                print(f"🎬 Camera producer started: {self.name}")
+        self.wake_event.set()
+
+    def stop(self, timeout=2.0):
+        """Stop the producer thread"""
+        self.running = False
+        self.wake_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _run(self):
+        while self.running:
+            # Idle without viewers instead of burning CPU on inference
+            if self.broadcaster.subscribers == 0:
+                self.wake_event.clear()
+                self.wake_event.wait(1.0)
+                continue
+
+            started = time.time()
+            try:
+                capture_started = time.perf_counter()
+                frame = self.frame_source()
+                self.metrics.observe('capture', time.perf_counter() - capture_started)
+                if frame is not None:
+                    self.broadcaster.publish(frame)
+                    self.metrics.frame()
+            except Exception as e:
+                print(f"❌ Producer error for {self.name}: {e}")
+                time.sleep(1)
+                continue
+
+            # Pace to the target frame rate, accounting for the work already done
+            remaining = self.frame_interval - (time.time() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+class LatestFrameQueue:
+    """
+    Bounded drop-oldest queue between pipeline stages
+    - put() never blocks: when full, the oldest item is discarded
+    - Downstream stages therefore always work on the freshest frame
+    - Depth and drop counters for pipeline diagnostics
+    """
+
+    def __init__(self, maxsize=1):
+        self.items = deque()
+        self.maxsize = maxsize
+        self.condition = threading.Condition()
+        self.enqueued = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self.condition:
+            if len(self.items) >= self.maxsize:
+                self.items.popleft()
+                self.dropped += 1
+            self.items.append(item)
+            self.enqueued += 1
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        """Pop the oldest queued item, or None on timeout"""
+        with self.condition:
+            if not self.condition.wait_for(lambda: len(self.items) > 0, timeout):
+                return None
+            return self.items.popleft()
+
+    def get_stats(self):
+        return {
+            'depth': len(self.items),
+            'max_depth': self.maxsize,
+            'enqueued': self.enqueued,
+            'dropped': self.dropped
+        }
+
+class CameraPipeline:
+    """
+    Staged capture -> inference -> annotate -> encode pipeline for one camera
+    - Each stage runs on its own thread
+    - Stages are linked by LatestFrameQueue so slow inference never blocks capture
+    - The encode stage pre-encodes and publishes the freshest annotated frame
+    - Per-stage queue depth, drop counts and timings are queryable
+    - Capture, draw and capture-to-publish latency feed the camera's CameraMetrics
+      (infer_fn records inference / postprocess itself)
+    """
+
+    STAGES = ('capture', 'inference', 'annotate', 'encode')
+    METRIC_STAGES = {'capture': 'capture', 'annotate': 'draw'}
+
+    def __init__(self, name, capture_fn, infer_fn, annotate_fn, broadcaster, target_fps=30, queue_size=1,
+                 snapshot_writer=None, source_paced_fn=None, metrics=None):
+        self.name = name
+        self.capture_fn = capture_fn
+        self.source_paced_fn = source_paced_fn  # True while the source blocks in read() itself
+        self.infer_fn = infer_fn
+        self.annotate_fn = annotate_fn
+        self.broadcaster = broadcaster
+        self.snapshot_writer = snapshot_writer
+        self.metrics = metrics or CameraMetrics()
+        self.encoded_cache = EncodedFrameCache(metrics=self.metrics)
+        self.frame_interval = 1.0 / target_fps
+        self.sequence = 0
+
+        # Input queue of every stage after capture
+        self.queues = {stage: LatestFrameQueue(queue_size) for stage in self.STAGES[1:]}
+        self.stage_stats = {stage: {'processed': 0, 'errors': 0, 'busy_time': 0.0} for stage in self.STAGES}
+
+        self.running = False
+        self.threads = {}
+        self.wake_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def ensure_started(self):
+        """Start (or restart) the stage threads and wake capture if idle"""
+        with self.lock:
+            targets = {
+                'capture': self._capture_loop,
+                'inference': lambda: self._stage_loop('inference', self._run_inference),
+                'annotate': lambda: self._stage_loop('annotate', self._run_annotate),
+                'encode': lambda: self._stage_loop('encode', self._run_encode)
+            }
+            self.running = True
+            for stage, target in targets.items():
+                thread = self.threads.get(stage)
+                if thread is None or not thread.is_alive():
+                    thread = threading.Thread(target=target, name=f"{self.name}-{stage}", daemon=True)
+                    self.threads[stage] = thread
+                    thread.start()
+                    print(f"🎬 Pipeline stage started: {self.name}/{stage}")
+        self.wake_event.set()
+
+    def stop(self, timeout=2.0):
+        """Stop all stage threads"""
+        self.running = False
+        self.wake_event.set()
+        for thread in self.threads.values():
+            thread.join(timeout)
+
+    def _record(self, stage, started, error=False):
+        stats = self.stage_stats[stage]
+        if error:
+            stats['errors'] += 1
+        else:
+            elapsed = time.perf_counter() - started
+            stats['processed'] += 1
+            stats['busy_time'] += elapsed
+            if stage in self.METRIC_STAGES:
+                self.metrics.observe(self.METRIC_STAGES[stage], elapsed)
+
+    def _capture_loop(self):
+        while self.running:
+            # Idle without viewers instead of burning CPU on capture/inference
+            if self.broadcaster.subscribers == 0:
+                self.wake_event.clear()
+                self.wake_event.wait(1.0)
+                continue
+
+            started = time.perf_counter()
+            try:
+                frame, needs_inference = self.capture_fn()
+            except Exception as e:
+                print(f"❌ Capture stage error for {self.name}: {e}")
+                self._record('capture', started, error=True)
+                time.sleep(1)
+                continue
+            self._record('capture', started)
+
+            if frame is not None:
+                self.sequence += 1
+                item = {
+                    'sequence': self.sequence,
+                    'frame': frame,
+                    'detections': [],
+                    'captured_at': time.perf_counter()
+                }
+                # Simulated / placeholder frames have nothing to detect
+                self.queues['inference' if needs_inference else 'encode'].put(item)
+
+            # Real devices and recorded sources block in read(); simulated sources are paced here
+            if self.source_paced_fn is not None and self.source_paced_fn():
+                continue
+            remaining = self.frame_interval - (time.perf_counter() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def _stage_loop(self, stage, handler):
+        queue = self.queues[stage]
+        while self.running:
+            item = queue.get(timeout=0.5)
+            if item is None:
+                continue
+            started = time.perf_counter()
+            try:
+                handler(item)
+            except Exception as e:
+                print(f"❌ {stage.capitalize()} stage error for {self.name}: {e}")
+                self._record(stage, started, error=True)
+                continue
+            self._record(stage, started)
+
+    def _run_inference(self, item):
+        item['detections'] = self.infer_fn(item['frame'])
+        self.queues['annotate'].put(item)
+
+    def _run_annotate(self, item):
+        snapshots = []
+        item['frame'] = self.annotate_fn(item['frame'], item['detections'], snapshots)
+
+        # Breach snapshots are handed to the writer here: the encode queue may drop
+        # this item. Encoding through the cache lets the encode stage reuse the JPEG.
+        if snapshots and self.snapshot_writer:
+            data = self.encoded_cache.get(item['sequence'], item['frame'])
+            if data:
+                for path in snapshots:
+                    self.snapshot_writer.save_snapshot(path, data)
+        self.queues['encode'].put(item)
+
+    def _run_encode(self, item):
+        # Warm the shared cache with the default encoding before viewers wake up
+        self.encoded_cache.get(item['sequence'], item['frame'])
+        self.broadcaster.publish(item['frame'], item['sequence'])
+        self.metrics.observe('end_to_end', time.perf_counter() - item['captured_at'])
+        self.metrics.frame()
+
+    def get_pipeline_stats(self):
+        """Per-stage queue depth, drop counts and average processing time"""
+        stats = {}
+        for stage in self.STAGES:
+            stage_stats = self.stage_stats[stage]
+            processed = stage_stats['processed']
+            entry = {
+                'processed': processed,
+                'errors': stage_stats['errors'],
+                'avg_ms': round(stage_stats['busy_time'] / processed * 1000, 2) if processed else 0.0
+            }
+            queue = self.queues.get(stage)
+            entry.update(queue.get_stats() if queue else {'depth': 0, 'max_depth': 0, 'enqueued': processed, 'dropped': 0})
+            stats[stage] = entry
+        return stats
+
+class IoUTracker:
+    """
+    Lightweight multi-object tracker used between YOLO runs
+    - Greedy IoU association of new detections to existing tracks (same class)
+    - Constant-velocity prediction carries boxes across frames without inference
+    - Persistent track IDs; tracks expire after max_missed unmatched detection rounds
+    - Track state is kept in NumPy arrays, so predict/update are array operations
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=2, velocity_smoothing=0.5):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.velocity_smoothing = velocity_smoothing
+        self.next_id = 1
+        self.timestamp = None
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.class_ids = np.zeros(0, dtype=np.int32)
+        self.confidences = np.zeros(0, dtype=np.float32)
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.detected_boxes = np.zeros((0, 4), dtype=np.float32)
+        self.velocities = np.zeros((0, 4), dtype=np.float32)
+        self.frames_since_detection = np.zeros(0, dtype=np.int32)
+        self.missed = np.zeros(0, dtype=np.int32)
+
+    @staticmethod
+    def iou_matrix(boxes_a, boxes_b):
+        """Pairwise IoU between two (N, 4) arrays of x1, y1, x2, y2 boxes"""
+        x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+        y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+        x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+        y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+        intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+        area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+        union = area_a[:, None] + area_b[None, :] - intersection
+        return np.where(union > 0, intersection / np.maximum(union, 1e-6), 0.0)
+
+    def update(self, detections):
+        """Associate a fresh Detections set from YOLO and return the tracked boxes"""
+        self.timestamp = detections.timestamp
+        det_boxes = detections.boxes.astype(np.float32)
+        track_match = np.full(len(self.ids), -1, dtype=np.int64)
+        det_matched = np.zeros(len(detections), dtype=bool)
+
+        if len(self.ids) and len(detections):
+            ious = self.iou_matrix(self.boxes, det_boxes)
+            # Only associate boxes of the same class
+            ious[self.class_ids[:, None] != detections.class_ids[None, :]] = 0.0
+
+            # Greedy matching, best overlaps first
+            for flat_index in np.argsort(-ious, axis=None):
+                t_index, d_index = np.unravel_index(flat_index, ious.shape)
+                if ious[t_index, d_index] < self.iou_threshold:
+                    break
+                if track_match[t_index] >= 0 or det_matched[d_index]:
+                    continue
+                track_match[t_index] = d_index
+                det_matched[d_index] = True
+
+        # Correct matched tracks: smoothed per-frame velocity from the last detection
+        matched = track_match >= 0
+        d_index = track_match[matched]
+        elapsed = (self.frames_since_detection[matched] + 1)[:, None]
+        measured_velocity = (det_boxes[d_index] - self.detected_boxes[matched]) / elapsed
+        alpha = self.velocity_smoothing
+        self.velocities[matched] = alpha * measured_velocity + (1 - alpha) * self.velocities[matched]
+        self.boxes[matched] = det_boxes[d_index]
+        self.detected_boxes[matched] = det_boxes[d_index]
+        self.confidences[matched] = detections.confidences[d_index]
+        self.frames_since_detection[matched] = 0
+        self.missed[matched] = 0
+
+        # Age out tracks that were not seen by this detection round
+        self.missed[~matched] += 1
+        self._keep(self.missed <= self.max_missed)
+
+        # Start new tracks for unmatched detections
+        new = ~det_matched
+        count = int(new.sum())
+        if count:
+            self.ids = np.concatenate((self.ids, np.arange(self.next_id, self.next_id + count)))
+            self.next_id += count
+            self.class_ids = np.concatenate((self.class_ids, detections.class_ids[new]))
+            self.confidences = np.concatenate((self.confidences, detections.confidences[new]))
+            self.boxes = np.concatenate((self.boxes, det_boxes[new]))
+            self.detected_boxes = np.concatenate((self.detected_boxes, det_boxes[new]))
+            self.velocities = np.concatenate((self.velocities, np.zeros((count, 4), dtype=np.float32)))
+            self.frames_since_detection = np.concatenate((self.frames_since_detection, np.zeros(count, dtype=np.int32)))
+            self.missed = np.concatenate((self.missed, np.zeros(count, dtype=np.int32)))
+
+        return self.current()
+
+    def _keep(self, mask):
+        self.ids = self.ids[mask]
+        self.class_ids = self.class_ids[mask]
+        self.confidences = self.confidences[mask]
+        self.boxes = self.boxes[mask]
+        self.detected_boxes = self.detected_boxes[mask]
+        self.velocities = self.velocities[mask]
+        self.frames_since_detection = self.frames_since_detection[mask]
+        self.missed = self.missed[mask]
+
+    def predict(self):
+        """Advance every track by one frame and return the predicted boxes"""
+        self.boxes += self.velocities
+        self.frames_since_detection += 1
+        return self.current()
+
+    def current(self):
+        """Visible tracks as Detections (coasting tracks are kept but not drawn)"""
+        visible = self.missed == 0
+        return Detections(self.boxes[visible].astype(np.int32), self.confidences[visible],
+                          self.class_ids[visible], self.ids[visible], self.timestamp)
+
+class MotionGate:
+    """
+    Cheap motion gate in front of YOLO for mostly static scenes
+    - Compares a downscaled, blurred grayscale frame with the last frame sent to YOLO
+    - Skips inference when the changed-pixel fraction stays below a threshold
+    - Uses a stricter threshold inside watched regions (red zone) so entries are not missed
+    - Forces a refresh every max_skipped_frames regardless of motion
+    """
+
+    def __init__(self, threshold=0.01, zone_threshold=0.002, pixel_delta=25,
+                 scale_width=160, max_skipped_frames=30):
+        self.threshold = threshold
+        self.zone_threshold = zone_threshold
+        self.pixel_delta = pixel_delta
+        self.scale_width = scale_width
+        self.max_skipped_frames = max_skipped_frames
+        self.watch_regions = []
+        self.watch_mask = None
+        self.mask_shape = None
+        self.reference = None
+        self.skipped_in_row = 0
+        self.stats = {'checks': 0, 'skipped': 0, 'gate_time': 0.0, 'last_changed_fraction': 0.0}
+
+    def set_watch_regions(self, polygons):
+        """Full-resolution zone polygons that get the stricter threshold"""
+        self.watch_regions = [np.asarray(polygon, dtype=np.float32).reshape(-1, 2) for polygon in polygons]
+        self.mask_shape = None  # rebuilt on next check
+
+    def _build_watch_mask(self, frame_shape, small_shape):
+        scale = np.array([small_shape[1] / frame_shape[1], small_shape[0] / frame_shape[0]], dtype=np.float32)
+        mask = np.zeros(small_shape, dtype=np.uint8)
+        for polygon in self.watch_regions:
+            cv2.fillPoly(mask, [np.round(polygon * scale).astype(np.int32)], 1)
+        # Grow by one downscaled pixel so motion right at a zone edge still counts
+        mask = cv2.dilate(mask, np.ones((3, 3), np.uint8)).astype(bool)
+        self.watch_mask = mask if mask.any() else None
+        self.mask_shape = (frame_shape, small_shape)
+
+    def check(self, frame):
+        """Return True when the scene changed enough to warrant inference"""
+        started = time.perf_counter()
+        height, width = frame.shape[:2]
+        small_size = (self.scale_width, max(1, int(height * self.scale_width / width)))
+        small = cv2.resize(frame, small_size, interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+
+        if self.mask_shape != (frame.shape[:2], gray.shape):
+            self._build_watch_mask(frame.shape[:2], gray.shape)
+
+        if (self.reference is None or self.reference.shape != gray.shape
+                or self.skipped_in_row >= self.max_skipped_frames):
+            motion = True
+        else:
+            changed = cv2.absdiff(gray, self.reference) > self.pixel_delta
+            changed_fraction = float(changed.mean())
+            self.stats['last_changed_fraction'] = round(changed_fraction, 5)
+            motion = changed_fraction > self.threshold
+            if not motion and self.watch_mask is not None:
+                motion = float(changed[self.watch_mask].mean()) > self.zone_threshold
+
+        if motion:
+            # Compare future frames against the frame YOLO actually saw
+            self.reference = gray
+            self.skipped_in_row = 0
+        else:
+            self.skipped_in_row += 1
+            self.stats['skipped'] += 1
+
+        self.stats['checks'] += 1
+        self.stats['gate_time'] += time.perf_counter() - started
+        return motion
+
+    def get_stats(self):
+        checks = self.stats['checks']
+        return {
+            'checks': checks,
+            'skipped': self.stats['skipped'],
+            'skip_ratio': round(self.stats['skipped'] / checks, 3) if checks else 0.0,
+            'avg_gate_ms': round(self.stats['gate_time'] / checks * 1000, 3) if checks else 0.0,
+            'last_changed_fraction': self.stats['last_changed_fraction']
+        }
+
+class DeviceHealthMonitor:
+    """
+    Background camera device health probe with a cached result
+    - Refreshes on a fixed interval in its own thread; requests only read the cache
+    - Every result carries its age; explicit refreshes are rate-limited
+    - The probe function never opens the device held by the live stream
+    """
+
+    def __init__(self, probe_fn, interval=HEALTH_CHECK_INTERVAL, min_refresh_interval=HEALTH_MIN_REFRESH):
+        self.probe_fn = probe_fn
+        self.interval = interval
+        self.min_refresh_interval = min_refresh_interval
+        self.lock = threading.Lock()
+        self.available_cameras = []
+        self.checked_at = None
+        self.attempted_at = None  # last explicit refresh attempt, whatever its outcome
+        self.probe_ms = None
+        self.stats = {'refreshes': 0, 'forced': 0, 'rate_limited': 0, 'skipped': 0, 'errors': 0}
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def seed(self, available_cameras):
+        """Use an existing probe result (e.g. the startup scan) as the cache"""
+        with self.lock:
+            self.available_cameras = available_cameras
+            self.checked_at = time.time()
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name="device-health", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.refresh()
+
+    def refresh(self):
+        """Probe now and update the cache; returns False if the probe was skipped or failed"""
+        started = time.perf_counter()
+        try:
+            available_cameras = self.probe_fn()
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"⚠️  Device health probe failed: {e}")
+            return False
+        if available_cameras is None:  # devices busy (e.g. reconnection in progress)
+            self.stats['skipped'] += 1
+            return False
+        with self.lock:
+            self.available_cameras = available_cameras
+            self.checked_at = time.time()
+            self.probe_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.stats['refreshes'] += 1
+        return True
+
+    def get(self, refresh=False):
+        """Cached device state with its age; refresh=True probes now unless rate-limited"""
+        refresh_result = None
+        if refresh:
+            # Rate-limited on the last attempt: skipped or failed probes count too
+            with self.lock:
+                now = time.time()
+                last = max(self.checked_at or 0, self.attempted_at or 0)
+                allowed = now - last >= self.min_refresh_interval
+                if allowed:
+                    self.attempted_at = now
+            if not allowed:
+                self.stats['rate_limited'] += 1
+                refresh_result = 'rate_limited'
+            else:
+                self.stats['forced'] += 1
+                refresh_result = 'done' if self.refresh() else 'skipped'
+
+        with self.lock:
+            return {
+                'available_cameras': list(self.available_cameras),
+                'checked_at': datetime.fromtimestamp(self.checked_at).isoformat() if self.checked_at else None,
+                'age_seconds': round(time.time() - self.checked_at, 1) if self.checked_at else None,
+                'probe_ms': self.probe_ms,
+                'interval_seconds': self.interval,
+                'min_refresh_seconds': self.min_refresh_interval,
+                'refresh': refresh_result,
+                'stats': dict(self.stats)
+            }
+
+class ReconnectionSupervisor:
+    """
+    Single background thread per camera that owns reconnection
+    - Capture never blocks: it reports a failure and keeps streaming a fallback source
+    - Exponential backoff with jitter between attempts, capped at max_delay
+    - Source switches real -> placeholder -> mock (after repeated failures) -> real
+    - Metrics: attempts, failures, recoveries and time-to-recover
+    """
+
+    def __init__(self, name, connect_fn, disconnect_fn, on_source_change=None,
+                 base_delay=RECONNECT_BASE_DELAY, max_delay=RECONNECT_MAX_DELAY, jitter=0.25, mock_after=3):
+        self.name = name
+        self.connect_fn = connect_fn
+        self.disconnect_fn = disconnect_fn
+        self.on_source_change = on_source_change
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.mock_after = mock_after  # failed attempts before the placeholder becomes the mock feed
+
+        self.source = 'real'
+        self.failed_attempts = 0  # consecutive, drives the backoff
+        self.disconnected_at = None
+        self.next_attempt_at = None
+        self.stats = {'disconnects': 0, 'attempts': 0, 'failures': 0, 'recoveries': 0,
+                      'last_time_to_recover_s': None, 'max_time_to_recover_s': None, 'total_recover_time': 0.0}
+        self.lock = threading.Lock()
+        self.wake_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self, source):
+        """Start supervising from the given source ('real', 'placeholder' or 'mock')"""
+        with self.lock:
+            self.source = source
+            if source != 'real':
+                self.disconnected_at = time.time()
+        if self.on_source_change:
+            self.on_source_change(source)
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name=f"{self.name}-reconnect", daemon=True)
+            self.thread.start()
+        self.wake_event.set()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
+
+    def report_failure(self):
+        """Called from the capture path: drop the device and hand off to the supervisor thread"""
+        with self.lock:
+            if self.source != 'real':
+                return
+            self.source = 'placeholder'
+            self.failed_attempts = 0
+            self.disconnected_at = time.time()
+            self.stats['disconnects'] += 1
+        print(f"⚠️  {self.name} camera lost - reconnecting in the background")
+        self.disconnect_fn()
+        if self.on_source_change:
+            self.on_source_change('placeholder')
+        self.wake_event.set()
+
+    def next_delay(self):
+        """Exponential backoff with +/- jitter"""
+        delay = min(self.max_delay, self.base_delay * (2 ** self.failed_attempts))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def seconds_until_next_attempt(self):
+        if self.source == 'real' or self.next_attempt_at is None:
+            return None
+        return max(0.0, self.next_attempt_at - time.time())
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            if self.source == 'real':
+                self.wake_event.wait(1.0)
+                self.wake_event.clear()
+                continue
+
+            delay = self.next_delay()
+            self.next_attempt_at = time.time() + delay
+            if self.stop_event.wait(delay):
+                break
+
+            self.stats['attempts'] += 1
+            try:
+                connected = self.connect_fn()
+            except Exception as e:
+                print(f"❌ {self.name} reconnection error: {e}")
+                connected = False
+
+            if connected:
+                with self.lock:
+                    recover_time = time.time() - self.disconnected_at if self.disconnected_at else 0.0
+                    self.source = 'real'
+                    self.failed_attempts = 0
+                    self.next_attempt_at = None
+                    self.stats['recoveries'] += 1
+                    self.stats['total_recover_time'] += recover_time
+                    self.stats['last_time_to_recover_s'] = round(recover_time, 2)
+                    self.stats['max_time_to_recover_s'] = round(max(recover_time, self.stats['max_time_to_recover_s'] or 0.0), 2)
+                print(f"✅ {self.name} camera reconnected after {recover_time:.1f}s")
+                if self.on_source_change:
+                    self.on_source_change('real')
+            else:
+                self.stats['failures'] += 1
+                self.failed_attempts += 1
+                if self.source == 'placeholder' and self.failed_attempts >= self.mock_after:
+                    self.source = 'mock'
+                    print(f"🎭 {self.name} camera still unavailable - switching to simulated feed")
+                    if self.on_source_change:
+                        self.on_source_change('mock')
+
+    def get_stats(self):
+        """Current source, backoff state and reconnection metrics"""
+        stats = dict(self.stats)
+        total_recover_time = stats.pop('total_recover_time')
+        next_attempt = self.seconds_until_next_attempt()
+        stats.update({
+            'source': self.source,
+            'consecutive_failures': self.failed_attempts,
+            'disconnected_for_s': round(time.time() - self.disconnected_at, 1) if self.source != 'real' and self.disconnected_at else 0,
+            'next_attempt_in_s': round(next_attempt, 1) if next_attempt is not None else None,
+            'avg_time_to_recover_s': round(total_recover_time / stats['recoveries'], 2) if stats['recoveries'] else None
+        })
+        return stats
+
 class EnhancedCameraManager:
     """
     Enhanced Camera Manager for marine surveillance system
@@ -59,17 +1201,18 @@ class EnhancedCameraManager:
     - Automatic diagnostics and error recovery
     """ 
 
-    def __init__(self):
+    def __init__(self, pc_source=PC_SOURCE, replay_mode=REPLAY_MODE, replay_loop=REPLAY_LOOP):
         self.cameras = {}
+        # Optional recorded video / image directory used instead of a PC camera device
+        self.pc_source = pc_source
+        self.replay_mode = replay_mode
+        self.replay_loop = replay_loop
         self.camera_stats = {
             'pc_camera': {'frames_captured': 0, 'errors': 0, 'start_time': time.time()},
             'underwater_camera': {'frames_captured': 0, 'errors': 0, 'start_time': time.time()}
         }
         self.mock_camera_active = False
-        self.last_reconnect_attempt = 0
-        self.reconnect_interval = 30  # Reconnection attempt every 30 seconds
-        self.yolo_model = YOLO("yolov8s.pt") # THE YOLO MODEL
-        # ^ The yolov8s model is used for real time apps
+        self.yolo_model = None  # loaded in the background (see load_detection_model)
         
         # Red Zone (Red Box) in Camera
         self.red_zone = {
@@ -79,17 +1222,128 @@ class EnhancedCameraManager:
             "y2": 330
         }
 
+        # The percentage of accuracy needed for object to be detected in red zone
+        self.confidence_threshold = 0.7
+        self.class_colors = {}
+
+        # Inference striding (YOLO every Nth frame, IoU tracker in between)
+        self.adaptive_stride = DETECTION_STRIDE.strip().lower() == 'auto'
+        self.detection_stride = 1 if self.adaptive_stride else max(1, int(DETECTION_STRIDE))
+        self.max_detection_stride = 8
+        self.inference_budget = 0.5  # adaptive mode: share of each frame interval YOLO may use
+        self.target_fps = 30
+        self.tracker = IoUTracker()
+        self.frames_since_detection = 0
+        self.inference_stats = {'detections_run': 0, 'frames_tracked': 0, 'frames_gated': 0, 'avg_inference_ms': 0.0}
+
+        # Motion gate in front of YOLO for static water / dock scenes
+        self.motion_gate_enabled = MOTION_GATE_ENABLED
+        self.motion_gate = MotionGate()
+
         # To reduce the amount of images being saved by adding a counter 
         self.red_zone_frame_counter = 0
         self.frames_required_to_trigger = 5  # number of continuous frames inside zone
 
+        # Named polygon zones (berths, restricted channels, ...) from red_zones.json;
+        # the legacy rectangle above is the default when no config exists
+        self.zone_map = ZoneMap(load_zone_config('pc', [{'name': 'red_zone', 'polygon': rect_to_polygon(self.red_zone)}]))
+
+        # Motion inside any zone always wakes YOLO
+        self.motion_gate.set_watch_regions(self.zone_map.polygons())
+
         # Red zone state tracking
         self.object_in_red_zone = False
         self.red_zone_trigger_time = None # Tracks exact time object enters red zone
 
-        # Launch diagnostics and initialization
-        self.run_comprehensive_diagnostics()
-        self.init_cameras_with_fallbacks()
+        # Event log lines and snapshots are written off the pipeline threads,
+        # and every event is also indexed in the SQLite event store
+        self.event_store = EventStore()
+        self.event_writer = AsyncEventWriter(store=self.event_store)
+
+        # Simulated feeds: pre-rendered static layers copied into each new frame
+        self.sim_rng = np.random.default_rng()
+        self.particles = ParticleStamper()
+        self.mock_pc_frames = StaticFrameLayer(self.render_mock_pc_background())
+        self.underwater_frames = StaticFrameLayer(self.render_underwater_background())
+        self.placeholder_layers = {}  # camera type -> static placeholder layer
+        self.placeholder_cache = {}   # camera type -> (key, read-only frame), rebuilt once per second
+
+        # Hot-path latency / fps metrics per camera (/metrics and the camera stats API)
+        self.metrics = {'pc': CameraMetrics(), 'underwater': CameraMetrics()}
+
+        # One producer + broadcaster per camera, shared by all stream viewers
+        self.broadcasters = {}
+        self.producers = {}
+        self.producers_lock = threading.Lock()
+
+        # Launch diagnostics and initialization in the background: Flask serves
+        # immediately and reports a "warming" state until every phase is done
+        self.available_cameras = []
+        self.pc_camera_index = None
+        self.device_lock = threading.Lock()  # held while (re)opening the PC camera
+        self.health_monitor = DeviceHealthMonitor(self.check_camera_devices)
+        self.reconnect_supervisor = ReconnectionSupervisor('PC', self.reconnect_pc_camera, self.release_pc_camera,
+                                                           self.set_pc_source)
+        self.startup = {'state': 'warming', 'phases': {}, 'total_ms': None}
+        self.startup_thread = threading.Thread(target=self.run_startup, name="camera-startup", daemon=True)
+        self.startup_thread.start()
+
+    def run_startup(self):
+        """Background startup: model load, camera probing and diagnostics run concurrently"""
+        started = time.perf_counter()
+        print("🚀 Startup: loading model, probing cameras and running diagnostics in parallel...")
+        phases = {
+            'model_load': self.load_detection_model,
+            'camera_init': self.init_cameras_with_fallbacks,
+            'diagnostics': self.run_comprehensive_diagnostics
+        }
+        threads = [threading.Thread(target=self._run_startup_phase, args=(name, fn), name=f"startup-{name}", daemon=True)
+                   for name, fn in phases.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Device health is refreshed in the background from now on (startup scan is the first result)
+        self.health_monitor.seed(self.available_cameras)
+        self.health_monitor.start()
+
+        # The reconnection supervisor keeps retrying while the PC camera is simulated
+        self.reconnect_supervisor.start('real' if self.cameras.get('pc_camera') is not None else 'mock')
+
+        failed = [name for name, phase in self.startup['phases'].items() if not phase['ok']]
+        self.startup['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        self.startup['state'] = 'degraded' if failed else 'ready'
+        timings = ', '.join(f"{name}: {phase['ms']:.0f}ms" for name, phase in self.startup['phases'].items())
+        print(f"⏱️  Startup {self.startup['state']} in {self.startup['total_ms']:.0f}ms ({timings})")
+
+    def _run_startup_phase(self, name, fn):
+        started = time.perf_counter()
+        ok = True
+        try:
+            fn()
+        except Exception as e:
+            ok = False
+            print(f"❌ Startup phase '{name}' failed: {e}")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.startup['phases'][name] = {'ok': ok, 'ms': round(elapsed_ms, 1)}
+        print(f"⏱️  Startup phase '{name}' finished in {elapsed_ms:.0f}ms")
+
+    def load_detection_model(self):
+        """Load and warm up the YOLO model (published only once it is warm)"""
+        model = InferenceBackend("yolov8s.pt") # THE YOLO MODEL
+        # ^ The yolov8s model is used for real time apps; runtime picked by HYDRACAT_INFERENCE_BACKEND
+        model.warmup()
+        self.yolo_model = model
+
+    def get_startup_status(self):
+        """Startup state ("warming", "ready" or "degraded") with per-phase timings"""
+        return {
+            'state': self.startup['state'],
+            'model_loaded': self.yolo_model is not None,
+            'phases': dict(self.startup['phases']),
+            'total_ms': self.startup['total_ms']
+        }
     
     def run_comprehensive_diagnostics(self):
         """Comprehensive system diagnostics for camera issues"""
@@ -104,8 +1358,7 @@ class EnhancedCameraManager:
         print(f"💻 Operating System: {os_info} {platform.release()}")
         print(f"🐍 Python Version: {sys.version.split()[0]}")
         
-        # 3. List available camera devices
-        available_cameras = self.scan_available_cameras()
+        # 3. Camera devices are probed concurrently by the camera_init startup phase
         
         # 4. Check camera permissions (important on macOS/Linux)
         if os_info == "Darwin":  # macOS
@@ -115,7 +1368,7 @@ class EnhancedCameraManager:
             print("🐧 Linux detected - checking camera permissions...")
             print("   Camera devices should be in /dev/video*")
             try:
-                video_devices = subprocess.check_output("ls /dev/video* 2>/dev/null || echo 'No video devices found'", shell=True).decode().strip()
+                video_devices = subprocess.check_output("ls /dev/video* 2>/dev/null || echo 'No video devices found'", shell=True, timeout=PROBE_TIMEOUT).decode().strip()
                 print(f"   Available devices: {video_devices}")
             except:
                 print("   Unable to check video devices")
@@ -141,7 +1394,7 @@ class EnhancedCameraManager:
                 import psutil
                 running_processes = [p.name().lower() for p in psutil.process_iter(['name'])]
             else:
-                running_processes = subprocess.check_output("ps aux", shell=True).decode().lower()
+                running_processes = subprocess.check_output("ps aux", shell=True, timeout=PROBE_TIMEOUT).decode().lower()
             
             conflicts = [app for app in common_camera_apps if app in str(running_processes)]
             
@@ -154,36 +1407,83 @@ class EnhancedCameraManager:
         except Exception as e:
             print(f"   ℹ️  Unable to check conflicts: {e}")
     
-    def scan_available_cameras(self):
-        """Detect all available camera indices"""
-        print("📹 Scanning available cameras...")
+    def open_test_capture(self, index, backend=None):
+        """Open one camera and read a test frame; returns (capture, frame) or (None, None)"""
+        cap = cv2.VideoCapture(index) if backend is None else cv2.VideoCapture(index, backend)
+        if cap.isOpened():
+            ret, frame = cap.read()
+            if ret and frame is not None:
+                return cap, frame
+        cap.release()
+        return None, None
+
+    def probe_cameras(self, indices=PROBE_INDICES, backend=None, timeout=PROBE_TIMEOUT):
+        """
+        Probe camera indices concurrently, each bounded by the same deadline
+        Returns ({index: (capture, frame) or None}, timed_out_indices); captures
+        that only answer after the deadline are released by their probe thread
+        """
+        results = {}
+        lock = threading.Lock()
+        closed = threading.Event()
+
+        def probe(index):
+            try:
+                cap, frame = self.open_test_capture(index, backend)
+            except Exception as e:
+                print(f"   ❌ Camera {index} error: {e}")
+                cap, frame = None, None
+            with lock:
+                if not closed.is_set():
+                    results[index] = (cap, frame) if cap is not None else None
+                    return
+            if cap is not None:
+                cap.release()  # answered too late
+
+        threads = {index: threading.Thread(target=probe, args=(index,), name=f"probe-{index}", daemon=True)
+                   for index in indices}
+        for thread in threads.values():
+            thread.start()
+        deadline = time.time() + timeout
+        for thread in threads.values():
+            thread.join(max(0.0, deadline - time.time()))
+
+        with lock:
+            closed.set()
+            finished = dict(results)
+        timed_out = [index for index in indices if index not in finished]
+        return finished, timed_out
+
+    def scan_available_cameras(self, probes=None, timed_out=(), indices=PROBE_INDICES, verbose=True):
+        """Detect all available camera indices (probing concurrently unless results are given)"""
+        if verbose:
+            print("📹 Scanning available cameras...")
+        release = probes is None
+        if probes is None:
+            probes, timed_out = self.probe_cameras(indices)
         available_cameras = []
         
         # Test camera indices 0-5 (usually sufficient)
-        for index in range(6):
-            try:
-                cap = cv2.VideoCapture(index)
-                if cap.isOpened():
-                    ret, frame = cap.read()
-                    if ret and frame is not None:
-                        height, width = frame.shape[:2]
-                        available_cameras.append({
-                            'index': index,
-                            'resolution': f"{width}x{height}",
-                            'working': True
-                        })
-                        print(f"   ✅ Camera {index}: Available ({width}x{height})")
-                    else:
-                        print(f"   ⚠️  Camera {index}: Detected but cannot read frames")
+        for index in sorted(probes):
+            probe = probes[index]
+            if probe is not None:
+                cap, frame = probe
+                height, width = frame.shape[:2]
+                available_cameras.append({
+                    'index': index,
+                    'resolution': f"{width}x{height}",
+                    'working': True
+                })
+                if verbose:
+                    print(f"   ✅ Camera {index}: Available ({width}x{height})")
+                if release:
                     cap.release()
-                else:
-                    if index <= 2:  # Show message only for main cameras
-                        print(f"   ❌ Camera {index}: Not available")
-            except Exception as e:
-                if index == 0:  # Show error only for main camera
-                    print(f"   ❌ Camera {index} error: {e}")
+            elif index <= 2 and verbose:  # Show message only for main cameras
+                print(f"   ❌ Camera {index}: Not available")
+        for index in timed_out:
+            print(f"   ⏱️  Camera {index}: Probe timed out after {PROBE_TIMEOUT:.0f}s")
         
-        if not available_cameras:
+        if not available_cameras and verbose:
             print("   🚨 NO CAMERAS DETECTED!")
             print("   Possible solutions:")
             print("   • Check camera is connected and not used by another app")
@@ -192,25 +1492,83 @@ class EnhancedCameraManager:
             print("   • Check camera drivers")
         
         return available_cameras
+
+    def check_camera_devices(self):
+        """Device health probe (background monitor): never reopens the device the live stream holds"""
+        if not self.device_lock.acquire(blocking=False):
+            return None  # the PC camera is being (re)opened right now
+        try:
+            camera = self.cameras.get('pc_camera')
+            live_index = self.pc_camera_index if camera is not None else None
+            indices = [index for index in PROBE_INDICES if index != live_index]
+            available_cameras = self.scan_available_cameras(indices=indices, verbose=False)
+            if live_index is not None:
+                # Report the live device from its open capture instead of probing it
+                width = int(camera.get(cv2.CAP_PROP_FRAME_WIDTH))
+                height = int(camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                available_cameras.append({
+                    'index': live_index,
+                    'resolution': f"{width}x{height}",
+                    'working': True,
+                    'in_use': True
+                })
+                available_cameras.sort(key=lambda cam: cam['index'])
+            return available_cameras
+        finally:
+            self.device_lock.release()
     
     def init_cameras_with_fallbacks(self):
         """Camera initialization with multiple recovery strategies"""
+        # Health probes are skipped until the startup probe has picked the PC camera
+        with self.device_lock:
+            self._init_cameras_with_fallbacks()
+
+    def _init_cameras_with_fallbacks(self):
         print("\n🎥 ENHANCED CAMERA INITIALIZATION")
         print("=" * 50)
         
-        # Strategy 1: Try default camera (index 0)
-        success = self.try_camera_with_index(0)
+        if self.pc_source:
+            # Recorded source replaces the device (no probing, no fallback to a real camera)
+            if not self.open_pc_file_source():
+                print("⚠️  Recorded PC source unavailable")
+                print("🎭 Initializing simulated camera for testing...")
+                self.cameras['pc_camera'] = None
+                self.mock_camera_active = True
+            self.cameras['underwater_camera'] = True
+            print("🌊 Underwater camera simulation ready")
+            print("=" * 50)
+            return
+        
+        # Strategy 1 + 2: probe the common indices concurrently, keep the lowest working one
+        probes, timed_out = self.probe_cameras()
+        self.available_cameras = self.scan_available_cameras(probes, timed_out)
+        success = False
+        for index in sorted(probes):
+            if probes[index] is None:
+                continue
+            cap, _ = probes[index]
+            if success:
+                cap.release()
+                continue
+            self.cameras['pc_camera'] = cap
+            self.pc_camera_index = index
+            print(f"   ✅ Camera {index} initialized successfully!")
+            self.configure_camera_settings()
+            success = True
         
         if not success:
-            # Strategy 2: Try other common indices
-            print("🔄 Trying alternative camera indices...")
-            for index in [1, 2, -1]:  # -1 is auto-detection on some systems
-                if self.try_camera_with_index(index):
-                    success = True
-                    break
+            # -1 is auto-detection on some systems (probed alone: it may open index 0 again)
+            print("🔄 Trying camera auto-detection...")
+            probes, _ = self.probe_cameras([-1])
+            if probes.get(-1):
+                self.cameras['pc_camera'] = probes[-1][0]
+                self.pc_camera_index = 0  # auto-detection picks the default device
+                print("   ✅ Camera initialized with auto-detection")
+                self.configure_camera_settings()
+                success = True
         
         if not success:
-            # Strategy 3: Try different backends
+            # Strategy 3: Try different backends (one at a time: they all open index 0)
             print("🔄 Trying different camera backends...")
             backends = [
                 (cv2.CAP_DSHOW, "DirectShow (Windows)"),
@@ -221,20 +1579,15 @@ class EnhancedCameraManager:
             ]
             
             for backend_id, backend_name in backends:
-                try:
-                    print(f"   Trying {backend_name}...")
-                    cap = cv2.VideoCapture(0, backend_id)
-                    if cap.isOpened():
-                        ret, frame = cap.read()
-                        if ret and frame is not None:
-                            self.cameras['pc_camera'] = cap
-                            print(f"   ✅ Camera initialized with backend: {backend_name}")
-                            self.configure_camera_settings()
-                            success = True
-                            break
-                        cap.release()
-                except Exception as e:
-                    continue
+                print(f"   Trying {backend_name}...")
+                probes, _ = self.probe_cameras([0], backend=backend_id)
+                if probes.get(0):
+                    self.cameras['pc_camera'] = probes[0][0]
+                    self.pc_camera_index = 0
+                    print(f"   ✅ Camera initialized with backend: {backend_name}")
+                    self.configure_camera_settings()
+                    success = True
+                    break
         
         if not success:
             # Strategy 4: Create simulated camera for testing
@@ -249,6 +1602,23 @@ class EnhancedCameraManager:
         
         print("=" * 50)
     
+    def open_pc_file_source(self):
+        """Open the recorded PC source (video file or image directory)"""
+        try:
+            print(f"🎞️  Opening recorded PC source {self.pc_source} (replay: {self.replay_mode}, loop: {self.replay_loop})...")
+            source = FileFrameSource(self.pc_source, self.replay_mode, self.replay_loop)
+            if not source.isOpened():
+                print(f"   ❌ Unable to open {self.pc_source}")
+                return False
+            self.cameras['pc_camera'] = source
+            self.pc_camera_index = None  # holds no camera device
+            print(f"   ✅ Recorded source ready ({source.get_stats()['kind']}, "
+                  f"{source.fps or 'unpaced'} fps)")
+            return True
+        except Exception as e:
+            print(f"   ❌ Recorded source error: {e}")
+            return False
+
     def try_camera_with_index(self, index):
         """Try initializing camera with specific index"""
         try:
@@ -268,6 +1638,7 @@ class EnhancedCameraManager:
             
             # Success!
             self.cameras['pc_camera'] = cap
+            self.pc_camera_index = index
             print(f"   ✅ Camera {index} initialized successfully!")
             self.configure_camera_settings()
             return True
@@ -298,128 +1669,195 @@ class EnhancedCameraManager:
         except Exception as e:
             print(f"   ⚠️  Camera configuration error: {e}")
     
-    def get_pc_camera_frame(self):
-        """Enhanced PC camera frame capture with recoveries"""
+    def capture_pc_frame(self):
+        """
+        Capture stage: read one PC camera frame with recoveries
+        Returns (frame, needs_inference); mock/placeholder frames skip inference
+        """
         # If real camera available
         if self.cameras.get('pc_camera') is not None:
             try:
                 ret, frame = self.cameras['pc_camera'].read()
                 if not ret or frame is None:
-                    print("⚠️  Camera read failed, attempting reconnection...")
-                    self.attempt_camera_reconnection()
-                    return self.create_placeholder_frame('pc')
+                    print("⚠️  Camera read failed, handing over to the reconnection supervisor...")
+                    self.reconnect_supervisor.report_failure()
+                    return self.create_placeholder_frame('pc'), False
                 
-                # Process and return clean image
-                return self.process_clean_pc_frame(frame)
+                # Clean feed until the model has finished warming up
+                return frame, self.yolo_model is not None
                 
             except Exception as e:
                 print(f"❌ PC camera capture error: {e}")
                 self.camera_stats['pc_camera']['errors'] += 1
-                self.attempt_camera_reconnection()
-                return self.create_placeholder_frame('pc')
+                self.reconnect_supervisor.report_failure()
+                return self.create_placeholder_frame('pc'), False
         
         # If simulated camera mode
         elif self.mock_camera_active:
-            return self.create_mock_pc_frame()
+            return self.create_mock_pc_frame(), False
         
         # Fallback to placeholder
         else:
-            return self.create_placeholder_frame('pc')
+            return self.create_placeholder_frame('pc'), False
+
+    def get_pc_camera_frame(self):
+        """Enhanced PC camera frame capture with recoveries (all stages inline)"""
+        frame, needs_inference = self.capture_pc_frame()
+        if needs_inference:
+            # Process and return clean image
+            return self.process_clean_pc_frame(frame)
+        return frame
     
     # assign a fixed random color for each class (person, car, etc)
     def get_color_for_class(self, cls_id):
-        random.seed(cls_id)  # ensures same class always gets same color
-        return tuple(random.randint(0, 255) for _ in range(3))
+        color = self.class_colors.get(cls_id)
+        if color is None:
+            rng = random.Random(cls_id)  # ensures same class always gets same color
+            color = self.class_colors[cls_id] = tuple(rng.randint(0, 255) for _ in range(3))
+        return color
 
-    def process_clean_pc_frame(self, frame):
-        """Process real PC camera frame (with YOLO detection overlay)"""
+    def detect_objects(self, frame):
+        """Inference stage: run YOLO and return confident detections as arrays"""
+        # --- YOLO inference ---
+        return self.extract_yolo_detections(self.yolo_model(frame, verbose=False))
+
+    def extract_yolo_detections(self, results):
+        """Post-processing: one tensor-to-NumPy conversion per frame; filtering is vectorized"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return extract_detections(results, self.confidence_threshold, timestamp)
+
+    def track_objects(self, frame):
+        """
+        Inference stage with striding: YOLO every Nth frame, tracker in between
+        Red-zone logic runs on the tracked boxes, so alerts keep frame-level latency
+        """
+        stats = self.inference_stats
+        if stats['detections_run'] == 0 or self.frames_since_detection + 1 >= self.detection_stride:
+            # Static scene: keep the last detections instead of running YOLO
+            if self.motion_gate_enabled and stats['detections_run'] > 0 and not self.motion_gate.check(frame):
+                stats['frames_gated'] += 1
+                return self.tracker.current()
+            if self.motion_gate_enabled and stats['detections_run'] == 0:
+                self.motion_gate.check(frame)  # seed the reference frame
+
+            # YOLO call and post-processing (extraction + tracker update) are timed separately
+            started = time.perf_counter()
+            results = self.yolo_model(frame, verbose=False)
+            inferred = time.perf_counter()
+            detections = self.extract_yolo_detections(results)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            # Exponential moving average keeps the adaptive stride stable
+            if stats['detections_run'] == 0:
+                stats['avg_inference_ms'] = elapsed_ms
+            else:
+                stats['avg_inference_ms'] = 0.8 * stats['avg_inference_ms'] + 0.2 * elapsed_ms
+            stats['detections_run'] += 1
+            self.frames_since_detection = 0
+
+            if self.adaptive_stride:
+                self.adapt_detection_stride()
+            tracked = self.tracker.update(detections)
+            metrics = self.metrics['pc']
+            metrics.observe('inference', inferred - started)
+            metrics.observe('postprocess', time.perf_counter() - inferred)
+            return tracked
+
+        self.frames_since_detection += 1
+        stats['frames_tracked'] += 1
+        started = time.perf_counter()
+        tracked = self.tracker.predict()
+        self.metrics['pc'].observe('postprocess', time.perf_counter() - started)
+        return tracked
+
+    def adapt_detection_stride(self):
+        """Pick the smallest stride that keeps YOLO within its per-frame budget"""
+        frame_budget_ms = 1000.0 / self.target_fps * self.inference_budget
+        stride = int(np.ceil(self.inference_stats['avg_inference_ms'] / frame_budget_ms))
+        stride = max(1, min(self.max_detection_stride, stride))
+        if stride != self.detection_stride:
+            print(f"⚙️  Detection stride adjusted: {self.detection_stride} -> {stride}")
+            self.detection_stride = stride
+
+    def get_inference_statistics(self):
+        """Striding / tracking counters for the PC camera"""
+        stats = self.inference_stats
+        total = stats['detections_run'] + stats['frames_tracked'] + stats['frames_gated']
+        return {
+            'detection_stride': self.detection_stride,
+            'adaptive_stride': self.adaptive_stride,
+            'detections_run': stats['detections_run'],
+            'frames_tracked': stats['frames_tracked'],
+            'frames_gated': stats['frames_gated'],
+            'inference_skipped_pct': round((total - stats['detections_run']) / total * 100, 2) if total else 0.0,
+            'avg_inference_ms': round(stats['avg_inference_ms'], 2),
+            'active_tracks': len(self.tracker.current()),
+            'motion_gate': dict(self.motion_gate.get_stats(), enabled=self.motion_gate_enabled)
+        }
+
+    def annotate_pc_frame(self, frame, detections, snapshots):
+        """Annotate stage: draw detections, run red-zone logic and overlay info (snapshot paths are appended to snapshots)"""
         height, width = frame.shape[:2]
-        detections = []
-        detections_in_zone = []
-        CONFIDENCE_THRESHOLD = 0.7 # The percentage of accuracy needed for object to be detected in red zone 
 
-        # Draw red zone box (visual reference)
-        cv2.rectangle(frame,
-                    (self.red_zone["x1"], self.red_zone["y1"]),
-                    (self.red_zone["x2"], self.red_zone["y2"]),
-                    (0, 0, 255), 2)  # red box
+        # Draw zone outlines (visual reference)
+        self.zone_map.draw(frame)
 
-        # --- YOLO inference ---
-        results = self.yolo_model(frame, verbose=False)
-        object_in_zone = False # Red Alert Boolean
-
-
-        for r in results:
-            for box in r.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])  # bounding box
-                cls = int(box.cls[0])    # class id, sets index to categorize groups
-                conf = float(box.conf[0]) # confidence, how certain a object is
-                label = f"{self.yolo_model.names[cls]} {conf:.2f}" # Displays class and confidence
-                name = self.yolo_model.names[cls]       # class name
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S") # Timestamp
-
-                # Skip low-confidence detections
-                if conf < CONFIDENCE_THRESHOLD:
-                    continue  # skip this object
-
-                 # Detection record
-                detection = {
-                    "name": name,
-                    "confidence": round(conf, 2),
-                    "timestamp": timestamp,
-                    "coords": (x1, y1, x2, y2)
-                }
-                detections.append(detection)
-
-                # Check if YOLO detection box is fully (or mostly) inside red zone
-                box_center_x = (x1 + x2) // 2
-                box_center_y = (y1 + y2) // 2
-
-                # The object is considered inside ONLY if its center is inside the red zone
-                if (self.red_zone["x1"] <= box_center_x <= self.red_zone["x2"] and
-                    self.red_zone["y1"] <= box_center_y <= self.red_zone["y2"]):
-                    # object_in_zone = True
-                    detections_in_zone.append({
-                        "name": name,
-                        "confidence": round(conf, 2),
-                        "timestamp": timestamp,
-                        "coords": (x1, y1, x2, y2)
-                    })
-
-                # colors for boxes (randomized for now)
-                color = self.get_color_for_class(cls)
-                # draw boxes
-                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                cv2.putText(frame, label, (x1, y1 - 5),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-            
-            # authoritative red-zone flag (use this)
-            object_in_zone = len(detections_in_zone) > 0
+        # Zone membership for every box at once: one mask lookup per box center
+        names = self.yolo_model.names
+        zone_events, _ = self.zone_map.evaluate(detections, names, frame.shape)
+
+        # Drawing is the only per-box step
+        for (x1, y1, x2, y2), conf, cls, track_id in zip(detections.boxes.tolist(), detections.confidences.tolist(),
+                                                          detections.class_ids.tolist(), detections.track_ids.tolist()):
+            label = f"{names[cls]} {conf:.2f}" # Displays class and confidence
+            if track_id >= 0:
+                label = f"#{track_id} {label}"
 
-            # Red Zone Logic     
-            if object_in_zone and not self.object_in_red_zone:
-                self.object_in_red_zone = True
-                self.red_zone_trigger_time = datetime.now()
+            # colors for boxes (randomized for now)
+            color = self.get_color_for_class(cls)
+            # draw boxes
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(frame, label, (x1, y1 - 5),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
 
-                # Save report entry
+        # Per-zone entry / exit events
+        snapshot_taken = False
+        for event in zone_events:
+            now = datetime.now()
+            if event['type'] == 'enter':
                 alert = {
                     "event": "Object entered red zone",
-                    "timestamp": self.red_zone_trigger_time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "objects": [d["name"] for d in detections_in_zone],
+                    "camera": "pc",
+                    "zone": event['zone'],
+                    "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
+                    "objects": event['detections'].to_records(names),
                 }
+                self.event_writer.log_event(alert)
 
-                with open("yolo_redzone_log.txt", "a") as f:
-                    f.write(json.dumps(alert) + "\n")
-                    # f.write(json.dumps(detection) + "\n")
-
-                # Take one snapshot
-                screenshot_path = f"redzone_capture_{self.red_zone_trigger_time.strftime('%H%M%S')}.jpg"
-                cv2.imwrite(screenshot_path, frame)
-                print(f"!!! -- Red zone breach detected! Snapshot saved: {screenshot_path} -- !!!")
+                # One snapshot per frame, whichever zones were entered; the caller
+                # writes it from the encoded frame (after the overlay is drawn)
+                if event['rules']['snapshot'] and not snapshot_taken:
+                    screenshot_path = f"redzone_capture_{now.strftime('%H%M%S')}.jpg"
+                    snapshots.append(screenshot_path)
+                    snapshot_taken = True
+                    print(f"!!! -- Red zone breach detected ({event['zone']})! Snapshot queued: {screenshot_path} -- !!!")
+                else:
+                    print(f"!!! -- Red zone breach detected ({event['zone']}) -- !!!")
+            else:
+                exit_event = {
+                    "event": "Object left red zone",
+                    "camera": "pc",
+                    "zone": event['zone'],
+                    "timestamp": now.strftime("%Y-%m-%d %H:%M:%S")
+                }
+                self.event_writer.log_event(exit_event)
+                print(f" !!Red zone cleared ({event['zone']})!!")
 
-            elif not object_in_zone and self.object_in_red_zone:
-                self.object_in_red_zone = False
-                print(" !!Red zone cleared!!")
+        # authoritative red-zone flag (any zone occupied)
+        object_in_zone = bool(self.zone_map.occupied_zones())
+        if object_in_zone and not self.object_in_red_zone:
+            self.red_zone_trigger_time = datetime.now()
+        self.object_in_red_zone = object_in_zone
 
         # --- Overlay info ---
         cv2.rectangle(frame, (0, 0), (width, 25), (0, 0, 0), -1)
@@ -429,31 +1867,35 @@ class EnhancedCameraManager:
                 cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
         cv2.circle(frame, (width-20, 35), 5, (0, 255, 0), -1)
 
-        # encode for streaming
-        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        # JPEG encoding happens once per frame in the shared EncodedFrameCache
         self.camera_stats['pc_camera']['frames_captured'] += 1
-        return buffer.tobytes()
+        return frame
 
-    
-    def create_mock_pc_frame(self):
-        """Create simulated PC camera frame for testing"""
+    def set_zones(self, zones, persist=False):
+        """Replace the PC camera zones; the label mask is rebuilt lazily on next frame"""
+        self.zone_map.set_zones(zones)
+        self.motion_gate.set_watch_regions(self.zone_map.polygons())
+        if persist:
+            save_zone_config('pc', self.zone_map.to_config())
+
+    def process_clean_pc_frame(self, frame):
+        """Process real PC camera frame (with YOLO detection overlay)"""
+        snapshots = []
+        frame = self.annotate_pc_frame(frame, self.track_objects(frame), snapshots)
+        if snapshots:
+            ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, DEFAULT_JPEG_QUALITY])
+            if ok:
+                for path in snapshots:
+                    self.event_writer.save_snapshot(path, buffer.tobytes())
+        return frame
+
+    def render_mock_pc_background(self):
+        """Static layer of the simulated PC camera: background, grid and overlay bar"""
         frame = np.zeros((480, 640, 3), dtype=np.uint8)
         
         # Create test pattern
         frame[:] = (30, 30, 30)  # Dark gray background
         
-        # Add moving test objects
-        current_time = time.time()
-        for i in range(3):
-            x = int(100 + i * 200 + 50 * np.sin(current_time + i))
-            y = int(200 + 30 * np.cos(current_time * 1.5 + i))
-            
-            # Test object
-            color = [(0, 150, 255), (255, 150, 0), (150, 255, 0)][i]
-            cv2.rectangle(frame, (x-25, y-20), (x+25, y+20), color, -1)
-            cv2.putText(frame, f'TEST-{i+1}', (x-20, y+5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
-        
         # Add test grid
         for i in range(0, 640, 80):
             cv2.line(frame, (i, 0), (i, 480), (50, 50, 50), 1)
@@ -463,66 +1905,83 @@ class EnhancedCameraManager:
         # Simulated camera overlay
         height, width = frame.shape[:2]
         cv2.rectangle(frame, (0, 0), (width, 25), (0, 0, 0), -1)
-        cv2.putText(frame, f'SIMULATED PC CAMERA - {datetime.now().strftime("%H:%M:%S")}', 
-                   (10, 18), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 200, 0), 1)
         cv2.putText(frame, 'TEST MODE', (width-100, 18), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 100, 100), 1)
         
         # Simulated status indicator
         cv2.circle(frame, (width-20, 35), 5, (255, 200, 0), -1)  # Orange for simulated
+        return frame
+
+    def create_mock_pc_frame(self):
+        """Create simulated PC camera frame for testing (moving objects over the static layer)"""
+        frame = self.mock_pc_frames.next_frame()
         
-        _, buffer = cv2.imencode('.jpg', frame)
-        self.camera_stats['pc_camera']['frames_captured'] += 1
-        return buffer.tobytes()
-    
-    def attempt_camera_reconnection(self):
-        """Camera reconnection attempt with rate limiting"""
+        # Add moving test objects
         current_time = time.time()
+        for i in range(3):
+            x = int(100 + i * 200 + 50 * np.sin(current_time + i))
+            y = int(200 + 30 * np.cos(current_time * 1.5 + i))
+            
+            # Test object
+            color = [(0, 150, 255), (255, 150, 0), (150, 255, 0)][i]
+            cv2.rectangle(frame, (x-25, y-20), (x+25, y+20), color, -1)
+            cv2.putText(frame, f'TEST-{i+1}', (x-20, y+5), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
         
-        # Limit reconnection attempts
-        if current_time - self.last_reconnect_attempt < self.reconnect_interval:
-            return
-        
-        self.last_reconnect_attempt = current_time
-        print("🔄 Attempting camera reconnection...")
-        
-        if self.cameras.get('pc_camera'):
-            self.cameras['pc_camera'].release()
-            self.cameras['pc_camera'] = None
-        
-        # Wait a moment
-        time.sleep(2)
-        
-        # Try to reinitialize
-        success = self.try_camera_with_index(0)
-        if not success:
-            success = self.try_camera_with_index(1)
+        cv2.putText(frame, f'SIMULATED PC CAMERA - {datetime.now().strftime("%H:%M:%S")}', 
+                   (10, 18), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 200, 0), 1)
         
-        if not success:
-            print("❌ Camera reconnection failed - switching to simulated mode")
-            self.mock_camera_active = True
-        else:
-            print("✅ Camera reconnection successful")
-            self.mock_camera_active = False
+        self.camera_stats['pc_camera']['frames_captured'] += 1
+        return frame
+    
+    def release_pc_camera(self):
+        """Drop the PC camera device (supervisor disconnect hook)"""
+        camera = self.cameras.get('pc_camera')
+        self.cameras['pc_camera'] = None
+        if camera is not None:
+            camera.release()
+
+    def reconnect_pc_camera(self):
+        """One reconnection attempt (supervisor thread only - never called from capture)"""
+        if self.pc_source:
+            return self.open_pc_file_source()
+        # The device health probe stays away while the camera is being reopened
+        with self.device_lock:
+            preferred = self.pc_camera_index if self.pc_camera_index is not None else 0
+            for index in dict.fromkeys([preferred, 0, 1]):
+                if self.try_camera_with_index(index):
+                    return True
+        return False
+
+    def set_pc_source(self, source):
+        """Switch the PC feed between 'real', 'placeholder' and 'mock' (streams keep running)"""
+        self.mock_camera_active = source == 'mock'
+        print(f"🔀 PC camera source: {source}")
     
+    def render_underwater_background(self):
+        """Static layer of the simulated underwater camera: water color and overlay bar"""
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        frame[:] = (40, 60, 20)  # Dark blue-green underwater color
+        cv2.rectangle(frame, (0, 0), (640, 30), (0, 0, 0), -1)
+        return frame
+
     def get_underwater_camera_frame(self):
         """Generate simulated underwater camera feed with marine life effects"""
         try:
-            # Create underwater base scene (blue-green background)
-            frame = np.zeros((480, 640, 3), dtype=np.uint8)
-            frame[:] = (40, 60, 20)  # Dark blue-green underwater color
+            # Underwater base scene from the pre-rendered layer
+            frame = self.underwater_frames.next_frame()
+            rng = self.sim_rng
             
-            # Add animated "bubbles" and marine particles
+            # Animated "bubbles" rising, all positions computed at once
             current_time = time.time()
-            for i in range(15):
-                # Animated bubbles rising
-                x = int(50 + i * 40 + 20 * np.sin(current_time * 2 + i))
-                y = int(400 - (current_time * 50 + i * 30) % 480)
-                bubble_size = random.randint(2, 6)
-                cv2.circle(frame, (x, y), bubble_size, (200, 255, 200), -1)
+            bubbles = np.arange(15)
+            bubble_x = (50 + bubbles * 40 + 20 * np.sin(current_time * 2 + bubbles)).astype(np.int32)
+            bubble_y = (400 - (current_time * 50 + bubbles * 30) % 480).astype(np.int32)
+            self.particles.draw(frame, bubble_x, bubble_y, rng.integers(2, 7, 15), (200, 255, 200))
             
             # Add simulated fish detection boxes
             fish_types = ['Fish', 'Shark', 'Turtle', 'Jellyfish', 'Ray']
+            confidences = rng.integers(85, 99, 3)
             for i in range(3):
                 fish_x = int(200 + i * 150 + 50 * np.sin(current_time + i))
                 fish_y = int(200 + 50 * np.cos(current_time * 1.5 + i))
@@ -532,40 +1991,33 @@ class EnhancedCameraManager:
                 cv2.rectangle(frame, (fish_x-30, fish_y-20), (fish_x+30, fish_y+20), detection_color, 2)
                 
                 fish_type = fish_types[i % len(fish_types)]
-                confidence = random.randint(85, 98)
-                cv2.putText(frame, f'{fish_type} {confidence}%', (fish_x-25, fish_y-25), 
+                cv2.putText(frame, f'{fish_type} {confidences[i]}%', (fish_x-25, fish_y-25), 
                            cv2.FONT_HERSHEY_SIMPLEX, 0.4, detection_color, 1)
             
-            # Add floating particles
-            for i in range(20):
-                particle_x = int(random.randint(0, 640))
-                particle_y = int(random.randint(0, 480))
-                cv2.circle(frame, (particle_x, particle_y), 1, (100, 150, 100), -1)
+            # Floating particles
+            self.particles.draw(frame, rng.integers(0, 640, 20), rng.integers(0, 480, 20),
+                                np.ones(20, dtype=np.int64), (100, 150, 100))
             
             # Underwater camera overlay
             height, width = frame.shape[:2]
-            cv2.rectangle(frame, (0, 0), (width, 30), (0, 0, 0), -1)
             cv2.putText(frame, f'Underwater Camera - {datetime.now().strftime("%H:%M:%S")}', 
                        (10, 18), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
             
             # Depth and clarity indicators
-            depth = f"Depth: {random.randint(12, 18)}.{random.randint(0, 9)}m"
-            clarity = f"Clarity: {random.randint(70, 90)}%"
-            cv2.putText(frame, depth, (10, height-30), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
-            cv2.putText(frame, clarity, (10, height-10), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
+            depth_m, depth_cm, clarity_pct = rng.integers((12, 0, 70), (19, 10, 91))
+            cv2.putText(frame, f"Depth: {depth_m}.{depth_cm}m", (10, height-30), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
+            cv2.putText(frame, f"Clarity: {clarity_pct}%", (10, height-10), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
             
-            # Encode image
-            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
             self.camera_stats['underwater_camera']['frames_captured'] += 1
-            return buffer.tobytes()
+            return frame
             
         except Exception as e:
             print(f"❌ Underwater image generation error: {e}")
             self.camera_stats['underwater_camera']['errors'] += 1
             return self.create_placeholder_frame('underwater')
     
-    def create_placeholder_frame(self, camera_type):
-        """Create placeholder image when camera unavailable"""
+    def render_placeholder_background(self, camera_type):
+        """Static layer of the placeholder: colored background and error message"""
         frame = np.zeros((480, 640, 3), dtype=np.uint8)
         
         # Colored background according to camera type
@@ -592,50 +2044,159 @@ class EnhancedCameraManager:
         for i, line in enumerate(message_lines):
             cv2.putText(frame, line, (50, y_offset + i * 30), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+        return frame
+
+    def create_placeholder_frame(self, camera_type):
+        """
+        Create placeholder image when camera unavailable
+        The frame only changes once per second, so it is cached read-only and
+        EncodedFrameCache encodes it once however often it is published
+        """
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        countdown = None
+        if camera_type == 'pc':
+            next_attempt = self.reconnect_supervisor.seconds_until_next_attempt()
+            if next_attempt is not None:
+                countdown = int(next_attempt) + 1
+        
+        key = (timestamp, countdown)
+        cached = self.placeholder_cache.get(camera_type)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        layer = self.placeholder_layers.get(camera_type)
+        if layer is None:
+            layer = self.placeholder_layers[camera_type] = self.render_placeholder_background(camera_type)
+        frame = layer.copy()
         
         # Timestamp
-        cv2.putText(frame, datetime.now().strftime("%H:%M:%S"), (270, 350), 
+        cv2.putText(frame, timestamp, (270, 350), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 1)
         
         # Auto-reconnection indicator
-        if camera_type == 'pc':
-            next_attempt = int(self.reconnect_interval - (time.time() - self.last_reconnect_attempt))
-            if next_attempt > 0:
-                cv2.putText(frame, f"Reconnecting in: {next_attempt}s", (150, 400), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 1)
+        if countdown is not None:
+            cv2.putText(frame, f"Reconnecting in: {countdown}s", (150, 400), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 1)
         
-        _, buffer = cv2.imencode('.jpg', frame)
-        return buffer.tobytes()
+        frame.flags.writeable = False
+        self.placeholder_cache[camera_type] = (key, frame)
+        return frame
     
-    def generate_camera_stream(self, camera_type):
-        """Generator for camera streaming"""
-        print(f"🎬 Starting camera stream {camera_type}...")
-        
-        frame_count = 0
-        while True:
-            try:
+    def get_frame_source(self, camera_type):
+        """Return the frame-producing callable for a camera type"""
+        if camera_type == 'pc':
+            return self.get_pc_camera_frame
+        elif camera_type == 'underwater':
+            return self.get_underwater_camera_frame
+        return lambda: self.create_placeholder_frame('unknown')
+
+    def get_producer(self, camera_type):
+        """Get (or lazily create) the shared producer for a camera type"""
+        with self.producers_lock:
+            producer = self.producers.get(camera_type)
+            if producer is None:
+                broadcaster = FrameBroadcaster()
                 if camera_type == 'pc':
-                    frame = self.get_pc_camera_frame()
-                elif camera_type == 'underwater':
-                    frame = self.get_underwater_camera_frame()
+                    # Real camera: staged pipeline so inference never blocks capture
+                    producer = CameraPipeline(camera_type, self.capture_pc_frame, self.track_objects,
+                                              self.annotate_pc_frame, broadcaster,
+                                              snapshot_writer=self.event_writer,
+                                              source_paced_fn=lambda: self.cameras.get('pc_camera') is not None,
+                                              metrics=self.metrics['pc'])
                 else:
-                    frame = self.create_placeholder_frame('unknown')
-                
-                if frame:
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-                
-                frame_count += 1
-                
-                # Auto-reconnection attempt every 1000 frames if in simulated mode
-                if camera_type == 'pc' and self.mock_camera_active and frame_count % 1000 == 0:
-                    threading.Thread(target=self.attempt_camera_reconnection, daemon=True).start()
-                
-                time.sleep(0.033)  # ~30 FPS
-                
-            except Exception as e:
-                print(f"❌ Stream error for {camera_type}: {e}")
-                time.sleep(1)
+                    producer = CameraProducer(camera_type, self.get_frame_source(camera_type), broadcaster,
+                                              metrics=self.metrics.get(camera_type))
+                self.broadcasters[camera_type] = broadcaster
+                self.producers[camera_type] = producer
+            return producer
+
+    def generate_camera_stream(self, camera_type, quality=DEFAULT_JPEG_QUALITY, size=None):
+        """Generator for camera streaming (subscribes to the shared producer)"""
+        producer = self.get_producer(camera_type)
+        broadcaster = producer.broadcaster
+        encoded_cache = producer.encoded_cache
+        metrics = producer.metrics
+        viewers = broadcaster.subscribe()
+        print(f"🎬 Viewer joined camera stream {camera_type} ({viewers} active)")
+        producer.ensure_started()
+
+        last_sequence = 0
+        try:
+            while True:
+                try:
+                    sequence, frame = broadcaster.wait_for_frame(last_sequence)
+                    if sequence == last_sequence:
+                        # No new frame yet; make sure the producer is still alive
+                        producer.ensure_started()
+                        continue
+                    last_sequence = sequence
+
+                    if frame is not None:
+                        # Encoded once per (frame, quality, size); the same bytes
+                        # object is written to every multipart response
+                        data = encoded_cache.get(sequence, frame, quality, size)
+                        if data:
+                            # The generator resumes once the server has written each chunk
+                            write_started = time.perf_counter()
+                            yield b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+                            yield data
+                            yield b'\r\n'
+                            metrics.observe('stream_write', time.perf_counter() - write_started)
+
+                except Exception as e:
+                    print(f"❌ Stream error for {camera_type}: {e}")
+                    time.sleep(1)
+        finally:
+            viewers = broadcaster.unsubscribe()
+            print(f"👋 Viewer left camera stream {camera_type} ({viewers} active)")
+
+    def get_encode_cache_stats(self, camera_type):
+        """Encoded-frame cache hit/miss counters for a camera"""
+        producer = self.producers.get(camera_type)
+        return producer.encoded_cache.get_stats() if producer else EncodedFrameCache().get_stats()
+
+    def get_pipeline_stats(self, camera_type):
+        """Per-stage queue depth and drop counts (staged cameras only)"""
+        producer = self.producers.get(camera_type)
+        if producer is None or not hasattr(producer, 'get_pipeline_stats'):
+            return None
+        return producer.get_pipeline_stats()
+
+    def get_prometheus_metrics(self):
+        """Prometheus text exposition of every camera's stage metrics"""
+        metric_help = {
+            'hydracat_camera_fps': ('gauge', 'Frames published per second over the rolling window'),
+            'hydracat_camera_frames_total': ('counter', 'Frames published to viewers'),
+            'hydracat_stage_latency_seconds': ('histogram', 'Hot-path stage latency'),
+            'hydracat_stage_latency_window_seconds': ('summary', 'Hot-path stage latency over the rolling window'),
+            'hydracat_camera_viewers': ('gauge', 'Stream clients subscribed to the camera'),
+            'hydracat_camera_errors_total': ('counter', 'Camera capture / render errors'),
+            'hydracat_pipeline_dropped_total': ('counter', 'Frames dropped by a full pipeline stage queue')
+        }
+        samples = {name: [] for name in metric_help}
+        for camera_type, metrics in self.metrics.items():
+            for name, lines in metrics.render_prometheus(camera_type).items():
+                samples[name].extend(lines)
+            samples['hydracat_camera_viewers'].append(
+                f'hydracat_camera_viewers{{camera="{camera_type}"}} {self.get_viewer_count(camera_type)}')
+            errors = self.camera_stats['pc_camera' if camera_type == 'pc' else 'underwater_camera']['errors']
+            samples['hydracat_camera_errors_total'].append(f'hydracat_camera_errors_total{{camera="{camera_type}"}} {errors}')
+            for stage, stage_stats in (self.get_pipeline_stats(camera_type) or {}).items():
+                samples['hydracat_pipeline_dropped_total'].append(
+                    f'hydracat_pipeline_dropped_total{{camera="{camera_type}",stage="{stage}"}} {stage_stats["dropped"]}')
+
+        lines = []
+        for name, (metric_type, description) in metric_help.items():
+            if samples[name]:
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                lines.extend(samples[name])
+        return '\n'.join(lines) + '\n'
+
+    def get_viewer_count(self, camera_type):
+        """Number of stream clients currently subscribed to a camera"""
+        broadcaster = self.broadcasters.get(camera_type)
+        return broadcaster.subscribers if broadcaster else 0
     
     def get_camera_statistics(self, camera_type):
         """Get detailed statistics for specific camera"""
@@ -650,42 +2211,62 @@ class EnhancedCameraManager:
             'errors': stats['errors'],
             'uptime_seconds': int(uptime),
             'fps_average': round(stats['frames_captured'] / max(uptime, 1), 2),
-            'error_rate': round(stats['errors'] / max(stats['frames_captured'], 1) * 100, 2)
+            'fps_rolling': round(self.metrics['pc' if camera_type == 'pc_camera' else 'underwater'].rolling_fps(), 2),
+            'error_rate': round(stats['errors'] / max(stats['frames_captured'], 1) * 100, 2),
+            'viewers': self.get_viewer_count('pc' if camera_type == 'pc_camera' else 'underwater'),
+            'encode_cache': self.get_encode_cache_stats('pc' if camera_type == 'pc_camera' else 'underwater'),
+            'pipeline': self.get_pipeline_stats('pc' if camera_type == 'pc_camera' else 'underwater'),
+            'metrics': self.metrics['pc' if camera_type == 'pc_camera' else 'underwater'].summary()
         }
         
         # Add specific info according to type
         if camera_type == 'pc_camera':
+            reconnection = self.reconnect_supervisor.get_stats()
             base_stats.update({
-                'connection_status': 'real' if self.cameras.get('pc_camera') else 'mock' if self.mock_camera_active else 'disconnected',
-                'last_reconnect': int(time.time() - self.last_reconnect_attempt) if self.last_reconnect_attempt > 0 else 'never',
-                'next_reconnect_in': max(0, int(self.reconnect_interval - (time.time() - self.last_reconnect_attempt))) if self.mock_camera_active else 'n/a'
+                'connection_status': ('file' if isinstance(self.cameras.get('pc_camera'), FileFrameSource)
+                                      else 'real' if self.cameras.get('pc_camera') else 'mock' if self.mock_camera_active else 'disconnected'),
+                'next_reconnect_in': reconnection['next_attempt_in_s'] if reconnection['next_attempt_in_s'] is not None else 'n/a',
+                'reconnection': reconnection,
+                'inference': self.get_inference_statistics()
             })
         
         return base_stats
     
-    def get_diagnostic_info(self):
-        """Get comprehensive diagnostic information"""
+    def get_diagnostic_info(self, refresh=False):
+        """Get comprehensive diagnostic information (device state comes from the cached health probe)"""
+        device_health = self.health_monitor.get(refresh)
         return {
             'opencv_version': cv2.__version__,
             'platform': f"{platform.system()} {platform.release()}",
             'python_version': sys.version.split()[0],
-            'pc_camera_status': 'connected' if self.cameras.get('pc_camera') else 'mock' if self.mock_camera_active else 'unavailable',
+            'pc_camera_status': ('connected' if self.cameras.get('pc_camera') else 'mock' if self.mock_camera_active
+                                 else 'warming' if self.startup['state'] == 'warming' else 'unavailable'),
             'underwater_camera_status': 'simulated',
-            'available_cameras': self.scan_available_cameras(),
+            'available_cameras': device_health.pop('available_cameras'),
+            'device_health': device_health,
+            'startup': self.get_startup_status(),
             'camera_stats': {
                 'pc_camera': self.get_camera_statistics('pc_camera'),
                 'underwater_camera': self.get_camera_statistics('underwater_camera')
             },
             'system_info': {
                 'mock_mode': self.mock_camera_active,
-                'last_reconnect': self.last_reconnect_attempt,
-                'reconnect_interval': self.reconnect_interval
-            }
+                'reconnection': self.reconnect_supervisor.get_stats(),
+                'recorded_source': (self.cameras['pc_camera'].get_stats()
+                                    if isinstance(self.cameras.get('pc_camera'), FileFrameSource) else None)
+            },
+            'inference_backend': self.yolo_model.get_stats() if self.yolo_model else {'backend': None, 'state': 'loading'},
+            'event_writer': self.event_writer.get_stats(),
+            'event_store': self.event_store.get_stats()
         }
     
     def release_cameras(self):
         """Clean shutdown of all cameras"""
         print("📹 Releasing camera resources...")
+        self.health_monitor.stop()
+        self.reconnect_supervisor.stop()
+        for producer in list(self.producers.values()):
+            producer.stop()
         if self.cameras.get('pc_camera'):
             self.cameras['pc_camera'].release()
         cv2.destroyAllWindows()
@@ -697,34 +2278,217 @@ class EnhancedLiDARSystem:
     - Manages LiDAR data collection and processing
     - Provides hidden map visualization
     - Simulates real-world marine scanning
+    - Ingests the viewer's point CSV once into time-sorted NumPy columns (binary transfer)
+    - Builds voxel LOD tiers at ingest and serves the tier that fits a point budget / view extent
+    - KD-tree spatial indexes over the points (+ live scans, added incrementally) and hidden-map layers
+    - Paced time-window replay of the capture, seekable by restarting at any time
+    - Opens converted multi-GB captures lazily (memory-mapped) and slices them by time or space
     """
     
-    def __init__(self):
+    def __init__(self, points_path=LIDAR_POINTS_PATH, capture_dir=LIDAR_CAPTURE_DIR):
         self.hidden_map_data = self.generate_hidden_map_data()
         self.scan_history = []
         self.classified_objects = []
         self.generate_initial_scan_data()
+
+        # Point cloud state (loaded on first request)
+        self.points_path = points_path
+        self.points_lock = threading.Lock()
+        self.point_cloud = None
+        self.point_cloud_key = None  # (mtime, size) of the ingested file
+        self.point_lod = None
+        self.point_buffers = OrderedDict()  # (tier, budget) -> encoded binary, most recent last
+        self.point_cloud_load_ms = None
+
+        # Converted captures (python lidar_data.py convert ...), memory-mapped on first use
+        self.capture_dir = capture_dir
+        self.captures = {}  # name -> (meta.json mtime, PointCapture)
+
+        # Spatial indexes: 2-D per hidden-map layer, 3-D over points + live scans (built on first query)
+        self.feature_index = self.build_feature_index()
+        self.index_lock = threading.Lock()
+        self.point_index = None
+        self.point_index_key = None
+        self.scan_batches = []  # live scan positions, re-added whenever the point index is rebuilt
+
+    def get_point_cloud(self):
+        """Time-sorted point cloud from points_path, or None when the file is missing / invalid"""
+        with self.points_lock:
+            try:
+                stat = os.stat(self.points_path)
+            except OSError:
+                return None
+            key = (stat.st_mtime_ns, stat.st_size)
+            if key != self.point_cloud_key:
+                started = time.perf_counter()
+                try:
+                    cloud = load_point_csv(self.points_path)
+                except (OSError, ValueError) as e:
+                    print(f"❌ LiDAR point file {self.points_path} rejected: {e}")
+                    return self.point_cloud
+                self.point_cloud = cloud
+                self.point_lod = PointCloudLOD(cloud)
+                self.point_buffers.clear()
+                self.point_cloud_key = key
+                self.point_cloud_load_ms = (time.perf_counter() - started) * 1000
+                tiers = ', '.join(f"{tier['voxel_size']}m: {tier['points']:,}" for tier in self.point_lod.get_stats()[:-1])
+                print(f"🛰️  LiDAR points ingested: {len(cloud):,} points from {self.points_path} "
+                      f"in {self.point_cloud_load_ms:.0f}ms (LOD {tiers})")
+            return self.point_cloud
+
+    def get_point_buffer(self, budget=DEFAULT_POINT_BUDGET, extent=None):
+        """(binary buffer, etag, tier info) of the LOD tier for a budget / extent, or (None, None, None)"""
+        if self.get_point_cloud() is None:
+            return None, None, None
+        with self.points_lock:
+            tier, cloud = self.point_lod.select(budget, extent)
+            # Budgets above the tier size all share one buffer
+            cache_key = (tier, min(budget, len(self.point_lod.tiers[tier][1])))
+            binary = self.point_buffers.get(cache_key)
+            if binary is None:
+                binary = self.point_buffers[cache_key] = cloud.to_binary()
+                while len(self.point_buffers) > 8:
+                    self.point_buffers.popitem(last=False)
+            self.point_buffers.move_to_end(cache_key)
+            voxel_size, tier_cloud = self.point_lod.tiers[tier]
+            info = {'tier': tier, 'voxel_size': voxel_size, 'points': len(cloud),
+                    'tier_points': len(tier_cloud), 'total_points': len(self.point_cloud)}
+            etag = f"{self.point_cloud_key[0]}-{self.point_cloud_key[1]}-{cache_key[0]}-{cache_key[1]}"
+            return binary, etag, info
+
+    def get_point_cloud_stats(self):
+        """Ingest state of the point cloud (does not trigger a load)"""
+        cloud = self.point_cloud
+        if cloud is None:
+            return {'loaded': False, 'path': self.points_path}
+        index = self.point_index
+        return dict(cloud.get_stats(), loaded=True, load_ms=round(self.point_cloud_load_ms, 1),
+                    lod=self.point_lod.get_stats(), cached_buffers=len(self.point_buffers),
+                    spatial_index=index.get_stats() if index is not None else None)
+
+    def stream_replay(self, source, start, end, speed=1.0, chunk_seconds=REPLAY_CHUNK_SECONDS,
+                      max_points=REPLAY_CHUNK_POINTS):
+        """
+        Paced replay generator: one binary point buffer per chunk_seconds of capture time
+        - source: the ingested PointCloud or a memory-mapped PointCapture (same time_slice / next_time API)
+        - Windows are found by binary search / zone map, so memory stays one chunk regardless of capture length
+        - Each chunk is sent REPLAY_LEAD seconds before it plays; a slow reader blocks the generator
+        - Empty windows (gaps in the capture) are skipped instead of waited out
+        """
+        wall_start = time.perf_counter()
+        skipped = 0.0  # capture seconds of skipped gaps, not paced
+        cursor = start
+        while cursor <= end:
+            window_end = cursor + chunk_seconds
+            last = window_end >= end  # the final window includes end itself
+            window = source.time_slice(cursor, np.nextafter(end, np.inf) if last else window_end, max_points)
+            if not len(window):
+                # Jump to the next point rather than streaming an idle gap
+                next_time = source.next_time(cursor)
+                if next_time is None:
+                    break
+                skipped += next_time - cursor
+                cursor = next_time
+                continue
+
+            delay = wall_start + (cursor - start - skipped) / speed - REPLAY_LEAD - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            yield window.to_binary()
+            if last:
+                break
+            cursor = window_end
+
+    def list_captures(self):
+        """Metadata of the converted captures in capture_dir (nothing is memory-mapped)"""
+        captures = []
+        if os.path.isdir(self.capture_dir):
+            for name in sorted(os.listdir(self.capture_dir)):
+                try:
+                    with open(os.path.join(self.capture_dir, name, 'meta.json')) as handle:
+                        meta = json.load(handle)
+                except (OSError, ValueError):
+                    continue
+                captures.append(dict(meta, name=name, open=name in self.captures))
+        return captures
+
+    def get_capture(self, name):
+        """Memory-mapped capture by directory name (opened on first use), or None"""
+        if not name or name.startswith('.') or os.path.basename(name) != name:
+            return None
+        path = os.path.join(self.capture_dir, name)
+        try:
+            key = os.stat(os.path.join(path, 'meta.json')).st_mtime_ns
+        except OSError:
+            return None
+        with self.points_lock:
+            cached = self.captures.get(name)
+            if cached is None or cached[0] != key:
+                try:
+                    cached = self.captures[name] = (key, PointCapture(path))
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"❌ LiDAR capture {path} rejected: {e}")
+                    return None
+                print(f"🗄️  LiDAR capture opened: {name} ({len(cached[1]):,} points, memory-mapped)")
+            return cached[1]
+
+    def build_feature_index(self):
+        """2-D spatial index per hidden-map layer (the bathymetry raster indexes itself by grid arithmetic)"""
+        indexes = {'bathymetry': self.hidden_map_data['bathymetry']}
+        for layer in MAP_FEATURE_LAYERS:
+            if layer not in indexes:
+                indexes[layer] = SpatialIndex(dims=2)
+                indexes[layer].add([(item['x'], item['y']) for item in self.hidden_map_data[layer]])
+        return indexes
+
+    def get_features(self, layer, ids):
+        """Records of a hidden-map layer by spatial-index id (list position, or bathymetry cell)"""
+        if layer == 'bathymetry':
+            return self.hidden_map_data['bathymetry'].cells(ids)
+        items = self.hidden_map_data[layer]
+        return [items[i] for i in ids]
+
+    def get_point_index(self):
+        """
+        3-D index over the ingested cloud plus live scans (rebuilt when the point file changes)
+        Ids below len(point_cloud) are positions in the time-sorted cloud; higher ids are scan points in arrival order
+        """
+        cloud = self.get_point_cloud()
+        key = self.point_cloud_key if cloud is not None else None
+        with self.index_lock:
+            if self.point_index is None or key != self.point_index_key:
+                started = time.perf_counter()
+                index = SpatialIndex(dims=3)
+                if cloud is not None:
+                    index.add(cloud.positions)
+                for batch in self.scan_batches:
+                    index.add(batch)
+                self.point_index, self.point_index_key = index, key
+                print(f"🗂️  LiDAR spatial index built: {len(index):,} points "
+                      f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+            return self.point_index
+
+    def add_scan_points(self, positions):
+        """Index a new scan's (N, 3) positions incrementally; returns their point ids"""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        self.get_point_index()
+        with self.index_lock:
+            self.scan_batches.append(positions)
+            return self.point_index.add(positions)
     
     def generate_hidden_map_data(self):
         """Generate comprehensive hidden map data for the area"""
         # Generate a realistic underwater topography map
         map_data = {
-            'bathymetry': [],  # Depth measurements
+            'bathymetry': None,  # Depth raster (bathymetry.py)
             'structures': [],  # Underwater structures
             'hazards': [],     # Navigation hazards
             'wildlife_zones': [], # Known wildlife areas
             'scan_grid': []    # Regular scanning grid
         }
         
-        # Generate bathymetry data (depth measurements)
-        for i in range(-100, 101, 10):  # 200m x 200m area
-            for j in range(-100, 101, 10):
-                depth = abs(20 + 15 * np.sin(i/50) + 10 * np.cos(j/30) + random.uniform(-3, 3))
-                map_data['bathymetry'].append({
-                    'x': i, 'y': j, 'depth': round(depth, 1),
-                    'sediment_type': random.choice(['sand', 'rock', 'coral', 'mud']),
-                    'last_scan': datetime.now() - timedelta(minutes=random.randint(1, 120))
-                })
+        # Bathymetry raster (depth / sediment grids, array-generated) with its z/x/y tile pyramid
+        map_data['bathymetry'] = BathymetryRaster.generate()
         
         # Generate underwater structures
         structures = [
@@ -847,13 +2611,17 @@ class EnhancedLiDARSystem:
     def get_hidden_map_data(self):
         """Return comprehensive hidden map data"""
         return {
-            'map_data': self.hidden_map_data,
+            'map_data': dict(self.hidden_map_data, bathymetry=self.get_bathymetry_summary()),
             'current_scan': self.get_current_scan_data(),
             'classified_objects': self.classified_objects,
             'scan_statistics': self.get_scan_statistics(),
             'threat_assessment': self.get_threat_assessment()
         }
     
+    def get_bathymetry_summary(self):
+        """Bathymetry raster summary; its cells are served as binary tiles, not JSON"""
+        return dict(self.hidden_map_data['bathymetry'].get_summary(), tiles='/api/lidar/bathymetry/tiles/{z}/{x}/{y}')
+    
     def get_current_scan_data(self):
         """Generate current real-time scan data"""
         return {
@@ -1014,6 +2782,214 @@ class MarineDetectionSystem:
         
         return updated_detections
 
+class DashboardPublisher:
+    """
+    Shared server-push publisher for every open dashboard (Server-Sent Events)
+    - One background thread rebuilds the dashboard payloads once per tick
+    - Only changed sections (or changed keys of dict sections) go out as a delta;
+      volatile fields (build metadata) are left out of the comparison and ride along with
+      real changes, or are pushed on their own once volatile_max_age has passed
+    - Each event is serialized once and the same string is written to every subscriber
+    - New or lagging subscribers get a full snapshot instead of the delta
+    - The same tick also backs the /api/dashboard snapshot (JSON body + ETag)
+    - Idles while no dashboard is connected; snapshot requests then rebuild at most once per interval
+    """
+
+    def __init__(self, sections, interval=DASHBOARD_PUSH_INTERVAL, volatile=None,
+                 volatile_max_age=DASHBOARD_VOLATILE_MAX_AGE):
+        self.sections = sections  # section name -> callable building its payload
+        self.volatile = volatile or {}  # section name -> keys ignored when comparing
+        self.volatile_max_age = volatile_max_age
+        self.published_at = 0.0
+        self.interval = interval
+        self.epoch = str(int(time.time()))  # event ids from a previous process never match
+        self.condition = threading.Condition()
+        self.state = {}
+        self.version = 0
+        self.snapshot_message = None
+        self.delta_message = None
+        self.snapshot_body = None
+        self.last_tick = 0.0
+        self.tick_lock = threading.Lock()
+        self.subscribers = 0
+        self.running = False
+        self.thread = None
+        self.wake_event = threading.Event()
+        self.lock = threading.Lock()
+        self.stats = {'ticks': 0, 'published': 0, 'unchanged_ticks': 0, 'build_errors': 0,
+                      'last_build_ms': 0.0, 'last_delta_bytes': 0, 'snapshot_bytes': 0,
+                      'snapshot_requests': 0, 'not_modified': 0}
+
+    def ensure_started(self):
+        """Start the publisher thread on first use and wake it if idle"""
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.running = True
+                self.thread = threading.Thread(target=self._run, name="dashboard-publisher", daemon=True)
+                self.thread.start()
+                print("📡 Dashboard publisher started")
+        self.wake_event.set()
+
+    def stop(self, timeout=2.0):
+        """Stop the publisher thread"""
+        self.running = False
+        self.wake_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def subscribe(self):
+        with self.condition:
+            self.subscribers += 1
+            return self.subscribers
+
+    def unsubscribe(self):
+        with self.condition:
+            self.subscribers = max(0, self.subscribers - 1)
+            return self.subscribers
+
+    def _run(self):
+        while self.running:
+            if self.subscribers == 0:
+                self.wake_event.clear()
+                self.wake_event.wait(1.0)
+                continue
+            # A snapshot request may already have rebuilt this tick
+            self.refresh(max_age=self.interval * 0.9)
+            remaining = self.interval - (time.time() - self.last_tick)
+            time.sleep(max(remaining, 0.05))
+
+    def build_state(self):
+        """Build every section once; a failing section keeps its previous value"""
+        state = {}
+        for name, build in self.sections.items():
+            try:
+                state[name] = build()
+            except Exception as e:
+                print(f"❌ Dashboard section {name} failed: {e}")
+                self.stats['build_errors'] += 1
+                if name in self.state:
+                    state[name] = self.state[name]
+        return state
+
+    @staticmethod
+    def _stable(value, keys):
+        """Section value without its volatile keys (in a dict or in the dicts of a list)"""
+        if not keys:
+            return value
+        if isinstance(value, dict):
+            return {key: item for key, item in value.items() if key not in keys}
+        if isinstance(value, list):
+            return [DashboardPublisher._stable(item, keys) if isinstance(item, dict) else item for item in value]
+        return value
+
+    @staticmethod
+    def diff(old, new, volatile=None):
+        """Change-only delta: whole sections under 'set', changed dict keys under 'merge'"""
+        volatile = volatile or {}
+        delta = {'set': {}, 'merge': {}}
+        for name, value in new.items():
+            previous = old.get(name)
+            keys = volatile.get(name, ())
+            if DashboardPublisher._stable(previous, keys) == DashboardPublisher._stable(value, keys):
+                continue
+            if isinstance(value, dict) and isinstance(previous, dict) and previous.keys() == value.keys():
+                delta['merge'][name] = {key: item for key, item in value.items()
+                                        if key in keys or previous[key] != item}
+            else:
+                delta['set'][name] = value
+        return {kind: sections for kind, sections in delta.items() if sections}
+
+    def _message(self, event, version, payload):
+        data = json.dumps(payload, separators=(',', ':'), default=str)
+        return f"id: {self.epoch}-{version}\nevent: {event}\ndata: {data}\n\n"
+
+    def refresh(self, max_age):
+        """Tick unless the current state is younger than max_age seconds"""
+        with self.tick_lock:
+            if self.version and time.time() - self.last_tick < max_age:
+                return False
+            return self._tick()
+
+    def tick(self):
+        """Rebuild the payloads and publish a delta if anything changed"""
+        with self.tick_lock:
+            return self._tick()
+
+    def _tick(self):
+        self.last_tick = time.time()
+        started = time.perf_counter()
+        # Round-trip through JSON so the comparison sees exactly what clients see
+        state = json.loads(json.dumps(self.build_state(), default=str))
+        self.stats['ticks'] += 1
+        self.stats['last_build_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+        delta = self.diff(self.state, state, self.volatile)
+        if not delta and self.version and self.last_tick - self.published_at >= self.volatile_max_age:
+            # Only build metadata changed: still refresh it on a bounded cadence
+            delta = self.diff(self.state, state)
+        if not delta:
+            self.stats['unchanged_ticks'] += 1
+            return False
+
+        with self.condition:
+            version = self.version + 1
+            self.delta_message = self._message('delta', version, delta)
+            self.snapshot_message = self._message('snapshot', version, {'set': state})
+            self.snapshot_body = json.dumps(dict(state, version=version), separators=(',', ':')).encode()
+            self.state = state
+            self.version = version
+            self.published_at = self.last_tick
+            self.condition.notify_all()
+        self.stats['published'] += 1
+        self.stats['last_delta_bytes'] = len(self.delta_message)
+        self.stats['snapshot_bytes'] = len(self.snapshot_message)
+        return True
+
+    def wait_for_update(self, last_version, timeout=DASHBOARD_KEEPALIVE):
+        """Block until a version newer than last_version exists (or timeout)"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != last_version, timeout)
+            return self.version, self.snapshot_message, self.delta_message
+
+    def stream(self, last_event_id=None):
+        """SSE generator for one dashboard: snapshot first, then deltas and keep-alives"""
+        viewers = self.subscribe()
+        print(f"📡 Dashboard subscribed to updates ({viewers} active)")
+        self.ensure_started()
+
+        # A reconnecting EventSource that is already up to date needs no snapshot
+        last_version = 0
+        epoch, _, version = (last_event_id or '').partition('-')
+        if epoch == self.epoch and version.isdigit() and int(version) == self.version:
+            last_version = self.version
+        try:
+            yield f"retry: {int(self.interval * 1000)}\n\n"
+            while True:
+                version, snapshot, delta = self.wait_for_update(last_version)
+                if version == last_version or snapshot is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield delta if last_version and version == last_version + 1 else snapshot
+                last_version = version
+        finally:
+            viewers = self.unsubscribe()
+            print(f"📡 Dashboard unsubscribed ({viewers} active)")
+
+    @property
+    def etag(self):
+        return f"{self.epoch}-{self.version}"
+
+    def get_snapshot(self):
+        """Current (etag, JSON body); every client in the same tick shares both"""
+        self.refresh(max_age=self.interval)
+        with self.condition:
+            self.stats['snapshot_requests'] += 1
+            return self.etag, self.snapshot_body
+
+    def get_stats(self):
+        """Publisher counters for diagnostics"""
+        return dict(self.stats, subscribers=self.subscribers, version=self.version, interval_s=self.interval)
+
 # Initialize system components
 camera_manager = EnhancedCameraManager()
 detection_system = MarineDetectionSystem()
@@ -1033,10 +3009,21 @@ def video_feed(camera_type):
     """
     Live video streaming endpoint
     Supports: 'pc' for laptop camera, 'underwater' for simulated camera
+    Optional query params: ?quality=10-95&width=...&height=... (JPEG settings)
     """
     if camera_type in ['pc', 'underwater']:
+        quality = max(10, min(95, request.args.get('quality', DEFAULT_JPEG_QUALITY, type=int)))
+        width = request.args.get('width', type=int)
+        height = request.args.get('height', type=int)
+        size = None
+        if width or height:
+            # Keep the 4:3 aspect ratio of the 640x480 feeds when only one side is given
+            width = width or int(height * 4 / 3)
+            height = height or int(width * 3 / 4)
+            size = (max(16, min(1920, width)), max(16, min(1440, height)))
+
         return Response(
-            camera_manager.generate_camera_stream(camera_type),
+            camera_manager.generate_camera_stream(camera_type, quality, size),
             mimetype='multipart/x-mixed-replace; boundary=frame'
         )
     else:
@@ -1065,9 +3052,8 @@ def api_current_time():
         'timestamp': datetime.now().isoformat()
     })
 
-@app.route('/api/stats')
-def api_system_stats():
-    """Get overall system statistics"""
+def build_system_stats():
+    """Overall system statistics payload (shared by /api/stats and the dashboard push)"""
     stats = detection_system.system_stats.copy()
     
     # Dynamic updates
@@ -1076,8 +3062,12 @@ def api_system_stats():
     stats['active_alerts'] = max(0, stats['active_alerts'] + random.randint(-1, 1))
     stats['system_uptime'] = round(random.uniform(98.5, 99.9), 1)
     stats['last_updated'] = datetime.now().isoformat()
-    
-    return jsonify(stats)
+    return stats
+
+@app.route('/api/stats')
+def api_system_stats():
+    """Get overall system statistics"""
+    return jsonify(build_system_stats())
 
 @app.route('/api/detections')
 def api_detections():
@@ -1089,9 +3079,8 @@ def api_activity_log():
     """Get recent system activity log"""
     return jsonify(detection_system.activity_log[:20])
 
-@app.route('/api/camera/<int:camera_id>/stats')
-def api_camera_stats(camera_id):
-    """Get detailed statistics for specific camera"""
+def build_camera_stats(camera_id):
+    """Detailed statistics payload for one camera (None for an unknown camera)"""
     if camera_id == 1:  # PC Camera
         pc_camera_connected = camera_manager.cameras.get('pc_camera') is not None
         pc_camera_mock = camera_manager.mock_camera_active
@@ -1124,7 +3113,12 @@ def api_camera_stats(camera_id):
                 'uptime_seconds': detailed_stats['uptime_seconds'],
                 'error_rate': detailed_stats['error_rate'],
                 'connection_status': detailed_stats.get('connection_status', 'unknown'),
-                'next_reconnect_in': detailed_stats.get('next_reconnect_in', 'n/a')
+                'next_reconnect_in': detailed_stats.get('next_reconnect_in', 'n/a'),
+                'viewers': detailed_stats['viewers'],
+                'pipeline': detailed_stats['pipeline'],
+                'inference': detailed_stats['inference'],
+                'reconnection': detailed_stats['reconnection'],
+                'metrics': detailed_stats['metrics']
             })
         else:
             base_stats.update({
@@ -1135,11 +3129,11 @@ def api_camera_stats(camera_id):
                 'error_rate': 100
             })
             
-        return jsonify(base_stats)
+        return base_stats
         
     elif camera_id == 2:  # Underwater camera
         underwater_stats = camera_manager.get_camera_statistics('underwater_camera')
-        return jsonify({
+        return {
             'camera_name': 'Underwater Camera',
             'camera_type': 'Simulated',
             'connected': True,
@@ -1151,21 +3145,137 @@ def api_camera_stats(camera_id):
             'frames_processed': underwater_stats['frames_captured'] if underwater_stats else 0,
             'uptime_seconds': underwater_stats['uptime_seconds'] if underwater_stats else 0,
             'error_rate': underwater_stats['error_rate'] if underwater_stats else 0,
+            'viewers': underwater_stats['viewers'] if underwater_stats else 0,
+            'metrics': underwater_stats['metrics'] if underwater_stats else None,
             'depth': f"{random.randint(12, 18)}.{random.randint(0, 9)}m",
             'water_clarity': f"{random.randint(70, 90)}%",
             'temperature': f"{random.randint(8, 14)}°C"
-        })
+        }
+    return None
+
+@app.route('/api/camera/<int:camera_id>/stats')
+def api_camera_stats(camera_id):
+    """Get detailed statistics for specific camera"""
+    stats = build_camera_stats(camera_id)
+    if stats is None:
+        return jsonify({'error': 'Camera not found'}), 404
+    return jsonify(stats)
+
+def build_dashboard_camera(camera_id):
+    """The camera fields shown on the dashboard"""
+    stats = build_camera_stats(camera_id)
+    return {field: stats[field] for field in DASHBOARD_CAMERA_FIELDS if field in stats}
+
+# One publisher builds the dashboard payloads per tick for every open dashboard
+dashboard_publisher = DashboardPublisher({
+    'stats': build_system_stats,
+    'detections': detection_system.get_updated_detections,
+    'activity': lambda: detection_system.activity_log[:20],
+    'camera_1': lambda: build_dashboard_camera(1),
+    'camera_2': lambda: build_dashboard_camera(2),
+    'cameras': lambda: build_cameras_status()
+}, volatile=DASHBOARD_VOLATILE_FIELDS)
+
+@app.route('/api/dashboard')
+def api_dashboard_snapshot():
+    """
+    Combined dashboard snapshot (stats, detections, activity, camera status)
+    Built once per update tick and shared by every client; If-None-Match returns 304
+    503 until a first snapshot could be built
+    """
+    etag, body = dashboard_publisher.get_snapshot()
+    if body is None:
+        return jsonify({'error': 'Dashboard data not available yet'}), 503
+    if request.if_none_match.contains(etag):
+        dashboard_publisher.stats['not_modified'] += 1
+        response = Response(status=304)
     else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/dashboard/stream')
+def api_dashboard_stream():
+    """Server-Sent Events: a snapshot, then change-only deltas of the dashboard payloads"""
+    return Response(dashboard_publisher.stream(request.headers.get('Last-Event-ID')),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/camera/<int:camera_id>/pipeline')
+def api_camera_pipeline(camera_id):
+    """Get per-stage queue depth and drop counts for a camera pipeline"""
+    camera_types = {1: 'pc', 2: 'underwater'}
+    if camera_id not in camera_types:
         return jsonify({'error': 'Camera not found'}), 404
 
-@app.route('/api/cameras/status')
-def api_all_cameras_status():
-    """Get status overview of all cameras"""
+    camera_type = camera_types[camera_id]
+    return jsonify({
+        'camera_id': camera_id,
+        'staged': camera_type == 'pc',
+        'viewers': camera_manager.get_viewer_count(camera_type),
+        'stages': camera_manager.get_pipeline_stats(camera_type) or {},
+        'encode_cache': camera_manager.get_encode_cache_stats(camera_type)
+    })
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Per-camera stage latency histograms and rolling fps in Prometheus text format"""
+    return Response(camera_manager.get_prometheus_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/events')
+def api_events():
+    """Query red-zone events (newest first) with time, camera, zone and class filters"""
+    args = request.args
+    # Accept ISO timestamps ("2025-10-15T21:00:00") as well as the log format
+    start = args.get('start', '').replace('T', ' ') or None
+    end = args.get('end', '').replace('T', ' ') or None
+    started = time.perf_counter()
+    try:
+        events, next_cursor = camera_manager.event_store.query(
+            start=start, end=end,
+            camera=args.get('camera'), zone=args.get('zone'),
+            class_name=args.get('class'), kind=args.get('kind'),
+            limit=args.get('limit', 50, type=int), cursor=args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid query: {e}'}), 400
+
+    return jsonify({
+        'events': events,
+        'count': len(events),
+        'next_cursor': next_cursor,
+        'query_ms': round((time.perf_counter() - started) * 1000, 2)
+    })
+
+@app.route('/api/camera/<int:camera_id>/zones', methods=['GET', 'PUT'])
+def api_camera_zones(camera_id):
+    """Get or replace the named polygon zones of a camera"""
+    if camera_id != 1:  # Only the PC camera runs detection
+        return jsonify({'error': 'Camera not found'}), 404
+
+    if request.method == 'PUT':
+        payload = request.get_json(silent=True)
+        zones = payload.get('zones') if isinstance(payload, dict) else payload
+        if not isinstance(zones, list):
+            return jsonify({'error': 'Expected a list of zones'}), 400
+        try:
+            camera_manager.set_zones(zones, persist=request.args.get('persist') == '1')
+        except (ValueError, TypeError, AttributeError) as e:
+            return jsonify({'error': f'Invalid zone definition: {e}'}), 400
+
+    return jsonify({
+        'camera_id': camera_id,
+        'zones': camera_manager.zone_map.to_config(),
+        'occupied': camera_manager.zone_map.occupied_zones()
+    })
+
+def build_cameras_status():
+    """Status overview payload of all cameras"""
     pc_real = camera_manager.cameras.get('pc_camera') is not None
     pc_mock = camera_manager.mock_camera_active
     pc_status = 'online' if pc_real else 'mock' if pc_mock else 'offline'
     
-    return jsonify({
+    return {
         'total_cameras': 2,
         'active_cameras': 2,
         'cameras': {
@@ -1186,12 +3296,18 @@ def api_all_cameras_status():
                 'mode': 'simulation'
             }
         }
-    })
+    }
+
+@app.route('/api/cameras/status')
+def api_all_cameras_status():
+    """Get status overview of all cameras"""
+    return jsonify(build_cameras_status())
 
 @app.route('/api/camera/diagnostics')
 def api_camera_diagnostics():
     """Get comprehensive camera diagnostic information"""
-    return jsonify(camera_manager.get_diagnostic_info())
+    # Served from the background device probe; ?refresh=1 re-probes (rate-limited)
+    return jsonify(camera_manager.get_diagnostic_info(refresh=request.args.get('refresh') == '1'))
 
 @app.route('/api/lidar')
 def api_lidar_stats():
@@ -1207,7 +3323,222 @@ def api_lidar_stats():
         'accuracy': f"{random.uniform(95, 99):.1f}%",
         'power_consumption': f"{random.uniform(45, 55):.1f}W",
         'temperature': f"{random.randint(35, 42)}°C",
-        'last_calibration': (datetime.now() - timedelta(hours=2)).strftime('%H:%M:%S')
+        'last_calibration': (datetime.now() - timedelta(hours=2)).strftime('%H:%M:%S'),
+        'point_cloud': lidar_system.get_point_cloud_stats()
+    })
+
+@app.route('/api/lidar/points')
+def api_lidar_points():
+    """
+    Time-sorted LiDAR points as one binary buffer for the 3D viewer
+    48-byte header + Float32 positions / intensity / time columns (layout in lidar_data.py)
+    Optional query params: ?budget=<max points>&extent=<visible width in metres> pick the LOD tier
+    """
+    budget = max(1, request.args.get('budget', DEFAULT_POINT_BUDGET, type=int))
+    extent = request.args.get('extent', type=float)
+    if extent is not None and not (np.isfinite(extent) and extent > 0):
+        return jsonify({'error': 'extent must be a positive number of metres'}), 400
+    buffer, etag, tier = lidar_system.get_point_buffer(budget, extent)
+    if buffer is None:
+        return jsonify({'error': 'No LiDAR point file', 'path': lidar_system.points_path}), 404
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(buffer, mimetype='application/octet-stream')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-LOD-Tier'] = str(tier['tier'])
+    response.headers['X-LOD-Voxel-Size'] = str(tier['voxel_size'])
+    response.headers['X-Total-Points'] = str(tier['total_points'])
+    return response
+
+def get_replay_source():
+    """(source, error response) for ?capture=<name> (memory-mapped) or the ingested point file"""
+    name = request.args.get('capture')
+    if name:
+        capture = lidar_system.get_capture(name)
+        if capture is None:
+            return None, (jsonify({'error': f"Unknown capture '{name}'", 'capture_dir': lidar_system.capture_dir}), 404)
+        return capture, None
+    cloud = lidar_system.get_point_cloud()
+    if cloud is None:
+        return None, (jsonify({'error': 'No LiDAR point file', 'path': lidar_system.points_path}), 404)
+    return cloud, None
+
+def parse_time_window(capture_start, capture_end):
+    """(start, end) from ?start=&end= (seconds since midnight or H:M:S), clamped to the capture; raises ValueError"""
+    start = parse_time_value(request.args.get('start', str(capture_start)))
+    end = parse_time_value(request.args.get('end', str(capture_end)))
+    if not (np.isfinite(start) and np.isfinite(end)) or start > end:
+        raise ValueError('start / end must be capture times with start <= end')
+    return max(start, capture_start), min(end, capture_end)
+
+@app.route('/api/lidar/replay')
+def api_lidar_replay():
+    """
+    Paced replay of the capture: a stream of binary point buffers, one per time window (layout in lidar_data.py)
+    ?start=&end= capture time (seconds since midnight or H:M:S, default the whole capture); seek by reconnecting
+    ?speed=<playback multiplier>&chunk=<capture seconds per buffer>&points=<max points per buffer>
+    ?capture=<name> replays a converted capture instead of the point file
+    """
+    source, error = get_replay_source()
+    if error:
+        return error
+
+    capture_start, capture_end = source.time_bounds()
+    speed = request.args.get('speed', 1.0, type=float)
+    chunk = request.args.get('chunk', REPLAY_CHUNK_SECONDS, type=float)
+    points = request.args.get('points', REPLAY_CHUNK_POINTS, type=int)
+    try:
+        start, end = parse_time_window(capture_start, capture_end)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not (speed and 0.1 <= speed <= 1000 and chunk and 0.05 <= chunk <= 60 and points and points >= 1):
+        return jsonify({'error': 'speed must be 0.1-1000, chunk 0.05-60 seconds, points >= 1'}), 400
+
+    return Response(lidar_system.stream_replay(source, start, end, speed, chunk, min(points, REPLAY_CHUNK_POINTS)),
+                    mimetype='application/octet-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no',
+                             'X-Capture-Start': str(capture_start), 'X-Capture-End': str(capture_end),
+                             'X-Replay-Start': str(start), 'X-Replay-End': str(end)})
+
+@app.route('/api/lidar/captures')
+def api_lidar_captures():
+    """Converted captures available for lazy, memory-mapped slicing (metadata and conversion report)"""
+    return jsonify({'capture_dir': lidar_system.capture_dir, 'captures': lidar_system.list_captures()})
+
+@app.route('/api/lidar/captures/<name>/points')
+def api_lidar_capture_points(name):
+    """
+    Time and/or space slice of a converted capture as one binary point buffer (layout in lidar_data.py)
+    ?start=&end= capture time, ?bbox=minx,miny,minz,maxx,maxy,maxz, ?points=<max points> (strided down)
+    Only the rows (time-sorted captures) or zone-map blocks overlapping the time window are read from
+    disk; the box is filtered block by block over those, keeping at most 2 * points hits in memory
+    """
+    capture = lidar_system.get_capture(name)
+    if capture is None:
+        return jsonify({'error': f"Unknown capture '{name}'", 'capture_dir': lidar_system.capture_dir}), 404
+
+    max_points = min(max(1, request.args.get('points', DEFAULT_POINT_BUDGET, type=int)), DEFAULT_POINT_BUDGET)
+    started = time.perf_counter()
+    try:
+        start, end = parse_time_window(*capture.time_bounds())
+        if 'bbox' in request.args:
+            box = [float(value) for value in request.args['bbox'].split(',')]
+            if len(box) != 6:
+                raise ValueError('bbox needs 6 comma-separated numbers')
+            cloud = capture.slice(start, np.nextafter(end, np.inf), box[:3], box[3:], max_points)
+        else:
+            cloud = capture.time_slice(start, np.nextafter(end, np.inf), max_points)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = Response(cloud.to_binary(), mimetype='application/octet-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Total-Points'] = str(len(capture))
+    response.headers['X-Slice-Ms'] = f"{(time.perf_counter() - started) * 1000:.1f}"
+    return response
+
+@app.route('/api/lidar/lod')
+def api_lidar_lod():
+    """LOD tiers of the point cloud (voxel size and point count) and the cloud extent"""
+    if lidar_system.get_point_cloud() is None:
+        return jsonify({'error': 'No LiDAR point file', 'path': lidar_system.points_path}), 404
+    return jsonify(lidar_system.get_point_cloud_stats())
+
+def run_spatial_query(index, args, limit):
+    """Bounding-box / radius / k-nearest query from request args -> (query, ids, points, distances or None)"""
+    dims = index.dims
+
+    def coordinates(name, count):
+        try:
+            values = [float(value) for value in args.get(name, '').split(',')]
+        except ValueError:
+            values = []
+        if len(values) != count or not np.all(np.isfinite(values)):
+            raise ValueError(f"{name} needs {count} comma-separated numbers")
+        return values
+
+    if 'bbox' in args:
+        box = coordinates('bbox', 2 * dims)
+        ids, points = index.query_bbox(box[:dims], box[dims:], limit)
+        return {'type': 'bbox', 'min': box[:dims], 'max': box[dims:]}, ids, points, None
+
+    if 'center' not in args:
+        raise ValueError('Give bbox=..., center=...&radius=... or center=...&k=...')
+    center = coordinates('center', dims)
+    if 'radius' in args:
+        radius = args.get('radius', type=float)
+        if radius is None or not 0 <= radius < np.inf:
+            raise ValueError('radius must be a non-negative number')
+        ids, points, distances = index.query_radius(center, radius, limit)
+        return {'type': 'radius', 'center': center, 'radius': radius}, ids, points, distances
+    k = args.get('k', type=int)
+    if k is None or k < 1:
+        raise ValueError('k must be a positive integer (or give radius)')
+    k = min(k, limit)
+    ids, points, distances = index.query_knn(center, k)
+    return {'type': 'knn', 'center': center, 'k': k}, ids, points, distances
+
+@app.route('/api/lidar/query')
+def api_lidar_query():
+    """
+    Spatial query over LiDAR points or a hidden-map layer (KD-tree index, sub-linear in cloud size)
+    ?layer=points (default, x,y,z) or bathymetry|structures|hazards|wildlife_zones|scan_grid (x,y, requires access key)
+    ?bbox=minx,miny[,minz],maxx,maxy[,maxz] | ?center=x,y[,z]&radius=<metres> | ?center=x,y[,z]&k=<count>
+    e.g. hazards within 50 m of a detection: ?layer=hazards&center=12,-40&radius=50&access_key=...
+    """
+    layer = request.args.get('layer', 'points')
+    if layer != 'points' and layer not in MAP_FEATURE_LAYERS:
+        return jsonify({'error': f"Unknown layer '{layer}'", 'layers': ['points', *MAP_FEATURE_LAYERS]}), 400
+    if layer != 'points' and request.args.get('access_key', '') != 'MARINE_CLASSIFIED_2024':
+        return jsonify({'error': 'Unauthorized access', 'code': 'ACCESS_DENIED'}), 403
+
+    limit = min(max(1, request.args.get('limit', SPATIAL_QUERY_LIMIT, type=int)), SPATIAL_QUERY_LIMIT)
+    index = lidar_system.get_point_index() if layer == 'points' else lidar_system.feature_index[layer]
+    started = time.perf_counter()
+    try:
+        query, ids, points, distances = run_spatial_query(index, request.args, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    result = {
+        'layer': layer,
+        'query': query,
+        'count': len(ids),
+        'limit_reached': len(ids) >= limit,
+        'indexed': len(index),
+        'query_ms': round((time.perf_counter() - started) * 1000, 3)
+    }
+    if layer == 'points':
+        result['ids'] = ids.tolist()
+        result['positions'] = np.round(points, 4).tolist()
+        if distances is not None:
+            result['distances'] = np.round(distances, 3).tolist()
+    else:
+        items = lidar_system.get_features(layer, ids.tolist())
+        result['results'] = items if distances is None else [
+            dict(item, distance=round(float(distance), 2)) for item, distance in zip(items, distances)]
+    return jsonify(result)
+
+@app.route('/api/lidar/scans', methods=['POST'])
+def api_lidar_add_scan():
+    """Add a new scan's points to the spatial index incrementally: JSON {"points": [[x, y, z], ...]}"""
+    payload = request.get_json(silent=True)
+    points = payload.get('points') if isinstance(payload, dict) else payload
+    try:
+        positions = np.asarray(points, dtype=np.float64)
+    except (TypeError, ValueError):
+        positions = None
+    if positions is None or positions.ndim != 2 or positions.shape[1] != 3 or not len(positions) \
+            or not np.all(np.isfinite(positions)):
+        return jsonify({'error': 'Expected a non-empty list of [x, y, z] points'}), 400
+
+    ids = lidar_system.add_scan_points(positions)
+    return jsonify({
+        'added': len(ids),
+        'first_id': int(ids[0]),
+        'spatial_index': lidar_system.point_index.get_stats()
     })
 
 @app.route('/api/lidar/hidden')
@@ -1220,6 +3551,34 @@ def api_hidden_lidar_data():
     
     return jsonify(lidar_system.get_hidden_map_data())
 
+@app.route('/api/lidar/bathymetry')
+def api_lidar_bathymetry():
+    """Bathymetry raster summary and tile pyramid layout - CLASSIFIED ACCESS"""
+    if request.args.get('access_key', '') != 'MARINE_CLASSIFIED_2024':
+        return jsonify({'error': 'Unauthorized access', 'code': 'ACCESS_DENIED'}), 403
+    return jsonify(lidar_system.get_bathymetry_summary())
+
+@app.route('/api/lidar/bathymetry/tiles/<int:z>/<int:x>/<int:y>')
+def api_lidar_bathymetry_tile(z, x, y):
+    """
+    One binary bathymetry tile (u16 decimetre depths + u8 sediment codes, layout in bathymetry.py) - CLASSIFIED ACCESS
+    Zoom max_zoom is full resolution; each lower zoom halves it
+    """
+    if request.args.get('access_key', '') != 'MARINE_CLASSIFIED_2024':
+        return jsonify({'error': 'Unauthorized access', 'code': 'ACCESS_DENIED'}), 403
+    raster = lidar_system.hidden_map_data['bathymetry']
+    etag = f"{raster.version}-{z}-{x}-{y}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        tile = raster.get_tile(z, x, y)
+        if tile is None:
+            return jsonify({'error': 'Tile outside the bathymetry pyramid', 'max_zoom': raster.max_zoom}), 404
+        response = Response(tile, mimetype='application/octet-stream')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, max-age=3600'
+    return response
+
 @app.route('/api/lidar/classified_objects')
 def api_classified_objects():
     """Get classified object tracking data"""
@@ -1248,7 +3607,7 @@ def api_classified_objects():
 @app.route('/api/system/health')
 def api_system_health():
     """Get overall system health status"""
-    camera_diagnostics = camera_manager.get_diagnostic_info()
+    camera_diagnostics = camera_manager.get_diagnostic_info(refresh=request.args.get('refresh') == '1')
     
     # Calculate health score
     health_score = 100
@@ -1256,6 +3615,8 @@ def api_system_health():
         health_score -= 20
     elif camera_diagnostics['pc_camera_status'] == 'unavailable':
         health_score -= 40
+    elif camera_diagnostics['pc_camera_status'] == 'warming':
+        health_score -= 10
     
     # Add error statistics
     pc_stats = camera_diagnostics['camera_stats']['pc_camera']
@@ -1263,6 +3624,8 @@ def api_system_health():
         health_score -= min(30, pc_stats['error_rate'] * 2)
     
     status = 'Excellent' if health_score >= 90 else 'Good' if health_score >= 70 else 'Degraded' if health_score >= 50 else 'Critical'
+    if camera_diagnostics['startup']['state'] == 'warming':
+        status = 'Warming'
     
     return jsonify({
         'overall_health': health_score,
@@ -1285,6 +3648,9 @@ def api_system_health():
                 'health': random.randint(92, 98)
             }
         },
+        'startup': camera_diagnostics['startup'],
+        'device_health_age_seconds': camera_diagnostics['device_health']['age_seconds'],
+        'dashboard_push': dashboard_publisher.get_stats(),
         'uptime': int(time.time() - camera_diagnostics['camera_stats']['pc_camera']['uptime_seconds']) if camera_diagnostics['camera_stats']['pc_camera'] else 0,
         'last_check': datetime.now().isoformat()
     })
@@ -1308,7 +3674,10 @@ def internal_error(error):
 def cleanup_resources():
     """Clean up all system resources on shutdown"""
     print("🧹 Cleaning up system resources...")
+    dashboard_publisher.stop()
     camera_manager.release_cameras()
+    # Flush queued event log lines and snapshots before exit
+    camera_manager.event_writer.close()
     print("✅ Cleanup completed")
 
 # Register cleanup function
@@ -1336,9 +3705,13 @@ if __name__ == '__main__':
     elif diagnostics['pc_camera_status'] == 'connected':
         print("✅ PC CAMERA CONNECTED - Ready for YOLO integration")
     
-    print(f"\nDetected available cameras: {len(diagnostics['available_cameras'])}")
-    for cam in diagnostics['available_cameras']:
-        print(f"   • Index {cam['index']}: {cam['resolution']}")
+    elif diagnostics['pc_camera_status'] == 'warming':
+        print("⏳ STARTUP WARMING - model load and camera probing continue in the background")
+    
+    if diagnostics['startup']['state'] != 'warming':
+        print(f"\nDetected available cameras: {len(diagnostics['available_cameras'])}")
+        for cam in diagnostics['available_cameras']:
+            print(f"   • Index {cam['index']}: {cam['resolution']}")
     
     print("\n🚀 Starting Flask application...")
     print("📍 Dashboard: http://localhost:5002")
@@ -1347,13 +3720,22 @@ if __name__ == '__main__':
     print("🎯 LiDAR Viewer: http://localhost:5002/lidar")
     print("🔒 Hidden LiDAR Map: http://localhost:5002/lidar/hidden")
     print("📊 API Endpoints:")
+    print("   • /api/dashboard - Dashboard snapshot (ETag / 304)")
+    print("   • /api/dashboard/stream - Dashboard updates (Server-Sent Events)")
     print("   • /api/stats - System statistics")
     print("   • /api/detections - Active detections")
     print("   • /api/activity - Activity log")
     print("   • /api/cameras/status - Camera status")
     print("   • /api/camera/diagnostics - Detailed diagnostics")
     print("   • /api/system/health - System health status")
+    print("   • /api/lidar/points - LiDAR point cloud (binary Float32, ?budget=&extent= LOD)")
+    print("   • /api/lidar/lod - LiDAR level-of-detail tiers")
+    print("   • /api/lidar/replay - Paced time-window replay stream (?start=&speed= to seek)")
+    print("   • /api/lidar/captures - Memory-mapped captures (/<name>/points?start=&end=&bbox= slices)")
+    print("   • /api/lidar/query - Spatial bbox / radius / kNN queries (points and map layers)")
+    print("   • /api/lidar/scans - Add live scan points to the spatial index (POST)")
     print("   • /api/lidar/hidden - Hidden map data (requires access key)")
+    print("   • /api/lidar/bathymetry/tiles/<z>/<x>/<y> - Binary bathymetry tile pyramid (requires access key)")
     print("   • /api/lidar/classified_objects - Classified tracking data")
     print("=" * 60)
     
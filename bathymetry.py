@@ -0,0 +1,256 @@
+"""
+Bathymetry Raster
+=================
+
+Depth / sediment raster of the hidden map (app.py EnhancedLiDARSystem):
+- Generated with NumPy array operations instead of one dict per cell, so a
+  multi-kilometre survey at metre resolution is a few bytes per cell
+- Multi-resolution tile pyramid: level max_zoom is the full-resolution raster,
+  each coarser level halves it (2x2 mean depth, nearest-sample sediment)
+- Tiles are served by z/x/y as compact binary buffers (see below) and cached
+- The raster doubles as the spatial index of the bathymetry layer: bbox, radius
+  and nearest-cell queries are grid arithmetic, touching only the cells in range
+
+Grid: cell (row, col) is the sample at x = origin_x + col * resolution,
+y = origin_y + row * resolution. Tile (x, y) at zoom z covers columns
+x * TILE_SIZE.. and rows y * TILE_SIZE.. of that level (rows run along +y).
+
+Tile layout (little-endian):
+    header      40 bytes
+        magic        4s   b'HCBT'
+        version      u16  1
+        tile_size    u16  cells per side
+        z, x, y      3*u32
+        resolution   f32  metres per cell at this zoom
+        origin       2*f64  x, y of the tile's first cell
+    depth       tile_size^2 u16  decimetres, row-major; 0xFFFF = no data
+    sediment    tile_size^2 u8   index into SEDIMENT_TYPES; 255 = no data
+"""
+
+import math
+import os
+import struct
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+SEDIMENT_TYPES = ('sand', 'rock', 'coral', 'mud')
+
+TILE_MAGIC = b'HCBT'
+TILE_VERSION = 1
+TILE_HEADER = struct.Struct('<4sHHIIIfdd')
+TILE_SIZE = 256
+TILE_CACHE_SIZE = 128
+DEPTH_NO_DATA = 0xFFFF
+SEDIMENT_NO_DATA = 255
+
+# Survey half-width and sample spacing in metres (defaults: the 200 m demo area at 10 m)
+BATHYMETRY_EXTENT = float(os.environ.get('HYDRACAT_BATHYMETRY_EXTENT', '100'))
+BATHYMETRY_RESOLUTION = float(os.environ.get('HYDRACAT_BATHYMETRY_RESOLUTION', '10'))
+
+
+class BathymetryRaster:
+    """
+    Depth (float32 metres), sediment (uint8) and scan-age (uint16 minutes) grids
+    - generate() builds the synthetic survey with array operations
+    - get_tile(z, x, y) encodes pyramid tiles on demand (LRU cache of encoded tiles)
+    - query_bbox / query_radius / query_knn follow SpatialIndex, with flat cell ids
+    """
+
+    dims = 2
+
+    def __init__(self, depth, sediment, scan_minutes, origin, resolution, generated_at=None):
+        self.depth = np.asarray(depth, dtype=np.float32)
+        self.sediment = np.asarray(sediment, dtype=np.uint8)
+        self.scan_minutes = np.asarray(scan_minutes, dtype=np.uint16)
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.resolution = float(resolution)
+        self.generated_at = generated_at or datetime.now()
+        self.version = int(self.generated_at.timestamp() * 1000)
+
+        rows, cols = self.depth.shape
+        self.max_zoom = max(0, math.ceil(math.log2(max(rows, cols) / TILE_SIZE))) if max(rows, cols) > 0 else 0
+        self.levels = self._build_pyramid()
+
+        # The raster is immutable, so summary statistics are computed once
+        valid = self.depth[~np.isnan(self.depth)]
+        self.depth_stats = {name: round(float(reduce(valid)), 1) if valid.size else None
+                            for name, reduce in (('depth_min', np.min), ('depth_max', np.max), ('depth_mean', np.mean))}
+        self.sediment_counts = np.bincount(self.sediment.ravel(), minlength=len(SEDIMENT_TYPES))
+        self.tiles = OrderedDict()  # (z, x, y) -> encoded tile, most recent last
+        self.tiles_lock = threading.Lock()
+
+    @classmethod
+    def generate(cls, extent=BATHYMETRY_EXTENT, resolution=BATHYMETRY_RESOLUTION, seed=None):
+        """Synthetic survey of [-extent, extent]^2 sampled every `resolution` metres"""
+        rng = np.random.default_rng(seed)
+        coordinates = np.arange(-extent, extent + resolution / 2, resolution)
+        shape = (len(coordinates), len(coordinates))
+
+        depth = 20 + 15 * np.sin(coordinates / 50)[np.newaxis, :] + 10 * np.cos(coordinates / 30)[:, np.newaxis]
+        depth = np.abs(depth + rng.uniform(-3, 3, shape)).astype(np.float32)
+        sediment = rng.integers(0, len(SEDIMENT_TYPES), shape, dtype=np.uint8)
+        scan_minutes = rng.integers(1, 121, shape, dtype=np.uint16)
+        return cls(depth, sediment, scan_minutes, (coordinates[0], coordinates[0]), resolution)
+
+    def __len__(self):
+        return self.depth.size
+
+    @property
+    def shape(self):
+        return self.depth.shape
+
+    def _build_pyramid(self):
+        """Levels from max_zoom (full resolution) down to 0; NaN / 255 pad odd edges"""
+        levels = {self.max_zoom: (self.depth, self.sediment)}
+        depth, sediment = self.depth, self.sediment
+        for zoom in range(self.max_zoom - 1, -1, -1):
+            rows, cols = depth.shape
+            padded = np.full((rows + rows % 2, cols + cols % 2), np.nan, dtype=np.float32)
+            padded[:rows, :cols] = depth
+            blocks = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2)
+            # Mean of the valid samples in each 2x2 block (all-NaN blocks stay NaN)
+            valid = np.count_nonzero(~np.isnan(blocks), axis=(1, 3))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                depth = (np.nansum(blocks, axis=(1, 3)) / valid).astype(np.float32)
+            sediment = sediment[::2, ::2]
+            levels[zoom] = (depth, sediment)
+        return levels
+
+    def tile_counts(self, zoom):
+        """(tiles along x, tiles along y) at a zoom level"""
+        rows, cols = self.levels[zoom][0].shape
+        return math.ceil(cols / TILE_SIZE), math.ceil(rows / TILE_SIZE)
+
+    def get_tile(self, z, x, y):
+        """Encoded tile (see module docstring), or None outside the pyramid"""
+        if z not in self.levels:
+            return None
+        tiles_x, tiles_y = self.tile_counts(z)
+        if not (0 <= x < tiles_x and 0 <= y < tiles_y):
+            return None
+        key = (z, x, y)
+        with self.tiles_lock:
+            tile = self.tiles.get(key)
+            if tile is None:
+                tile = self.tiles[key] = self._encode_tile(z, x, y)
+                while len(self.tiles) > TILE_CACHE_SIZE:
+                    self.tiles.popitem(last=False)
+            self.tiles.move_to_end(key)
+            return tile
+
+    def _encode_tile(self, z, x, y):
+        depth, sediment = self.levels[z]
+        rows = slice(y * TILE_SIZE, (y + 1) * TILE_SIZE)
+        cols = slice(x * TILE_SIZE, (x + 1) * TILE_SIZE)
+        window = depth[rows, cols]
+        height, width = window.shape
+
+        depth_dm = np.full((TILE_SIZE, TILE_SIZE), DEPTH_NO_DATA, dtype='<u2')
+        with np.errstate(invalid='ignore'):
+            depth_dm[:height, :width] = np.where(np.isnan(window), DEPTH_NO_DATA,
+                                                 np.clip(np.rint(window * 10), 0, DEPTH_NO_DATA - 1))
+        sediment_codes = np.full((TILE_SIZE, TILE_SIZE), SEDIMENT_NO_DATA, dtype=np.uint8)
+        sediment_codes[:height, :width] = sediment[rows, cols]
+
+        resolution = self.resolution * 2 ** (self.max_zoom - z)
+        header = TILE_HEADER.pack(TILE_MAGIC, TILE_VERSION, TILE_SIZE, z, x, y, resolution,
+                                  self.origin[0] + x * TILE_SIZE * resolution,
+                                  self.origin[1] + y * TILE_SIZE * resolution)
+        return b''.join((header, depth_dm.tobytes(), sediment_codes.tobytes()))
+
+    # --- Spatial queries (same interface as spatial_index.SpatialIndex; ids are flat cell indices) ---
+
+    def _window(self, lower, upper, limit=None):
+        """(ids, centers) of the cells whose sample lies in [lower, upper], row-major, at most limit"""
+        rows, cols = self.shape
+        first_col = max(0, math.ceil((lower[0] - self.origin[0]) / self.resolution))
+        last_col = min(cols - 1, math.floor((upper[0] - self.origin[0]) / self.resolution))
+        first_row = max(0, math.ceil((lower[1] - self.origin[1]) / self.resolution))
+        last_row = min(rows - 1, math.floor((upper[1] - self.origin[1]) / self.resolution))
+        if limit is not None and first_col <= last_col:
+            # Only the rows holding the first `limit` cells are materialized
+            last_row = min(last_row, first_row + math.ceil(limit / (last_col - first_col + 1)) - 1)
+        if first_col > last_col or first_row > last_row:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 2))
+        row_index, col_index = np.mgrid[first_row:last_row + 1, first_col:last_col + 1]
+        ids = (row_index * cols + col_index).ravel()[:limit]
+        centers = np.column_stack([self.origin[0] + col_index.ravel()[:limit] * self.resolution,
+                                   self.origin[1] + row_index.ravel()[:limit] * self.resolution])
+        return ids, centers
+
+    def _gap(self, center):
+        """Distance from center to the nearest cell sample, and the raster diagonal"""
+        rows, cols = self.shape
+        upper = np.array([self.origin[0] + (cols - 1) * self.resolution, self.origin[1] + (rows - 1) * self.resolution])
+        return float(np.linalg.norm(center - np.clip(center, self.origin, upper))), float(np.linalg.norm(upper - self.origin))
+
+    def query_bbox(self, lower, upper, limit=None):
+        """(ids, centers) of the cells inside [lower, upper]"""
+        return self._window(lower, upper, limit)
+
+    def query_radius(self, center, radius, limit=None):
+        """
+        (ids, centers, distances) of the cells within radius of center, nearest first
+        With a limit only a disk just large enough for `limit` cells is materialized,
+        doubled until it holds them (or reaches radius)
+        """
+        center = np.asarray(center, dtype=np.float64)
+        search = radius
+        if limit is not None:
+            gap, _ = self._gap(center)
+            search = min(radius, gap + self.resolution * (math.sqrt(limit / math.pi) + 2))
+        while True:
+            ids, centers = self._window(center - search, center + search)
+            distances = np.sqrt(np.sum((centers - center) ** 2, axis=1))
+            inside = np.flatnonzero(distances <= search)
+            # Every cell beyond `search` is farther than the ones found, so these are the nearest
+            if search >= radius or len(inside) >= limit:
+                break
+            search = min(radius, search * 2)
+        order = inside[np.argsort(distances[inside], kind='stable')][:limit]
+        return ids[order], centers[order], distances[order]
+
+    def query_knn(self, center, k):
+        """(ids, centers, distances) of the k nearest cells: a limited radius query over the whole raster"""
+        center = np.asarray(center, dtype=np.float64)
+        gap, diagonal = self._gap(center)
+        return self.query_radius(center, gap + diagonal, min(k, len(self)))
+
+    def cells(self, ids):
+        """Cell records (x, y, depth, sediment_type, last_scan) for flat cell ids"""
+        ids = np.asarray(ids, dtype=np.int64)
+        rows, cols = np.divmod(ids, self.shape[1])
+        depth = self.depth.ravel()[ids]
+        sediment = self.sediment.ravel()[ids]
+        minutes = self.scan_minutes.ravel()[ids]
+        return [{
+            'x': round(self.origin[0] + col * self.resolution, 3),
+            'y': round(self.origin[1] + row * self.resolution, 3),
+            'depth': round(float(value), 1),
+            'sediment_type': SEDIMENT_TYPES[code],
+            'last_scan': self.generated_at - timedelta(minutes=int(age))
+        } for row, col, value, code, age in zip(rows.tolist(), cols.tolist(), depth, sediment, minutes)]
+
+    def get_summary(self):
+        """Grid, depth statistics and pyramid layout (replaces the per-cell list in the hidden map payload)"""
+        rows, cols = self.shape
+        return {
+            'origin': list(self.origin),
+            'resolution': self.resolution,
+            'rows': rows,
+            'cols': cols,
+            'cells': len(self),
+            **self.depth_stats,
+            'sediment_types': list(SEDIMENT_TYPES),
+            'sediment_cells': {name: int(count) for name, count in zip(SEDIMENT_TYPES, self.sediment_counts)},
+            'generated_at': self.generated_at,
+            'tile_size': TILE_SIZE,
+            'max_zoom': self.max_zoom,
+            'levels': [{'z': zoom, 'resolution': self.resolution * 2 ** (self.max_zoom - zoom),
+                        'tiles': list(self.tile_counts(zoom))} for zoom in sorted(self.levels)],
+            'memory_bytes': int(self.depth.nbytes + self.sediment.nbytes + self.scan_minutes.nbytes),
+            'cached_tiles': len(self.tiles)
+        }
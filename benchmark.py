@@ -0,0 +1,417 @@
+"""
+Marine Surveillance Performance Benchmark
+=========================================
+
+End-to-end benchmark of the detection pipeline, stream fan-out and JSON API:
+- detection: app.py PC camera path (track_objects -> annotate_pc_frame -> JPEG encode)
+- yolo_camera: the yolo_camera.py per-frame path (YOLO -> detections -> zones -> drawing)
+- encode: JPEG encoding at the stream quality / sizes
+- streams: 1..N concurrent MJPEG clients on the shared PC camera pipeline
+- api: JSON endpoints through the Flask test client
+
+Reports per-stage latency percentiles (p50/p95/p99), frames/sec, CPU and RSS,
+and writes machine-readable JSON so runs can be compared.
+
+Usage:
+python benchmark.py                                   # synthetic frames, all suites
+python benchmark.py --source clip.mp4 --clients 1,2,4,8
+python benchmark.py --suites detection,api --output before.json
+python benchmark.py --output after.json --compare before.json
+
+yolo_camera.py runs its camera loop at import time, so its path is reproduced
+here with the same shared helpers (InferenceBackend, extract_detections, ZoneMap).
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+SUITES = ('detection', 'yolo_camera', 'encode', 'streams', 'api')
+
+API_ENDPOINTS = [
+    '/api/stats',
+    '/api/detections',
+    '/api/activity',
+    '/api/cameras/status',
+    '/api/camera/1/stats',
+    '/api/camera/2/stats',
+    '/api/camera/1/pipeline',
+    '/api/camera/1/zones',
+    '/api/camera/diagnostics',
+    '/api/system/health',
+    '/api/events?limit=50'
+]
+
+
+def summarize(samples_ms):
+    """Latency percentiles of a list of millisecond samples"""
+    if not samples_ms:
+        return {'count': 0}
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        'count': int(samples.size),
+        'mean_ms': round(float(samples.mean()), 3),
+        'p50_ms': round(float(np.percentile(samples, 50)), 3),
+        'p95_ms': round(float(np.percentile(samples, 95)), 3),
+        'p99_ms': round(float(np.percentile(samples, 99)), 3),
+        'max_ms': round(float(samples.max()), 3)
+    }
+
+
+class ResourceMonitor:
+    """
+    CPU time and RSS of this process over a measured interval
+    - Uses psutil when installed, otherwise resource / procfs
+    """
+
+    def __init__(self):
+        try:
+            import psutil
+            self.process = psutil.Process()
+        except ImportError:
+            self.process = None
+
+    def cpu_seconds(self):
+        if self.process is not None:
+            times = self.process.cpu_times()
+            return times.user + times.system
+        return time.process_time()
+
+    def rss_mb(self):
+        if self.process is not None:
+            return self.process.memory_info().rss / 1e6
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1]) / 1e3
+        except OSError:
+            pass
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+    def start(self):
+        self.started_wall = time.perf_counter()
+        self.started_cpu = self.cpu_seconds()
+
+    def stop(self):
+        wall = time.perf_counter() - self.started_wall
+        cpu = self.cpu_seconds() - self.started_cpu
+        return {
+            'wall_s': round(wall, 3),
+            'cpu_s': round(cpu, 3),
+            'cpu_percent': round(cpu / wall * 100, 1) if wall else 0.0,
+            'rss_mb': round(self.rss_mb(), 1)
+        }
+
+
+class FrameFeeder:
+    """Benchmark input: recorded frames (looped, unpaced) or the simulated PC camera"""
+
+    def __init__(self, manager, source=None):
+        self.manager = manager
+        self.source = None
+        if source:
+            from app import FileFrameSource
+            self.source = FileFrameSource(source, mode='fast', loop=True)
+            if not self.source.isOpened():
+                raise SystemExit(f"❌ Unable to open benchmark source {source}")
+
+    def next_frame(self):
+        if self.source is not None:
+            ret, frame = self.source.read()
+            if ret:
+                return frame
+        return self.manager.create_mock_pc_frame().copy()
+
+
+def bench_detection(app_module, feeder, frames):
+    """app.py detection path, timed per stage"""
+    manager = app_module.camera_manager
+    stages = {'capture': [], 'inference': [], 'annotate': [], 'encode': [], 'total': []}
+    monitor = ResourceMonitor()
+    monitor.start()
+    for _ in range(frames):
+        started = time.perf_counter()
+        frame = feeder.next_frame()
+        t1 = time.perf_counter()
+        detections = manager.track_objects(frame)
+        t2 = time.perf_counter()
+        frame = manager.annotate_pc_frame(frame, detections, [])
+        t3 = time.perf_counter()
+        cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, app_module.DEFAULT_JPEG_QUALITY])
+        t4 = time.perf_counter()
+        for stage, elapsed in (('capture', t1 - started), ('inference', t2 - t1), ('annotate', t3 - t2),
+                               ('encode', t4 - t3), ('total', t4 - started)):
+            stages[stage].append(elapsed * 1000)
+    resources = monitor.stop()
+    return {
+        'frames': frames,
+        'fps': round(frames / resources['wall_s'], 2),
+        'stages': {stage: summarize(samples) for stage, samples in stages.items()},
+        'inference': manager.get_inference_statistics(),
+        'resources': resources
+    }
+
+
+def bench_yolo_camera(model, feeder, frames):
+    """yolo_camera.py per-frame path with its own model, threshold and zone"""
+    from detection_utils import ZoneMap, extract_detections, rect_to_polygon
+    confidence_threshold = 0.6
+    zone_map = ZoneMap([{'name': 'red_zone', 'polygon': rect_to_polygon({"x1": 200, "y1": 150, "x2": 450, "y2": 350})}])
+    stages = {'inference': [], 'postprocess': [], 'draw': [], 'total': []}
+    monitor = ResourceMonitor()
+    monitor.start()
+    for _ in range(frames):
+        frame = feeder.next_frame()
+        started = time.perf_counter()
+        results = model(frame, verbose=False)
+        t1 = time.perf_counter()
+        detections = extract_detections(results, confidence_threshold, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        _, membership = zone_map.evaluate(detections, model.names, frame.shape)
+        t2 = time.perf_counter()
+        zone_map.draw(frame, thickness=3)
+        inside_zone = membership.any(axis=1)
+        for (x1, y1, x2, y2), inside in zip(detections.boxes.tolist(), inside_zone.tolist()):
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0) if inside else (0, 255, 255), 3)
+        t3 = time.perf_counter()
+        for stage, elapsed in (('inference', t1 - started), ('postprocess', t2 - t1),
+                               ('draw', t3 - t2), ('total', t3 - started)):
+            stages[stage].append(elapsed * 1000)
+    resources = monitor.stop()
+    return {
+        'frames': frames,
+        'fps': round(frames / resources['wall_s'], 2),
+        'stages': {stage: summarize(samples) for stage, samples in stages.items()},
+        'resources': resources
+    }
+
+
+def bench_encode(app_module, feeder, frames):
+    """Cold JPEG encodes (every frame is new) at the default and reduced stream sizes"""
+    results = {}
+    for quality, size in ((app_module.DEFAULT_JPEG_QUALITY, None), (app_module.DEFAULT_JPEG_QUALITY, (320, 240)), (50, None)):
+        cache = app_module.EncodedFrameCache()
+        samples, sizes = [], []
+        for sequence in range(1, frames + 1):
+            frame = feeder.next_frame()
+            started = time.perf_counter()
+            data = cache.get(sequence, frame, quality, size)
+            samples.append((time.perf_counter() - started) * 1000)
+            sizes.append(len(data or b''))
+        label = f"q{quality}_{'native' if size is None else f'{size[0]}x{size[1]}'}"
+        results[label] = dict(summarize(samples), avg_kb=round(float(np.mean(sizes)) / 1024, 1))
+    return results
+
+
+def bench_streams(app_module, client_counts, duration):
+    """1..N concurrent MJPEG clients on the shared PC camera stream"""
+    manager = app_module.camera_manager
+    results = {}
+    for clients in client_counts:
+        stop = threading.Event()
+        per_client = [{'frames': 0, 'bytes': 0, 'gaps': []} for _ in range(clients)]
+
+        def consume(stats):
+            stream = manager.generate_camera_stream('pc')
+            last = None
+            try:
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    if chunk.startswith(b'--frame'):
+                        now = time.perf_counter()
+                        if last is not None:
+                            stats['gaps'].append((now - last) * 1000)
+                        last = now
+                        stats['frames'] += 1
+                    else:
+                        stats['bytes'] += len(chunk)
+            finally:
+                stream.close()
+
+        threads = [threading.Thread(target=consume, args=(stats,), daemon=True) for stats in per_client]
+        monitor = ResourceMonitor()
+        monitor.start()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        resources = monitor.stop()
+        for thread in threads:
+            thread.join(5)
+
+        gaps = [gap for stats in per_client for gap in stats['gaps']]
+        total_frames = sum(stats['frames'] for stats in per_client)
+        results[str(clients)] = {
+            'clients': clients,
+            'fps_per_client': round(total_frames / clients / resources['wall_s'], 2),
+            'total_fps': round(total_frames / resources['wall_s'], 2),
+            'mbit_per_s': round(sum(stats['bytes'] for stats in per_client) * 8 / 1e6 / resources['wall_s'], 2),
+            'frame_interval': summarize(gaps),
+            'pipeline': manager.get_pipeline_stats('pc'),
+            'encode_cache': manager.get_encode_cache_stats('pc'),
+            'resources': resources
+        }
+        print(f"   👥 {clients} client(s): {results[str(clients)]['fps_per_client']} fps each, "
+              f"CPU {resources['cpu_percent']}%, RSS {resources['rss_mb']} MB")
+    return results
+
+
+def bench_api(app_module, requests_per_endpoint):
+    """Latency of the JSON API endpoints through the Flask test client"""
+    client = app_module.app.test_client()
+    results = {}
+    for endpoint in API_ENDPOINTS:
+        samples, status = [], None
+        for _ in range(requests_per_endpoint):
+            started = time.perf_counter()
+            response = client.get(endpoint)
+            samples.append((time.perf_counter() - started) * 1000)
+            status = response.status_code
+        results[endpoint] = dict(summarize(samples), status=status)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(current, baseline_path):
+    """Print headline metric changes against a previous results file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\n📈 Comparison with {baseline_path} ({baseline['meta'].get('git_revision')})")
+
+    def show(label, new, old, higher_is_better):
+        if new is None or old is None or old == 0:
+            return
+        change = (new - old) / old * 100
+        better = change > 0 if higher_is_better else change < 0
+        print(f"   {'✅' if better else '⚠️ '} {label}: {old} -> {new} ({change:+.1f}%)")
+
+    for suite in ('detection', 'yolo_camera'):
+        if suite in current['results'] and suite in baseline['results']:
+            show(f"{suite} fps", current['results'][suite]['fps'], baseline['results'][suite]['fps'], True)
+            show(f"{suite} total p95 ms", current['results'][suite]['stages']['total'].get('p95_ms'),
+                 baseline['results'][suite]['stages']['total'].get('p95_ms'), False)
+    for clients, entry in current['results'].get('streams', {}).items():
+        old = baseline['results'].get('streams', {}).get(clients)
+        if old:
+            show(f"streams x{clients} fps/client", entry['fps_per_client'], old['fps_per_client'], True)
+            show(f"streams x{clients} CPU %", entry['resources']['cpu_percent'], old['resources']['cpu_percent'], False)
+    for endpoint, entry in current['results'].get('api', {}).items():
+        old = baseline['results'].get('api', {}).get(endpoint)
+        if old:
+            show(f"{endpoint} p95 ms", entry.get('p95_ms'), old.get('p95_ms'), False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Marine surveillance pipeline benchmark")
+    parser.add_argument('--suites', default=','.join(SUITES), help=f"comma-separated subset of {', '.join(SUITES)}")
+    parser.add_argument('--source', help="recorded video or image directory (default: simulated frames)")
+    parser.add_argument('--frames', type=int, default=200, help="frames per detection / encode suite")
+    parser.add_argument('--clients', default='1,2,4', help="stream client counts, e.g. 1,2,4,8")
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds per stream client level")
+    parser.add_argument('--api-requests', type=int, default=50, help="requests per API endpoint")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON results file")
+    parser.add_argument('--compare', help="previous results file to compare against")
+    args = parser.parse_args()
+
+    suites = [suite.strip() for suite in args.suites.split(',') if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+    client_counts = [int(count) for count in args.clients.split(',')]
+    output_path = os.path.abspath(args.output)
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    # Events and snapshots triggered while benchmarking go to a scratch directory
+    workdir = tempfile.mkdtemp(prefix='hydracat-bench-')
+    os.environ['HYDRACAT_EVENT_DB'] = os.path.join(workdir, 'events.db')
+    if args.source:
+        # Streams use the recorded source through the regular PC camera pipeline
+        os.environ['HYDRACAT_PC_SOURCE'] = os.path.abspath(args.source)
+        os.environ.setdefault('HYDRACAT_REPLAY_MODE', 'fast')
+
+    print("🏁 MARINE SURVEILLANCE BENCHMARK")
+    print("=" * 60)
+    started = time.perf_counter()
+    import app as app_module
+    manager = app_module.camera_manager
+    manager.startup_thread.join()
+    startup_s = time.perf_counter() - started
+    print(f"⏱️  App import + startup: {startup_s:.2f}s")
+
+    yolo_camera_model = None
+    if 'yolo_camera' in suites:
+        from inference_backend import InferenceBackend
+        yolo_camera_model = InferenceBackend("yolov8n.pt")
+        yolo_camera_model.warmup()
+
+    feeder = FrameFeeder(manager, os.path.abspath(args.source) if args.source else None)
+    os.chdir(workdir)
+
+    results = {}
+    if 'detection' in suites:
+        print("🎯 app.py detection path...")
+        results['detection'] = bench_detection(app_module, feeder, args.frames)
+    if 'yolo_camera' in suites:
+        print("🎯 yolo_camera.py detection path...")
+        results['yolo_camera'] = bench_yolo_camera(yolo_camera_model, feeder, args.frames)
+    if 'encode' in suites:
+        print("🖼️  JPEG encoding...")
+        results['encode'] = bench_encode(app_module, feeder, args.frames)
+    if 'streams' in suites:
+        print("📺 Concurrent stream clients...")
+        results['streams'] = bench_streams(app_module, client_counts, args.duration)
+    if 'api' in suites:
+        print("📊 JSON API endpoints...")
+        results['api'] = bench_api(app_module, args.api_requests)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'git_revision': git_revision(),
+            'platform': f"{platform.system()} {platform.release()} ({platform.machine()})",
+            'python_version': sys.version.split()[0],
+            'opencv_version': cv2.__version__,
+            'cpu_count': os.cpu_count(),
+            'source': args.source or 'simulated',
+            'startup_s': round(startup_s, 3),
+            'inference_backend': manager.yolo_model.get_stats() if manager.yolo_model else None,
+            'args': vars(args)
+        },
+        'results': results
+    }
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for suite in ('detection', 'yolo_camera'):
+        if suite in results:
+            total = results[suite]['stages']['total']
+            print(f"   {suite}: {results[suite]['fps']} fps, total p50 {total['p50_ms']}ms / p95 {total['p95_ms']}ms")
+    print(f"💾 Results saved to {output_path}")
+    if compare_path:
+        compare(report, compare_path)
+
+    app_module.cleanup_resources()
+    os._exit(0)  # camera / pipeline threads are daemons; skip waiting on them
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+"""
+Detection Utilities
+===================
+
+Shared YOLO post-processing for the Flask dashboard (app.py) and the
+standalone red-zone monitor (yolo_camera.py):
+- Converts YOLO results to NumPy arrays once per frame
+- Confidence filtering, box centers and zone containment as array operations
+- Drawing stays the only per-box step in the callers
+- Named polygon zones rasterized into an integer mask for O(1) membership lookups
+
+Zone configuration (red_zones.json), one list of zones per camera:
+{
+    "pc": [
+        {"name": "berth_3", "polygon": [[200, 150], [440, 150], [440, 330], [200, 330]],
+         "rules": {"classes": ["boat", "person"], "min_confidence": 0.7,
+                   "frames_to_trigger": 3, "frames_to_clear": 5, "snapshot": true,
+                   "color": [0, 0, 255]}}
+    ],
+    "yolo_camera": [...]
+}
+"""
+
+import json
+import threading
+
+import cv2
+import numpy as np
+
+ZONE_CONFIG_PATH = "red_zones.json"
+
+DEFAULT_ZONE_RULES = {
+    'classes': [],            # class names that trigger the zone (empty = all classes)
+    'min_confidence': 0.0,    # extra confidence floor on top of the camera threshold
+    'frames_to_trigger': 1,   # consecutive occupied frames before an entry event
+    'frames_to_clear': 1,     # consecutive empty frames before an exit event
+    'snapshot': True,         # save a snapshot on entry
+    'color': [0, 0, 255]      # BGR outline color
+}
+
+
+def coerce_zone_rules(name, rules):
+    """Validate zone rules against DEFAULT_ZONE_RULES and fill in defaults (raises ValueError)"""
+    if rules is None:
+        rules = {}
+    if not isinstance(rules, dict):
+        raise ValueError(f"Zone '{name}': rules must be an object")
+    unknown = set(rules) - set(DEFAULT_ZONE_RULES)
+    if unknown:
+        raise ValueError(f"Zone '{name}': unknown rules {sorted(unknown)}")
+
+    coerced = dict(DEFAULT_ZONE_RULES)
+    try:
+        if 'classes' in rules:
+            classes = rules['classes']
+            if isinstance(classes, str) or not all(isinstance(cls, str) for cls in classes):
+                raise ValueError("'classes' must be a list of class names")
+            coerced['classes'] = list(classes)
+        if 'min_confidence' in rules:
+            coerced['min_confidence'] = float(rules['min_confidence'])
+            if not 0.0 <= coerced['min_confidence'] <= 1.0:
+                raise ValueError("'min_confidence' must be between 0 and 1")
+        for key in ('frames_to_trigger', 'frames_to_clear'):
+            if key in rules:
+                value = rules[key]
+                if isinstance(value, bool) or int(value) != value or not 1 <= int(value) <= 10000:
+                    raise ValueError(f"'{key}' must be an integer between 1 and 10000")
+                coerced[key] = int(value)
+        if 'snapshot' in rules:
+            if not isinstance(rules['snapshot'], bool):
+                raise ValueError("'snapshot' must be true or false")
+            coerced['snapshot'] = rules['snapshot']
+        if 'color' in rules:
+            color = [int(channel) for channel in rules['color']]
+            if len(color) != 3 or not all(0 <= channel <= 255 for channel in color):
+                raise ValueError("'color' must be 3 integers between 0 and 255")
+            coerced['color'] = color
+    except (TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f"Zone '{name}': {e}") from None
+    return coerced
+
+
+class Detections:
+    """
+    Per-frame detections stored as parallel NumPy arrays
+    - boxes: (N, 4) int32 x1, y1, x2, y2
+    - confidences: (N,) float32
+    - class_ids: (N,) int32
+    - track_ids: (N,) int64, -1 when the box is not tracked
+    """
+
+    __slots__ = ('boxes', 'confidences', 'class_ids', 'track_ids', 'timestamp')
+
+    def __init__(self, boxes=None, confidences=None, class_ids=None, track_ids=None, timestamp=None):
+        self.boxes = np.zeros((0, 4), dtype=np.int32) if boxes is None else np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        count = len(self.boxes)
+        self.confidences = np.zeros(count, dtype=np.float32) if confidences is None else np.asarray(confidences, dtype=np.float32)
+        self.class_ids = np.zeros(count, dtype=np.int32) if class_ids is None else np.asarray(class_ids, dtype=np.int32)
+        self.track_ids = np.full(count, -1, dtype=np.int64) if track_ids is None else np.asarray(track_ids, dtype=np.int64)
+        self.timestamp = timestamp
+
+    def __len__(self):
+        return len(self.boxes)
+
+    @property
+    def centers(self):
+        """(N, 2) integer box centers"""
+        return np.stack(((self.boxes[:, 0] + self.boxes[:, 2]) // 2,
+                         (self.boxes[:, 1] + self.boxes[:, 3]) // 2), axis=1)
+
+    def subset(self, mask):
+        """Detections selected by a boolean mask or index array"""
+        return Detections(self.boxes[mask], self.confidences[mask], self.class_ids[mask],
+                          self.track_ids[mask], self.timestamp)
+
+    def to_records(self, names):
+        """JSON-friendly records (only used for logging / alerts, not per frame)"""
+        return [{
+            'name': names[int(cls)],
+            'confidence': round(float(conf), 2),
+            'timestamp': self.timestamp,
+            'coords': tuple(int(v) for v in box),
+            'track_id': int(track_id) if track_id >= 0 else None
+        } for box, conf, cls, track_id in zip(self.boxes, self.confidences, self.class_ids, self.track_ids)]
+
+
+def extract_detections(results, confidence_threshold=0.0, timestamp=None):
+    """Convert YOLO results to a Detections object with one array conversion per result"""
+    boxes, confidences, class_ids = [], [], []
+    for r in results:
+        if r.boxes is None or len(r.boxes) == 0:
+            continue
+        boxes.append(r.boxes.xyxy.cpu().numpy())
+        confidences.append(r.boxes.conf.cpu().numpy())
+        class_ids.append(r.boxes.cls.cpu().numpy())
+
+    if not boxes:
+        return Detections(timestamp=timestamp)
+
+    boxes = np.concatenate(boxes)
+    confidences = np.concatenate(confidences)
+    class_ids = np.concatenate(class_ids)
+
+    # Confidence filtering for the whole frame at once
+    keep = confidences >= confidence_threshold
+    return Detections(boxes[keep].astype(np.int32), confidences[keep],
+                      class_ids[keep].astype(np.int32), timestamp=timestamp)
+
+
+def points_in_rect(points, rect):
+    """Boolean mask of (N, 2) points inside an inclusive {x1, y1, x2, y2} rectangle"""
+    x, y = points[:, 0], points[:, 1]
+    return (x >= rect["x1"]) & (x <= rect["x2"]) & (y >= rect["y1"]) & (y <= rect["y2"])
+
+
+def rect_to_polygon(rect):
+    """Convert an {x1, y1, x2, y2} rectangle into a 4-point polygon"""
+    return [[rect["x1"], rect["y1"]], [rect["x2"], rect["y1"]],
+            [rect["x2"], rect["y2"]], [rect["x1"], rect["y2"]]]
+
+
+def load_zone_config(camera, default_zones, path=ZONE_CONFIG_PATH):
+    """Read the zones of one camera from the JSON config, falling back to defaults (also when invalid)"""
+    try:
+        with open(path) as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError("expected an object of camera -> zone list")
+        zones = config.get(camera)
+        if zones:
+            ZoneMap(zones)  # validates the definitions; a bad file must not stop startup
+    except FileNotFoundError:
+        zones = None
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Unable to use zone config {path} for {camera}: {e} - using default zones")
+        zones = None
+    return zones if zones else default_zones
+
+
+def save_zone_config(camera, zones, path=ZONE_CONFIG_PATH):
+    """Persist the zones of one camera, keeping other cameras' entries (raises ValueError on invalid zones)"""
+    ZoneMap(zones)  # nothing invalid reaches the file
+    try:
+        with open(path) as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        config = {}
+    if not isinstance(config, dict):
+        config = {}
+    config[camera] = zones
+    with open(path, "w") as f:
+        json.dump(config, f, indent=2)
+
+
+class ZoneMap:
+    """
+    Named polygon zones of one camera with per-zone rules
+    - Zones are rasterized once into an integer bit mask (bit i = zone i), so
+      overlapping zones are supported and membership is one lookup per box
+    - The mask is rebuilt only when the zones or the frame size change
+    - Tracks per-zone occupancy and reports entry / exit events
+    """
+
+    MAX_ZONES = 64
+
+    def __init__(self, zones=()):
+        self.lock = threading.Lock()
+        self.version = 0
+        self.mask = None
+        self.mask_key = None
+        self.set_zones(zones)
+
+    def set_zones(self, zones):
+        """Replace all zones (raises ValueError on invalid definitions)"""
+        if not isinstance(zones, (list, tuple)):
+            raise ValueError("Zones must be a list of zone objects")
+        normalized = []
+        for index, zone in enumerate(zones):
+            if not isinstance(zone, dict):
+                raise ValueError(f"Zone {index + 1} must be an object with a name, polygon and rules")
+            name = str(zone.get('name') or f"zone_{index + 1}")
+            try:
+                polygon = np.asarray(zone.get('polygon', []), dtype=np.int32).reshape(-1, 2)
+            except (TypeError, ValueError, OverflowError):
+                raise ValueError(f"Zone '{name}' polygon must be a list of [x, y] points") from None
+            if len(polygon) < 3:
+                raise ValueError(f"Zone '{name}' needs a polygon with at least 3 points")
+            rules = coerce_zone_rules(name, zone.get('rules'))
+            normalized.append({'name': name, 'polygon': polygon, 'rules': rules, 'class_ids': None})
+
+        if len(normalized) > self.MAX_ZONES:
+            raise ValueError(f"At most {self.MAX_ZONES} zones per camera are supported")
+        if len({zone['name'] for zone in normalized}) != len(normalized):
+            raise ValueError("Zone names must be unique")
+
+        with self.lock:
+            self.zones = normalized
+            self.state = [{'occupied': False, 'inside_frames': 0, 'outside_frames': 0} for _ in normalized]
+            self.version += 1
+
+    def to_config(self):
+        """JSON-friendly zone definitions"""
+        return [{'name': zone['name'], 'polygon': zone['polygon'].tolist(), 'rules': zone['rules']}
+                for zone in self.zones]
+
+    def polygons(self):
+        return [zone['polygon'] for zone in self.zones]
+
+    def occupied_zones(self):
+        return [zone['name'] for zone, state in zip(self.zones, self.state) if state['occupied']]
+
+    def get_mask(self, frame_shape):
+        """Bit mask of zone membership per pixel, rebuilt only when zones or size change"""
+        key = (self.version, tuple(frame_shape[:2]))
+        if self.mask_key != key:
+            count = len(self.zones)
+            dtype = np.uint8 if count <= 8 else np.uint16 if count <= 16 else np.uint32 if count <= 32 else np.uint64
+            mask = np.zeros(frame_shape[:2], dtype=dtype)
+            layer = np.zeros(frame_shape[:2], dtype=np.uint8)
+            for bit, zone in enumerate(self.zones):
+                layer.fill(0)
+                cv2.fillPoly(layer, [zone['polygon']], 1)
+                mask |= layer.astype(dtype) << dtype(bit)
+            self.mask, self.mask_key = mask, key
+        return self.mask
+
+    def membership(self, points, frame_shape):
+        """(N, Z) boolean zone membership for (N, 2) points, one mask lookup each"""
+        count = len(self.zones)
+        if len(points) == 0 or count == 0:
+            return np.zeros((len(points), count), dtype=bool)
+
+        mask = self.get_mask(frame_shape)
+        height, width = mask.shape
+        x, y = points[:, 0], points[:, 1]
+        valid = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        bits = np.zeros(len(points), dtype=np.uint64)
+        bits[valid] = mask[y[valid], x[valid]]
+        shifts = np.arange(count, dtype=np.uint64)
+        return ((bits[:, None] >> shifts[None, :]) & np.uint64(1)).astype(bool)
+
+    def _class_ids(self, zone, names):
+        if zone['class_ids'] is None:
+            wanted = set(zone['rules']['classes'])
+            items = names.items() if isinstance(names, dict) else enumerate(names)
+            zone['class_ids'] = np.array([cls for cls, name in items if name in wanted], dtype=np.int32)
+        return zone['class_ids']
+
+    def evaluate(self, detections, names, frame_shape):
+        """
+        Update per-zone occupancy from one frame of detections
+        Returns (events, inside): entry/exit events and the (N, Z) membership after rules
+        """
+        with self.lock:
+            inside = self.membership(detections.centers, frame_shape)
+            events = []
+            # Loop over zones (dozens), never over boxes
+            for index, zone in enumerate(self.zones):
+                rules = zone['rules']
+                members = inside[:, index]
+                if rules['min_confidence'] > 0:
+                    members &= detections.confidences >= rules['min_confidence']
+                if rules['classes']:
+                    members &= np.isin(detections.class_ids, self._class_ids(zone, names))
+                inside[:, index] = members
+
+                state = self.state[index]
+                if members.any():
+                    state['inside_frames'] += 1
+                    state['outside_frames'] = 0
+                else:
+                    state['outside_frames'] += 1
+                    state['inside_frames'] = 0
+
+                if not state['occupied'] and state['inside_frames'] >= rules['frames_to_trigger']:
+                    state['occupied'] = True
+                    events.append({'type': 'enter', 'zone': zone['name'], 'rules': rules,
+                                   'detections': detections.subset(members)})
+                elif state['occupied'] and state['outside_frames'] >= rules['frames_to_clear']:
+                    state['occupied'] = False
+                    events.append({'type': 'exit', 'zone': zone['name'], 'rules': rules,
+                                   'detections': detections.subset(members)})
+            return events, inside
+
+    def draw(self, frame, thickness=2):
+        """Outline every zone with its name"""
+        with self.lock:
+            for zone in self.zones:
+                color = tuple(int(c) for c in zone['rules']['color'])
+                cv2.polylines(frame, [zone['polygon']], True, color, thickness)
+                x, y = zone['polygon'][0]
+                cv2.putText(frame, zone['name'], (int(x) + 4, int(y) + 14),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.4, color, 1)
@@ -0,0 +1,365 @@
+"""
+Event Logging
+=============
+
+Red-zone event persistence shared by app.py and yolo_camera.py:
+- Background writer for event log lines and snapshots, so the streaming
+  thread never waits on (slow SD-card) storage
+- Log lines are batched; snapshots are written from already-encoded JPEG bytes
+- Indexed SQLite event store (WAL mode) for time / camera / zone / class queries
+
+One-shot import of existing JSON-lines logs into the event store:
+    python event_logging.py import yolo_redzone_log.txt [--camera yolo_camera]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+EVENT_LOG_PATH = "yolo_redzone_log.txt"
+EVENT_DB_PATH = os.environ.get('HYDRACAT_EVENT_DB', 'redzone_events.db')
+
+
+class EventStore:
+    """
+    Embedded red-zone event store (SQLite, WAL mode)
+    - One row per event plus one row per (event, class) for class filters
+    - Indexed on timestamp, camera, zone, kind and class, each in timestamp order,
+      and keyset pagination keeps deep pages as fast as the first one
+    - Rows are keyed by a hash of the JSON log line, so importing a log that
+      was also recorded live does not create duplicates
+    - One connection per thread; WAL lets API readers run during writes
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            camera TEXT NOT NULL,
+            zone TEXT,
+            kind TEXT NOT NULL,
+            event TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            line_hash TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS event_classes (
+            class_name TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+            PRIMARY KEY (class_name, timestamp, event_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp, id);
+        CREATE INDEX IF NOT EXISTS idx_events_camera ON events(camera, timestamp, id);
+        CREATE INDEX IF NOT EXISTS idx_events_zone ON events(zone, timestamp, id);
+        CREATE INDEX IF NOT EXISTS idx_events_kind ON events(kind, timestamp, id);
+        CREATE INDEX IF NOT EXISTS idx_event_classes_event ON event_classes(event_id);
+    """
+
+    MAX_PAGE_SIZE = 500
+
+    def __init__(self, path=EVENT_DB_PATH):
+        self.path = path
+        self.local = threading.local()
+        self.stats = {'inserted': 0, 'duplicates': 0, 'queries': 0}
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self.local.conn = conn
+        return conn
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    @staticmethod
+    def _event_kind(event):
+        text = str(event.get('event', '')).lower()
+        return 'enter' if 'enter' in text else 'exit' if ('left' in text or 'exit' in text) else 'other'
+
+    def insert_events(self, events, default_camera='unknown'):
+        """Insert (line, event) pairs in one transaction; returns the number of new rows"""
+        conn = self._connection()
+        inserted = 0
+        with conn:
+            for line, event in events:
+                line = line.strip()
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO events (timestamp, camera, zone, kind, event, payload, line_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (str(event.get('timestamp', '')), event.get('camera') or default_camera, event.get('zone'),
+                     self._event_kind(event), str(event.get('event', '')), line,
+                     hashlib.sha1(line.encode('utf-8')).hexdigest()))
+                if cursor.rowcount == 0:
+                    self.stats['duplicates'] += 1
+                    continue
+                inserted += 1
+                classes = {str(obj.get('name', '')) for obj in event.get('objects') or []}
+                conn.executemany(
+                    "INSERT OR IGNORE INTO event_classes (class_name, timestamp, event_id) VALUES (?, ?, ?)",
+                    [(class_name, str(event.get('timestamp', '')), cursor.lastrowid) for class_name in classes])
+        self.stats['inserted'] += inserted
+        return inserted
+
+    def import_log(self, path, default_camera='unknown', batch_size=5000):
+        """Import an existing JSON-lines event log; returns (imported, skipped)"""
+        imported = skipped = 0
+        batch = []
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    skipped += 1
+                    continue
+                batch.append((line, event))
+                if len(batch) >= batch_size:
+                    imported += self.insert_events(batch, default_camera)
+                    batch = []
+        if batch:
+            imported += self.insert_events(batch, default_camera)
+        return imported, skipped
+
+    @staticmethod
+    def encode_cursor(row):
+        return f"{row['timestamp']}|{row['id']}"
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Split a pagination cursor (raises ValueError when malformed)"""
+        timestamp, _, event_id = cursor.rpartition('|')
+        if not timestamp:
+            raise ValueError("Malformed cursor")
+        return timestamp, int(event_id)
+
+    def query(self, start=None, end=None, camera=None, zone=None, class_name=None, kind=None,
+              limit=50, cursor=None):
+        """
+        Newest-first page of events matching all given filters
+        Returns (events, next_cursor); pass next_cursor back to get the following page
+        """
+        limit = max(1, min(int(limit), self.MAX_PAGE_SIZE))
+        # A class filter drives the query from the (class, timestamp) key so the
+        # time range and ordering come straight off that index
+        source = "c" if class_name else "e"
+        id_column = "c.event_id" if class_name else "e.id"
+        clauses, params = [], []
+        if class_name:
+            clauses.append("c.class_name = ?")
+            params.append(class_name)
+        if start:
+            clauses.append(f"{source}.timestamp >= ?")
+            params.append(start)
+        if end:
+            clauses.append(f"{source}.timestamp <= ?")
+            params.append(end)
+        if camera:
+            clauses.append("e.camera = ?")
+            params.append(camera)
+        if zone:
+            clauses.append("e.zone = ?")
+            params.append(zone)
+        if kind:
+            clauses.append("e.kind = ?")
+            params.append(kind)
+        if cursor:
+            timestamp, event_id = self.decode_cursor(cursor)
+            clauses.append(f"({source}.timestamp < ? OR ({source}.timestamp = ? AND {id_column} < ?))")
+            params.extend([timestamp, timestamp, event_id])
+
+        sql = "SELECT e.id, e.timestamp, e.camera, e.zone, e.kind, e.payload FROM "
+        sql += "event_classes c JOIN events e ON e.id = c.event_id" if class_name else "events e"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {source}.timestamp DESC, {id_column} DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._connection().execute(sql, params).fetchall()
+        self.stats['queries'] += 1
+        next_cursor = self.encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+
+        events = []
+        for row in rows[:limit]:
+            event = json.loads(row['payload'])
+            event.update({'id': row['id'], 'camera': row['camera'], 'zone': row['zone'], 'kind': row['kind']})
+            events.append(event)
+        return events, next_cursor
+
+    def get_stats(self):
+        """Row counts and insert / query counters"""
+        conn = self._connection()
+        return dict(self.stats,
+                    events=conn.execute("SELECT COUNT(*) FROM events").fetchone()[0],
+                    path=self.path)
+
+
+class AsyncEventWriter:
+    """
+    Background writer for red-zone event logs and snapshots
+    - Bounded queue: producers never block; items are dropped (and counted) when full
+    - Log lines are batched into a single append per flush
+    - Snapshots are written from JPEG bytes that were already encoded for streaming
+    - Reports queue depth and write latency; flush()/close() for shutdown
+    - Optionally records every batch in an EventStore in the same pass
+    """
+
+    def __init__(self, log_path=EVENT_LOG_PATH, max_queue=256, batch_size=64, flush_interval=0.5, store=None):
+        self.log_path = log_path
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stats = {
+            'lines_written': 0,
+            'snapshots_written': 0,
+            'batches': 0,
+            'dropped': 0,
+            'errors': 0,
+            'write_time': 0.0,
+            'writes': 0,
+            'max_write_ms': 0.0
+        }
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self.thread.start()
+
+    def _submit(self, item):
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+
+    def log_event(self, event):
+        """Queue one JSON event line (returns False if the queue is full)"""
+        return self._submit(('log', (json.dumps(event) + "\n", event)))
+
+    def save_snapshot(self, path, jpeg_bytes):
+        """Queue an already-encoded JPEG for writing (returns False if the queue is full)"""
+        return self._submit(('snapshot', (path, jpeg_bytes)))
+
+    def flush(self, timeout=5.0):
+        """Block until everything queued so far has been written"""
+        if not self.thread.is_alive():
+            return False
+        done = threading.Event()
+        try:
+            self.queue.put(('flush', done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Flush pending writes and stop the writer thread"""
+        flushed = self.flush(timeout)
+        self.running = False
+        self.thread.join(timeout)
+        return flushed
+
+    def _timed(self, write, *args):
+        started = time.perf_counter()
+        try:
+            write(*args)
+        except (OSError, sqlite3.Error) as e:
+            self.stats['errors'] += 1
+            print(f"❌ Event writer error: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats['writes'] += 1
+        self.stats['write_time'] += elapsed_ms
+        self.stats['max_write_ms'] = max(self.stats['max_write_ms'], elapsed_ms)
+
+    def _write_lines(self, lines):
+        with open(self.log_path, "a") as f:
+            f.write("".join(line for line, _ in lines))
+        self.stats['lines_written'] += len(lines)
+        self.stats['batches'] += 1
+
+    def _store_lines(self, lines):
+        self.store.insert_events(lines)
+
+    def _write_snapshot(self, path, jpeg_bytes):
+        with open(path, "wb") as f:
+            f.write(jpeg_bytes)
+        self.stats['snapshots_written'] += 1
+
+    def _run(self):
+        while self.running:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            # Drain whatever else is already queued into one batch
+            items = [item]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines, flushes = [], []
+            for kind, payload in items:
+                if kind == 'log':
+                    lines.append(payload)
+                elif kind == 'snapshot':
+                    self._timed(self._write_snapshot, *payload)
+                elif kind == 'flush':
+                    flushes.append(payload)
+
+            if lines:
+                self._timed(self._write_lines, lines)
+                if self.store is not None:
+                    self._timed(self._store_lines, lines)
+            for done in flushes:
+                done.set()
+
+    def get_stats(self):
+        """Queue depth, drops and write latency"""
+        writes = self.stats['writes']
+        return {
+            'queue_depth': self.queue.qsize(),
+            'max_queue': self.queue.maxsize,
+            'dropped': self.stats['dropped'],
+            'errors': self.stats['errors'],
+            'lines_written': self.stats['lines_written'],
+            'snapshots_written': self.stats['snapshots_written'],
+            'batches': self.stats['batches'],
+            'avg_write_ms': round(self.stats['write_time'] / writes, 3) if writes else 0.0,
+            'max_write_ms': round(self.stats['max_write_ms'], 3)
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Red-zone event store tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    importer = subparsers.add_parser('import', help="import JSON-lines event logs into the event store")
+    importer.add_argument('logs', nargs='+', help="log files (e.g. yolo_redzone_log.txt)")
+    importer.add_argument('--db', default=EVENT_DB_PATH, help="event store path")
+    importer.add_argument('--camera', default='unknown', help="camera for lines without a camera field")
+    args = parser.parse_args()
+
+    store = EventStore(args.db)
+    for log_path in args.logs:
+        started = time.perf_counter()
+        imported, skipped = store.import_log(log_path, default_camera=args.camera)
+        print(f"📥 {log_path}: {imported} events imported, {skipped} unreadable lines skipped "
+              f"({time.perf_counter() - started:.2f}s)")
+    print(f"✅ Event store {args.db} now holds {store.get_stats()['events']} events")
@@ -0,0 +1,163 @@
+"""
+Inference Backend
+=================
+
+Selectable YOLO runtime shared by app.py and yolo_camera.py:
+- torch: ultralytics eager PyTorch (the original behaviour)
+- onnx: exported once next to the .pt weights, run by ONNX Runtime
+- openvino: exported once next to the .pt weights, run by OpenVINO
+- INT8: dynamic ONNX Runtime quantization, or OpenVINO NNCF post-training quantization
+- Configurable CPU thread count, explicit warm-up and measured per-frame latency
+
+Configuration (environment):
+    HYDRACAT_INFERENCE_BACKEND=torch|onnx|openvino   (default torch)
+    HYDRACAT_INFERENCE_INT8=1                        (default off)
+    HYDRACAT_INFERENCE_THREADS=4                     (default: runtime decides)
+    HYDRACAT_INFERENCE_IMGSZ=640
+"""
+
+import glob
+import os
+import time
+from collections import deque
+
+import numpy as np
+from ultralytics import YOLO
+
+INFERENCE_BACKEND = os.environ.get('HYDRACAT_INFERENCE_BACKEND', 'torch').lower()
+INFERENCE_INT8 = os.environ.get('HYDRACAT_INFERENCE_INT8', '0') == '1'
+INFERENCE_THREADS = int(os.environ.get('HYDRACAT_INFERENCE_THREADS', '0'))
+INFERENCE_IMGSZ = int(os.environ.get('HYDRACAT_INFERENCE_IMGSZ', '640'))
+
+BACKENDS = ('torch', 'onnx', 'openvino')
+
+
+class InferenceBackend:
+    """
+    YOLO model behind a selectable runtime
+    - Drop-in for the ultralytics model: model(frame, verbose=False) and model.names
+    - Exported models are cached on disk and reused on the next start
+    - Falls back to PyTorch when an export or runtime is unavailable
+    - Reports backend, load / warm-up time and rolling per-frame latency
+    """
+
+    def __init__(self, model_path, backend=INFERENCE_BACKEND, int8=INFERENCE_INT8,
+                 threads=INFERENCE_THREADS, imgsz=INFERENCE_IMGSZ):
+        self.model_path = model_path
+        self.requested_backend = backend if backend in BACKENDS else 'torch'
+        self.int8 = int8
+        self.threads = threads
+        self.imgsz = imgsz
+        self.latencies = deque(maxlen=100)
+        self.frames = 0
+        self.warmup_ms = None
+        self.threads_applied = False
+
+        started = time.perf_counter()
+        self.backend, self.model_file, self.model = self._load()
+        self.load_ms = (time.perf_counter() - started) * 1000
+        print(f"🧠 Inference backend: {self.backend}{' (INT8)' if self.int8 and self.backend != 'torch' else ''} "
+              f"- {self.model_file} loaded in {self.load_ms:.0f}ms")
+
+    @property
+    def names(self):
+        return self.model.names
+
+    def _load(self):
+        """Export (once) and load the requested backend, falling back to PyTorch"""
+        if self.requested_backend != 'torch':
+            try:
+                model_file = self._export()
+                return self.requested_backend, model_file, YOLO(model_file, task='detect')
+            except Exception as e:
+                print(f"⚠️  {self.requested_backend} backend unavailable ({e}) - falling back to PyTorch")
+        self.int8 = False
+        return 'torch', self.model_path, YOLO(self.model_path)
+
+    def _export(self):
+        stem = os.path.splitext(self.model_path)[0]
+        if self.requested_backend == 'onnx':
+            onnx_file = f"{stem}.onnx"
+            if not os.path.exists(onnx_file):
+                print(f"📦 Exporting {self.model_path} to ONNX...")
+                onnx_file = YOLO(self.model_path).export(format='onnx', imgsz=self.imgsz)
+            if not self.int8:
+                return onnx_file
+
+            int8_file = f"{stem}.int8.onnx"
+            if not os.path.exists(int8_file):
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+                print(f"📦 Quantizing {onnx_file} to INT8...")
+                quantize_dynamic(onnx_file, int8_file, weight_type=QuantType.QUInt8)
+            return int8_file
+
+        # OpenVINO: ultralytics writes a <stem>[_int8]_openvino_model directory
+        model_dir = f"{stem}{'_int8' if self.int8 else ''}_openvino_model"
+        if not os.path.isdir(model_dir):
+            print(f"📦 Exporting {self.model_path} to OpenVINO{' INT8' if self.int8 else ''}...")
+            model_dir = YOLO(self.model_path).export(format='openvino', imgsz=self.imgsz, int8=self.int8)
+        return model_dir
+
+    def _apply_threads(self):
+        """Pin the runtime's intra-op thread count (after the predictor exists)"""
+        if self.threads <= 0:
+            return
+        try:
+            if self.backend == 'torch':
+                import torch
+                torch.set_num_threads(self.threads)
+            else:
+                runtime = self.model.predictor.model
+                if self.backend == 'onnx':
+                    import onnxruntime as ort
+                    options = ort.SessionOptions()
+                    options.intra_op_num_threads = self.threads
+                    options.inter_op_num_threads = 1
+                    runtime.session = ort.InferenceSession(self.model_file, options,
+                                                           providers=runtime.session.get_providers())
+                else:
+                    import openvino as ov
+                    xml_file = glob.glob(os.path.join(self.model_file, '*.xml'))[0]
+                    runtime.ov_compiled_model = ov.Core().compile_model(
+                        xml_file, 'CPU', {'INFERENCE_NUM_THREADS': self.threads, 'PERFORMANCE_HINT': 'LATENCY'})
+            self.threads_applied = True
+        except Exception as e:
+            print(f"⚠️  Unable to set {self.threads} inference threads on {self.backend}: {e}")
+
+    def warmup(self, runs=2):
+        """Run dummy frames so graph setup / allocation never lands on a live frame"""
+        dummy = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+        started = time.perf_counter()
+        self.model(dummy, verbose=False, imgsz=self.imgsz)
+        self._apply_threads()
+        for _ in range(max(runs - 1, 0)):
+            self.model(dummy, verbose=False, imgsz=self.imgsz)
+        self.warmup_ms = (time.perf_counter() - started) * 1000
+        print(f"🔥 Inference warm-up: {runs} runs in {self.warmup_ms:.0f}ms")
+
+    def __call__(self, frame, **kwargs):
+        """Run inference on one frame and record its latency"""
+        kwargs.setdefault('imgsz', self.imgsz)
+        started = time.perf_counter()
+        results = self.model(frame, **kwargs)
+        self.latencies.append((time.perf_counter() - started) * 1000)
+        self.frames += 1
+        return results
+
+    def get_stats(self):
+        """Backend choice and measured latency"""
+        latencies = list(self.latencies)
+        return {
+            'backend': self.backend,
+            'requested_backend': self.requested_backend,
+            'int8': self.int8,
+            'threads': self.threads or 'default',
+            'threads_applied': self.threads_applied,
+            'imgsz': self.imgsz,
+            'model_file': self.model_file,
+            'load_ms': round(self.load_ms, 1),
+            'warmup_ms': round(self.warmup_ms, 1) if self.warmup_ms is not None else None,
+            'frames': self.frames,
+            'avg_latency_ms': round(float(np.mean(latencies)), 2) if latencies else None,
+            'last_latency_ms': round(latencies[-1], 2) if latencies else None
+        }
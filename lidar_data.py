@@ -0,0 +1,574 @@
+"""
+LiDAR Point Data
+================
+
+Point cloud ingestion and binary transfer for the LiDAR viewer (app.py):
+- Point CSVs are parsed once into NumPy columns (x, y, z, intensity, timestamp)
+- Points are sorted by timestamp at ingest, so the browser never sorts
+- The cloud is served as one little-endian buffer that the viewer wraps in
+  Float32Array views and uploads straight into a THREE.BufferGeometry
+- Voxel-grid level-of-detail tiers (1 m, 25 cm, 5 cm by default) are built at
+  ingest; the tier matching a point budget / view extent is served instead of
+  every point
+- Time windows are located by binary search on the sorted timestamps, so replay
+  streams one buffer per window and can seek anywhere in the capture
+- Large captures are converted once (python lidar_data.py convert ...) into
+  memory-mapped .npy columns plus a zone map (PointCapture); time windows read
+  only their own rows, box filters run block by block over what the time
+  window (and the zone map) leaves, with memory bounded by max_points
+
+CSV columns (header row required): x, y, z, intensity and a time column
+(host_clock, time or timestamp) holding seconds since midnight, "H:M:S" or "M:S".
+Missing values follow the old browser parser: x/y/z -> 0, intensity -> 10.
+
+Binary layout (little-endian, every section 4-byte aligned):
+    header      48 bytes
+        magic        4s   b'HCPC'
+        version      u32  1
+        count        u32  number of points
+        header_size  u32  byte offset of the first data section
+        time_origin  f64  timestamp of the first point (seconds since midnight)
+        bounds_min   3*f32
+        bounds_max   3*f32
+    positions   count*3 f32  interleaved x, y, z
+    intensity   count   f32
+    time        count   f32  seconds since time_origin
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+BINARY_MAGIC = b'HCPC'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sIIId3f3f')
+
+TIME_COLUMNS = ('host_clock', 'time', 'timestamp')
+DEFAULT_INTENSITY = 10.0
+CSV_CHUNK_ROWS = 200000
+
+# Voxel edge lengths (metres) of the level-of-detail tiers, and the default per-request point budget
+LOD_VOXEL_SIZES = tuple(float(size) for size in os.environ.get('HYDRACAT_LIDAR_LOD', '1.0,0.25,0.05').split(','))
+DEFAULT_POINT_BUDGET = int(os.environ.get('HYDRACAT_LIDAR_POINT_BUDGET', '500000'))
+
+# Memory-mapped capture directories: column files, rows per zone-map block, reserved .npy header bytes
+CAPTURE_VERSION = 1
+CAPTURE_COLUMNS = {'positions': ('<f4', 3), 'intensity': ('<f4', None), 'timestamps': ('<f8', None)}
+CAPTURE_BLOCK_ROWS = 65536
+NPY_HEADER_SIZE = 128
+
+# Rows without any time value get the viewer's historical placeholder clock (13:44:SS)
+FALLBACK_TIME_BASE = 13 * 3600 + 44 * 60
+
+
+class PointCloud:
+    """
+    Time-sorted LiDAR points stored as parallel NumPy columns
+    - positions: (N, 3) float32 x, y, z
+    - intensity: (N,) float32
+    - timestamps: (N,) float64 seconds since midnight, ascending
+    """
+
+    def __init__(self, positions, intensity, timestamps, source=None):
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        intensity = np.asarray(intensity, dtype=np.float32)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+
+        # Stable sort keeps file order for equal timestamps; skipped when already ordered
+        if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+            positions, intensity, timestamps = positions[order], intensity[order], timestamps[order]
+
+        self.positions = np.ascontiguousarray(positions)
+        self.intensity = np.ascontiguousarray(intensity)
+        self.timestamps = timestamps
+        self.source = source
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def time_origin(self):
+        return float(self.timestamps[0]) if len(self) else 0.0
+
+    def bounds(self):
+        """(min xyz, max xyz) of the cloud"""
+        if not len(self):
+            return np.zeros(3, dtype=np.float32), np.zeros(3, dtype=np.float32)
+        return self.positions.min(axis=0), self.positions.max(axis=0)
+
+    def to_binary(self):
+        """Header + Float32 columns (see module docstring)"""
+        lower, upper = self.bounds()
+        header = BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(self), BINARY_HEADER.size,
+                                    self.time_origin, *lower.tolist(), *upper.tolist())
+        offsets = (self.timestamps - self.time_origin).astype('<f4')
+        return b''.join((header, self.positions.astype('<f4', copy=False).tobytes(),
+                         self.intensity.astype('<f4', copy=False).tobytes(), offsets.tobytes()))
+
+    def take(self, indices):
+        """New cloud of the points at (ascending) indices or a slice"""
+        return PointCloud(self.positions[indices], self.intensity[indices], self.timestamps[indices], self.source)
+
+    def time_range(self, start, end):
+        """(first, stop) indices of the points with start <= timestamp < end (binary search, no scan)"""
+        return (int(np.searchsorted(self.timestamps, start, 'left')),
+                int(np.searchsorted(self.timestamps, end, 'left')))
+
+    def time_bounds(self):
+        """(first, last) timestamp"""
+        return self.time_origin, float(self.timestamps[-1]) if len(self) else 0.0
+
+    def time_slice(self, start, end, max_points=None):
+        """Points with start <= timestamp < end, strided down to max_points"""
+        window = self.take(slice(*self.time_range(start, end)))
+        return window.subsample(max_points) if max_points else window
+
+    def next_time(self, after):
+        """First timestamp >= after, or None past the end"""
+        index = int(np.searchsorted(self.timestamps, after, 'left'))
+        return float(self.timestamps[index]) if index < len(self) else None
+
+    def subsample(self, max_points):
+        """Evenly strided subset of at most max_points points (time order kept)"""
+        if len(self) <= max_points:
+            return self
+        return self.take(np.linspace(0, len(self) - 1, max_points).astype(np.int64))
+
+    def voxel_downsample(self, voxel_size):
+        """
+        One point per occupied voxel: centroid position, mean intensity and the
+        voxel's first timestamp (so time-ordered playback still works)
+        """
+        if not len(self):
+            return self
+        lower = self.positions.min(axis=0)
+        cells = np.floor((self.positions - lower) / voxel_size).astype(np.int64)
+        dims = cells.max(axis=0) + 1
+        keys = cells[:, 0] + dims[0] * (cells[:, 1] + dims[1] * cells[:, 2])
+        _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+
+        # Points are time-sorted, so the first point of each voxel is its earliest
+        positions = np.column_stack([np.bincount(inverse, weights=self.positions[:, axis]) / counts
+                                     for axis in range(3)])
+        intensity = np.bincount(inverse, weights=self.intensity) / counts
+        return PointCloud(positions, intensity, self.timestamps[first], self.source)
+
+    def get_stats(self):
+        """Size, extent and time span for diagnostics"""
+        lower, upper = self.bounds()
+        return {
+            'points': len(self),
+            'source': self.source,
+            'time_start': self.time_origin,
+            'time_end': float(self.timestamps[-1]) if len(self) else 0.0,
+            'bounds_min': [round(float(v), 3) for v in lower],
+            'bounds_max': [round(float(v), 3) for v in upper],
+            'memory_bytes': int(self.positions.nbytes + self.intensity.nbytes + self.timestamps.nbytes)
+        }
+
+
+class PointCloudLOD:
+    """
+    Voxel-grid level-of-detail tiers of one PointCloud
+    - Tiers run from the coarsest voxel grid to the full-resolution cloud (voxel size 0)
+    - Built once with NumPy (np.unique over voxel keys + bincount centroids)
+    - select() returns the most detailed tier within a point budget and view extent,
+      strided down further when even the coarsest tier is over budget
+    """
+
+    def __init__(self, cloud, voxel_sizes=LOD_VOXEL_SIZES):
+        self.tiers = [(size, cloud.voxel_downsample(size)) for size in sorted(voxel_sizes, reverse=True)]
+        self.tiers.append((0.0, cloud))
+
+    def __len__(self):
+        return len(self.tiers)
+
+    def select(self, budget=DEFAULT_POINT_BUDGET, extent=None, pixels=1024):
+        """
+        (tier index, cloud) for a request
+        - budget: maximum number of points the client will hold
+        - extent: visible width in metres; detail finer than extent / pixels is not drawn
+          (ignored unless finite and positive)
+        """
+        index = len(self.tiers) - 1
+        if extent is not None and np.isfinite(extent) and extent > 0:
+            spacing = extent / pixels
+            index = next((i for i, (size, _) in enumerate(self.tiers) if size <= spacing), index)
+        while index > 0 and len(self.tiers[index][1]) > budget:
+            index -= 1
+        return index, self.tiers[index][1].subsample(budget)
+
+    def get_stats(self):
+        """Voxel size and point count per tier"""
+        return [{'tier': i, 'voxel_size': size, 'points': len(cloud)} for i, (size, cloud) in enumerate(self.tiers)]
+
+
+class PointCapture:
+    """
+    Capture directory written by convert_point_csv, opened lazily as memory-mapped columns
+    - positions.npy (N, 3) f4, intensity.npy (N,) f4, timestamps.npy (N,) f8, meta.json
+    - blocks.npy zone map: per block of rows its row range, time range and bounding box
+    - Opening reads only meta.json and the zone map; slices page in just the rows they touch
+    - The time window is narrowed first: a binary search on the mapped timestamps when the
+      capture is globally time-sorted, otherwise the blocks whose time range overlaps it
+    - A box filter then runs block by block over those rows; blocks are time-ordered, so
+      their bounding boxes only prune when the capture is spatially coherent in time
+    - Hits are decimated while scanning, so memory stays bounded by max_points
+    - Slices are returned as in-memory, time-sorted PointClouds strided down to max_points
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as handle:
+            self.meta = json.load(handle)
+        if self.meta.get('format') != 'hydracat-capture' or self.meta.get('version') != CAPTURE_VERSION:
+            raise ValueError(f"{path}: not a version {CAPTURE_VERSION} capture")
+        self.positions, self.intensity, self.timestamps = (
+            np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in CAPTURE_COLUMNS)
+        self.blocks = np.load(os.path.join(path, 'blocks.npy'))
+        self.time_sorted = self.meta['time_sorted']
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def time_bounds(self):
+        """(first, last) timestamp, from the metadata"""
+        return self.meta['time_start'], self.meta['time_end']
+
+    def _rows(self, rows):
+        """In-memory PointCloud of a slice or (ascending) index array of rows"""
+        return PointCloud(self.positions[rows], self.intensity[rows], self.timestamps[rows], self.path)
+
+    def _scan(self, pieces, row_filter, max_points):
+        """
+        Rows passing row_filter(positions, timestamps) in the (first, stop) row ranges of `pieces`
+        - With max_points, every stride-th hit is kept and the stride doubles whenever more
+          than 2 * max_points are held, so a wide query never materializes all of its hits
+        """
+        parts = []  # (hit ordinals, positions, intensity, timestamps)
+        stride, hits, held = 1, 0, 0
+        for first, stop in pieces:
+            positions = np.asarray(self.positions[first:stop])
+            timestamps = np.asarray(self.timestamps[first:stop])
+            keep = np.flatnonzero(row_filter(positions, timestamps))
+            ordinals = hits + np.arange(len(keep))
+            hits += len(keep)
+            if stride > 1:
+                keep, ordinals = keep[ordinals % stride == 0], ordinals[ordinals % stride == 0]
+            if not len(keep):
+                continue
+            parts.append((ordinals, positions[keep], np.asarray(self.intensity[first:stop])[keep], timestamps[keep]))
+            held += len(keep)
+            while max_points and held > 2 * max_points:
+                stride *= 2
+                parts = [tuple(column[part[0] % stride == 0] for column in part) for part in parts]
+                held = sum(len(part[0]) for part in parts)
+        if not parts:
+            return PointCloud(np.zeros((0, 3)), np.zeros(0), np.zeros(0), self.path)
+        cloud = PointCloud(*(np.concatenate(column) for column in list(zip(*parts))[1:]), source=self.path)
+        return cloud.subsample(max_points) if max_points else cloud
+
+    def slice(self, start=-np.inf, end=np.inf, lower=None, upper=None, max_points=None):
+        """Points with start <= timestamp < end, optionally inside the box [lower, upper] (x, y, z)"""
+        box = lower is not None and upper is not None
+        if self.time_sorted:
+            first, stop = (int(np.searchsorted(self.timestamps, bound, 'left')) for bound in (start, end))
+            if not box:
+                if max_points and stop - first > max_points:
+                    # Read only the strided rows, not the whole window
+                    return self._rows(np.linspace(first, stop - 1, max_points).astype(np.int64))
+                return self._rows(slice(first, stop))
+        selected = (self.blocks[:, 3] >= start) & (self.blocks[:, 2] < end)
+        if box:
+            lower = np.asarray(lower, dtype=np.float64)
+            upper = np.asarray(upper, dtype=np.float64)
+            selected &= np.all(self.blocks[:, 4:7] <= upper, axis=1) & np.all(self.blocks[:, 7:10] >= lower, axis=1)
+        pieces = self.blocks[selected, :2].astype(np.int64)
+        if self.time_sorted:
+            # Rows outside the binary-searched window are never read
+            pieces = np.clip(pieces, first, stop)
+            pieces = pieces[pieces[:, 1] > pieces[:, 0]]
+
+        def row_filter(points, times):
+            keep = (times >= start) & (times < end)
+            if box:
+                keep &= np.all((points >= lower) & (points <= upper), axis=1)
+            return keep
+
+        return self._scan(pieces.tolist(), row_filter, max_points)
+
+    def time_slice(self, start, end, max_points=None):
+        """Points with start <= timestamp < end, strided down to max_points"""
+        return self.slice(start, end, max_points=max_points)
+
+    def bbox_slice(self, lower, upper, max_points=None):
+        """Points inside the box [lower, upper] (x, y, z), strided down to max_points"""
+        return self.slice(lower=lower, upper=upper, max_points=max_points)
+
+    def next_time(self, after):
+        """First timestamp >= after, or None past the end"""
+        if self.time_sorted:
+            index = int(np.searchsorted(self.timestamps, after, 'left'))
+            return float(self.timestamps[index]) if index < len(self) else None
+        starts, ends = self.blocks[:, 2], self.blocks[:, 3]
+        later = starts[starts >= after]
+        best = later.min() if len(later) else np.inf
+        # Blocks straddling `after` are the only ones that need reading
+        for first, stop in self.blocks[(starts < after) & (ends >= after), :2].astype(np.int64):
+            times = np.asarray(self.timestamps[first:stop])
+            best = min(best, times[times >= after].min())
+        return float(best) if np.isfinite(best) else None
+
+    def get_stats(self):
+        """Capture metadata plus the zone-map size"""
+        return dict(self.meta, name=os.path.basename(os.path.normpath(self.path)), blocks=len(self.blocks))
+
+
+def parse_time_value(value):
+    """Seconds since midnight from a number, "H:M:S" or "M:S" string (NaN when unparseable)"""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = value.split(':')
+    try:
+        if len(parts) == 3:
+            return float(parts[0]) * 3600 + float(parts[1]) * 60 + float(parts[2])
+        if len(parts) == 2:
+            # "M:S" was always shown as 13:MM:SS by the viewer
+            return 13 * 3600 + float(parts[0]) * 60 + float(parts[1])
+    except ValueError:
+        pass
+    return np.nan
+
+
+def _to_float(values):
+    """Column of CSV strings to float64; empty or malformed cells become NaN"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        parsed = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = float(value)
+            except ValueError:
+                parsed[i] = np.nan
+        return parsed
+
+
+def _parse_times(values):
+    """Time column to seconds: vectorized for uniform columns, else each distinct string parsed once"""
+    # Fast paths: every value numeric, or every value "H:M:S"
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        pass
+    if set(map(str.count, values, itertools.repeat(':'))) == {2}:
+        try:
+            fields = np.array(':'.join(values).split(':'), dtype=np.float64).reshape(-1, 3)
+            return fields @ np.array([3600.0, 60.0, 1.0])
+        except ValueError:
+            pass
+
+    unique, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    parsed = np.array([parse_time_value(value) if value else np.nan for value in unique], dtype=np.float64)
+    return parsed[inverse]
+
+
+def _split_chunk(lines, width, required):
+    """CSV lines -> column lists (width columns) of the non-blank rows with at least `required` cells"""
+    text = ''.join(lines)
+    if '"' not in text:
+        # Plain numeric CSV: split the whole chunk at C speed
+        rows = text.splitlines()
+        if not all(map(str.strip, rows, itertools.repeat(', \t'))):
+            rows = [line for line in rows if line.strip(', \t')]
+        if set(map(str.count, rows, itertools.repeat(','))) <= {width - 1}:
+            fields = ','.join(rows).split(',') if rows else []
+            return [fields[column::width] for column in range(width)]
+
+    # Quoted cells or ragged rows; rows missing x, y or z are skipped as the browser parser did
+    rows = [row[:width] + [''] * (width - len(row)) for row in csv.reader(lines)
+            if len(row) >= required and any(cell.strip() for cell in row)]
+    return [list(column) for column in zip(*rows)] if rows else [[] for _ in range(width)]
+
+
+def _parse_chunk(columns, index, time_columns, first_index):
+    """One chunk of CSV columns -> (positions, intensity, timestamps)"""
+    positions = np.column_stack([np.nan_to_num(_to_float(columns[index[axis]])) for axis in ('x', 'y', 'z')])
+    count = len(positions)
+    if not count:
+        return None
+
+    if 'intensity' in index:
+        intensity = _to_float(columns[index['intensity']])
+        intensity[~np.isfinite(intensity) | (intensity == 0)] = DEFAULT_INTENSITY
+    else:
+        intensity = np.full(count, DEFAULT_INTENSITY)
+
+    # First non-empty time column per row, like host_clock || time || timestamp
+    times = None
+    for column in time_columns:
+        values = columns[column]
+        if times is None:
+            times = [value.strip() for value in values]
+        elif '' in times:
+            times = [current or value.strip() for current, value in zip(times, values)]
+    timestamps = _parse_times(times) if times is not None else np.full(count, np.nan)
+    missing = np.isnan(timestamps)
+    if missing.any():
+        row_index = first_index + np.flatnonzero(missing)
+        timestamps[missing] = FALLBACK_TIME_BASE + (row_index // 100) % 60
+    return positions, intensity, timestamps
+
+
+def iter_point_csv(path, chunk_rows=CSV_CHUNK_ROWS):
+    """Yield (positions, intensity, timestamps) per chunk of a LiDAR point CSV, in file order"""
+    with open(path, newline='') as handle:
+        header = [name.strip() for name in next(csv.reader([handle.readline()]), [])]
+        index = {name: i for i, name in enumerate(header)}
+        if not {'x', 'y', 'z'} <= index.keys():
+            raise ValueError(f"{path}: header needs x, y and z columns (got {header})")
+        time_columns = [index[name] for name in TIME_COLUMNS if name in index]
+
+        first_index = 0
+        while True:
+            lines = list(itertools.islice(handle, chunk_rows))
+            if not lines:
+                break
+            columns = _split_chunk(lines, len(header), max(index['x'], index['y'], index['z']) + 1)
+            chunk = _parse_chunk(columns, index, time_columns, first_index)
+            if chunk is not None:
+                first_index += len(chunk[0])
+                yield chunk
+
+
+def load_point_csv(path, chunk_rows=CSV_CHUNK_ROWS):
+    """Parse a LiDAR point CSV into a time-sorted PointCloud (chunked to bound memory)"""
+    chunks = list(iter_point_csv(path, chunk_rows))
+    if not chunks:
+        raise ValueError(f"{path}: no valid points")
+    positions, intensity, timestamps = (np.concatenate(parts) for parts in zip(*chunks))
+    return PointCloud(positions, intensity, timestamps, source=path)
+
+
+class _NpyColumnWriter:
+    """
+    Appends rows to a .npy file whose length is unknown up front
+    - A fixed-size header is reserved and rewritten with the final shape on close
+    """
+
+    def __init__(self, path, dtype, width=None):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.width = width
+        self.rows = 0
+        self.handle = open(path, 'wb')
+        self.handle.write(self._header())
+
+    def _header(self):
+        shape = (self.rows, self.width) if self.width else (self.rows,)
+        header = repr({'descr': self.dtype.str, 'fortran_order': False, 'shape': shape}).encode('latin1')
+        padding = NPY_HEADER_SIZE - 10 - len(header) - 1
+        return b'\x93NUMPY\x01\x00' + struct.pack('<H', NPY_HEADER_SIZE - 10) + header + b' ' * padding + b'\n'
+
+    def write(self, values):
+        self.handle.write(np.ascontiguousarray(values, dtype=self.dtype).tobytes())
+        self.rows += len(values)
+
+    def close(self):
+        self.handle.seek(0)
+        self.handle.write(self._header())
+        self.handle.close()
+
+
+def convert_point_csv(csv_path, capture_dir, chunk_rows=CSV_CHUNK_ROWS, block_rows=CAPTURE_BLOCK_ROWS):
+    """
+    Stream a point CSV into a memory-mapped capture directory (see PointCapture) in constant memory
+    Rows are time-sorted within each chunk; returns the conversion report (also stored in meta.json)
+    """
+    started = time.perf_counter()
+    os.makedirs(capture_dir, exist_ok=True)
+    writers = {name: _NpyColumnWriter(os.path.join(capture_dir, f"{name}.npy"), dtype, width)
+               for name, (dtype, width) in CAPTURE_COLUMNS.items()}
+    blocks = []
+    ordered = True
+    last_time = -np.inf
+    try:
+        for positions, intensity, timestamps in iter_point_csv(csv_path, chunk_rows):
+            order = np.argsort(timestamps, kind='stable')
+            positions, intensity, timestamps = positions[order], intensity[order], timestamps[order]
+            ordered = ordered and timestamps[0] >= last_time
+            last_time = max(last_time, timestamps[-1])
+
+            # Zone map per block: row range, time range and bounding box
+            for first in range(0, len(timestamps), block_rows):
+                stop = min(first + block_rows, len(timestamps))
+                block = positions[first:stop]
+                row = writers['timestamps'].rows
+                blocks.append([row + first, row + stop, timestamps[first], timestamps[stop - 1],
+                               *block.min(axis=0), *block.max(axis=0)])
+            writers['positions'].write(positions)
+            writers['intensity'].write(intensity)
+            writers['timestamps'].write(timestamps)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    count = writers['timestamps'].rows
+    if not count:
+        raise ValueError(f"{csv_path}: no valid points")
+    blocks = np.array(blocks, dtype=np.float64)
+    np.save(os.path.join(capture_dir, 'blocks.npy'), blocks)
+
+    seconds = time.perf_counter() - started
+    input_bytes = os.path.getsize(csv_path)
+    output_bytes = sum(os.path.getsize(os.path.join(capture_dir, name))
+                       for name in os.listdir(capture_dir) if name.endswith('.npy'))
+    report = {
+        'points': count,
+        'seconds': round(seconds, 3),
+        'points_per_second': round(count / seconds),
+        'input_mb_per_second': round(input_bytes / seconds / 1e6, 1),
+        'input_bytes': input_bytes,
+        'output_bytes': output_bytes
+    }
+    meta = {
+        'format': 'hydracat-capture',
+        'version': CAPTURE_VERSION,
+        'source': os.path.abspath(csv_path),
+        'points': count,
+        'time_sorted': bool(ordered),
+        'time_start': float(blocks[:, 2].min()),
+        'time_end': float(blocks[:, 3].max()),
+        'bounds_min': blocks[:, 4:7].min(axis=0).tolist(),
+        'bounds_max': blocks[:, 7:10].max(axis=0).tolist(),
+        'block_rows': block_rows,
+        'converted_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'conversion': report
+    }
+    with open(os.path.join(capture_dir, 'meta.json'), 'w') as handle:
+        json.dump(meta, handle, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="LiDAR point data tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    converter = subparsers.add_parser('convert', help="convert a point CSV into a memory-mapped capture")
+    converter.add_argument('csv', help="point CSV (e.g. static/point.csv)")
+    converter.add_argument('capture', help="output capture directory (e.g. lidar_captures/survey_01)")
+    converter.add_argument('--chunk-rows', type=int, default=CSV_CHUNK_ROWS, help="CSV rows parsed per chunk")
+    args = parser.parse_args()
+
+    report = convert_point_csv(args.csv, args.capture, args.chunk_rows)
+    print(f"📦 {args.csv} -> {args.capture}: {report['points']:,} points in {report['seconds']:.2f}s "
+          f"({report['points_per_second']:,} points/s, {report['input_mb_per_second']} MB/s in, "
+          f"{report['output_bytes'] / 1e6:.1f} MB out)")
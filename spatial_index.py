@@ -0,0 +1,252 @@
+"""
+Spatial Index
+=============
+
+KD-tree spatial index for LiDAR points and hidden-map features (app.py):
+- Static KDTree built with NumPy (median splits via argpartition, bounding box per node)
+- Bounding-box, radius and k-nearest queries prune whole subtrees, so query time
+  grows with log(n) plus the number of hits instead of with the cloud size
+- Whole nodes fully inside a query are taken without per-point tests; leaves are
+  filtered as arrays
+- SpatialIndex accepts batches incrementally (new scans) using the logarithmic
+  method: a stack of KD-trees whose sizes double, merged like a binary counter,
+  so each point is rebuilt O(log n) times in total
+- Works in any dimension (3-D point clouds, 2-D map features)
+"""
+
+import heapq
+
+import numpy as np
+
+LEAF_SIZE = 64
+
+
+class KDTree:
+    """
+    Immutable KD-tree over (N, D) points with caller-supplied integer ids
+    - Nodes are stored in flat arrays: index range, children and bounding box
+    - Points and ids are permuted so every node covers a contiguous slice
+    """
+
+    def __init__(self, points, ids, leaf_size=LEAF_SIZE):
+        self.points = np.ascontiguousarray(points, dtype=np.float64)
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.leaf_size = leaf_size
+        starts, ends, lefts, rights, lowers, uppers = [], [], [], [], [], []
+
+        # Points and ids are reordered in place so each node stays a contiguous slice
+        points, ids = self.points.copy(), self.ids.copy()
+        root_bounds = (points.min(axis=0), points.max(axis=0)) if len(points) else (np.zeros(0), np.zeros(0))
+        stack = [(0, len(points), -1, False, *root_bounds)]  # (start, end, parent, is_right, lower, upper)
+        while stack:
+            start, end, parent, is_right, lower, upper = stack.pop()
+            node = len(starts)
+            if parent >= 0:
+                (rights if is_right else lefts)[parent] = node
+            block = points[start:end]
+            starts.append(start)
+            ends.append(end)
+            lefts.append(-1)
+            rights.append(-1)
+            if end - start <= leaf_size:
+                # Tight boxes at the leaves; inner nodes keep the cell bounds of their splits
+                lowers.append(block.min(axis=0))
+                uppers.append(block.max(axis=0))
+                continue
+            lowers.append(lower)
+            uppers.append(upper)
+
+            # Median split along the widest dimension of the cell
+            axis = int(np.argmax(upper - lower))
+            middle = (end - start) // 2
+            partition = np.argpartition(block[:, axis], middle)
+            points[start:end] = block[partition]
+            ids[start:end] = ids[start:end][partition]
+            split = points[start + middle, axis]
+            left_upper, right_lower = upper.copy(), lower.copy()
+            left_upper[axis] = right_lower[axis] = split
+            stack.append((start + middle, end, node, True, right_lower, upper))
+            stack.append((start, start + middle, node, False, lower, left_upper))
+
+        self.points, self.ids = points, ids
+        self.starts = np.array(starts, dtype=np.int64)
+        self.ends = np.array(ends, dtype=np.int64)
+        self.lefts = np.array(lefts, dtype=np.int64)
+        self.rights = np.array(rights, dtype=np.int64)
+        self.lowers = np.array(lowers).reshape(-1, points.shape[1])
+        self.uppers = np.array(uppers).reshape(-1, points.shape[1])
+
+    def __len__(self):
+        return len(self.points)
+
+    def _collect(self, node_test, point_test):
+        """
+        Generic pruned traversal
+        - node_test(node) -> 0 (disjoint), 1 (partly inside), 2 (fully inside)
+        - point_test(points) -> boolean mask for leaf points
+        """
+        hits = []
+        stack = [0] if len(self) else []
+        while stack:
+            node = stack.pop()
+            state = node_test(node)
+            if state == 0:
+                continue
+            start, end = self.starts[node], self.ends[node]
+            if state == 2:
+                hits.append(np.arange(start, end))
+            elif self.lefts[node] < 0:
+                hits.append(start + np.flatnonzero(point_test(self.points[start:end])))
+            else:
+                stack.append(self.rights[node])
+                stack.append(self.lefts[node])
+        return np.concatenate(hits) if hits else np.zeros(0, dtype=np.int64)
+
+    def query_bbox(self, lower, upper):
+        """Positions into self.points of every point inside [lower, upper]"""
+        lower = np.asarray(lower, dtype=np.float64)
+        upper = np.asarray(upper, dtype=np.float64)
+
+        def node_test(node):
+            node_lower, node_upper = self.lowers[node], self.uppers[node]
+            if np.any(node_lower > upper) or np.any(node_upper < lower):
+                return 0
+            return 2 if np.all(node_lower >= lower) and np.all(node_upper <= upper) else 1
+
+        return self._collect(node_test, lambda points: np.all((points >= lower) & (points <= upper), axis=1))
+
+    def query_radius(self, center, radius):
+        """Positions into self.points of every point within radius of center"""
+        center = np.asarray(center, dtype=np.float64)
+        radius_sq = radius * radius
+
+        def node_test(node):
+            node_lower, node_upper = self.lowers[node], self.uppers[node]
+            nearest = np.clip(center, node_lower, node_upper)
+            if np.sum((nearest - center) ** 2) > radius_sq:
+                return 0
+            farthest = np.maximum(np.abs(center - node_lower), np.abs(center - node_upper))
+            return 2 if np.sum(farthest ** 2) <= radius_sq else 1
+
+        return self._collect(node_test, lambda points: np.sum((points - center) ** 2, axis=1) <= radius_sq)
+
+    def query_knn(self, center, k, best=None, tree_no=0):
+        """
+        k nearest points as a max-heap list of (-distance_sq, tree_no, position), best-first search
+        best: heap from another tree to continue from (SpatialIndex merges trees this way)
+        tree_no: tags entries with their tree, which also breaks distance ties without comparing trees
+        """
+        center = np.asarray(center, dtype=np.float64)
+        best = [] if best is None else best
+        if not len(self) or k <= 0:
+            return best
+
+        def box_distance(node):
+            nearest = np.clip(center, self.lowers[node], self.uppers[node])
+            return float(np.sum((nearest - center) ** 2))
+
+        frontier = [(box_distance(0), 0)]
+        while frontier:
+            distance_sq, node = heapq.heappop(frontier)
+            if len(best) == k and distance_sq > -best[0][0]:
+                break
+            if self.lefts[node] < 0:
+                start, end = self.starts[node], self.ends[node]
+                distances = np.sum((self.points[start:end] - center) ** 2, axis=1)
+                for position in np.argsort(distances)[:k]:
+                    item = (-float(distances[position]), tree_no, int(start + position))
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item[0] > best[0][0]:
+                        heapq.heapreplace(best, item)
+                    else:
+                        break
+            else:
+                for child in (self.lefts[node], self.rights[node]):
+                    heapq.heappush(frontier, (box_distance(child), child))
+        return best
+
+
+class SpatialIndex:
+    """
+    Incrementally built spatial index (logarithmic method over KD-trees)
+    - add() indexes a new batch; trees of similar size are merged and rebuilt
+    - Queries run on every tree (O(log n) trees) and return (ids, points)
+    - ids are caller-supplied, or sequential in insertion order
+    - Queries need no lock; add() is meant to be called from one thread at a time
+    """
+
+    def __init__(self, dims=3, leaf_size=LEAF_SIZE):
+        self.dims = dims
+        self.leaf_size = leaf_size
+        self.trees = []
+        self.count = 0
+        self.rebuilt_points = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, points, ids=None):
+        """Index a batch of points; returns the ids assigned to them"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, self.dims)
+        ids = np.arange(self.count, self.count + len(points)) if ids is None else np.asarray(ids, dtype=np.int64)
+        if not len(points):
+            return ids
+
+        # Binary-counter merge: fold in every tree no larger than the new one
+        trees = list(self.trees)
+        merged_points, merged_ids = [points], [ids]
+        size = len(points)
+        while trees and len(trees[-1]) <= size:
+            tree = trees.pop()
+            merged_points.append(tree.points)
+            merged_ids.append(tree.ids)
+            size += len(tree)
+        trees.append(KDTree(np.concatenate(merged_points), np.concatenate(merged_ids), self.leaf_size))
+
+        # Swapped in one assignment so concurrent queries see either the old or the new trees
+        self.trees = trees
+        self.count += len(points)
+        self.rebuilt_points += size
+        return ids
+
+    def _gather(self, hits_per_tree, limit=None):
+        ids = [tree.ids[hits] for tree, hits in hits_per_tree]
+        points = [tree.points[hits] for tree, hits in hits_per_tree]
+        ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+        points = np.concatenate(points) if points else np.zeros((0, self.dims))
+        if limit is not None:
+            ids, points = ids[:limit], points[:limit]
+        return ids, points
+
+    def query_bbox(self, lower, upper, limit=None):
+        """(ids, points) inside the box [lower, upper]"""
+        return self._gather([(tree, tree.query_bbox(lower, upper)) for tree in self.trees], limit)
+
+    def query_radius(self, center, radius, limit=None):
+        """(ids, points, distances) within radius of center, nearest first"""
+        ids, points = self._gather([(tree, tree.query_radius(center, radius)) for tree in self.trees])
+        distances = np.sqrt(np.sum((points - np.asarray(center, dtype=np.float64)) ** 2, axis=1))
+        order = np.argsort(distances, kind='stable')[:limit]
+        return ids[order], points[order], distances[order]
+
+    def query_knn(self, center, k):
+        """(ids, points, distances) of the k nearest points, nearest first"""
+        trees = self.trees  # snapshot, add() may swap the list mid-query
+        best = []
+        for tree_no, tree in enumerate(trees):
+            best = tree.query_knn(center, k, best, tree_no)
+        best.sort(key=lambda item: (-item[0], item[1], item[2]))
+        ids = np.array([trees[tree_no].ids[position] for _, tree_no, position in best], dtype=np.int64)
+        points = np.array([trees[tree_no].points[position] for _, tree_no, position in best]).reshape(-1, self.dims)
+        distances = np.sqrt([-distance_sq for distance_sq, _, _ in best])
+        return ids, points, distances
+
+    def get_stats(self):
+        """Tree sizes and total rebuild work for diagnostics"""
+        return {
+            'points': self.count,
+            'dims': self.dims,
+            'trees': [len(tree) for tree in self.trees],
+            'rebuilt_points': self.rebuilt_points
+        }
@@ -1,23 +1,30 @@
 import cv2
-import json
 from datetime import datetime
-from ultralytics import YOLO
+from inference_backend import InferenceBackend
 import numpy as np
 import screeninfo
+from detection_utils import ZoneMap, extract_detections, load_zone_config, rect_to_polygon
+from event_logging import AsyncEventWriter, EventStore
 
 # --- Configuration ---
 CONFIDENCE_THRESHOLD = 0.6 # Yolo needs a confidence of 60% to detect the confirm the object
 RED_ZONE = {"x1": 200, "y1": 150, "x2": 450, "y2": 350}
 MODEL_PATH = "yolov8n.pt" # YOLO model
 
-# Load YOLO model
-model = YOLO(MODEL_PATH)
+# Named polygon zones from red_zones.json ("yolo_camera" entry); RED_ZONE is the default
+zone_map = ZoneMap(load_zone_config("yolo_camera", [{"name": "red_zone", "polygon": rect_to_polygon(RED_ZONE)}]))
+
+# Event log lines and snapshots are written off the capture loop (and indexed in the event store)
+event_writer = AsyncEventWriter(store=EventStore())
+
+# Load YOLO model (PyTorch, ONNX Runtime or OpenVINO - see inference_backend.py) and warm it up
+model = InferenceBackend(MODEL_PATH)
+model.warmup()
 
 # Initialize camera
 cap = cv2.VideoCapture(0)
 object_in_zone = False
 alert_active = False
-cleared_printed = True  # prevents CLEARED spam
 
 # --- Camera info ---
 width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
@@ -49,94 +56,74 @@ while True:
 
     height, width = frame.shape[:2]
 
-    # Draw red zone
-    cv2.rectangle(frame,
-                  (RED_ZONE["x1"], RED_ZONE["y1"]),
-                  (RED_ZONE["x2"], RED_ZONE["y2"]),
-                  (0, 0, 255), 3)
+    # Draw zones
+    zone_map.draw(frame, thickness=3)
 
     # Run YOLO
     results = model(frame, verbose=False)
-    detections_in_zone = []
-
-    for r in results:
-        for box in r.boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            conf = float(box.conf[0])
-            cls = int(box.cls[0])
-            label = model.names[cls]
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            if conf < CONFIDENCE_THRESHOLD:
-                continue
-
-            # Object center
-            cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
-
-            # Inside red zone?
-            inside_zone = (
-                RED_ZONE["x1"] <= cx <= RED_ZONE["x2"]
-                and RED_ZONE["y1"] <= cy <= RED_ZONE["y2"]
-            )
-
-            # Yellow normally, green if inside red zone
-            color = (0, 255, 255) if not inside_zone else (0, 255, 0)
-
-            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 3)
-            cv2.putText(frame, f"{label} {conf:.2f}", (x1, y1 - 8),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-            cv2.circle(frame, (cx, cy), 4, color, -1)
-
-            if inside_zone:
-                detections_in_zone.append({
-                    "name": label,
-                    "confidence": round(conf, 2),
-                    "timestamp": timestamp,
-                    "coords": (x1, y1, x2, y2)
-                })
-
-    object_in_zone = len(detections_in_zone) > 0
-
-    # --- Red-zone entry/exit logic with coordinate and timestamp logging ---
-    if object_in_zone:
-        if not alert_active:
-            alert_active = True
-            cleared_printed = False
-            t = datetime.now()
-
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Whole frame as arrays: confidence filter, centers and zone lookup in one pass
+    detections = extract_detections(results, CONFIDENCE_THRESHOLD, timestamp)
+    centers = detections.centers
+    zone_events, membership = zone_map.evaluate(detections, model.names, frame.shape)
+    inside_zone = membership.any(axis=1)
+
+    for (x1, y1, x2, y2), (cx, cy), conf, cls, inside in zip(detections.boxes.tolist(), centers.tolist(),
+                                                            detections.confidences.tolist(),
+                                                            detections.class_ids.tolist(), inside_zone.tolist()):
+        # Yellow normally, green if inside red zone
+        color = (0, 255, 255) if not inside else (0, 255, 0)
+
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 3)
+        cv2.putText(frame, f"{model.names[cls]} {conf:.2f}", (x1, y1 - 8),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        cv2.circle(frame, (cx, cy), 4, color, -1)
+
+    # --- Per-zone entry/exit logic with coordinate and timestamp logging ---
+    for event in zone_events:
+        t = datetime.now()
+        if event["type"] == "enter":
             # Entry log with full coordinate info
             alert = {
                 "event": "Object ENTERED red zone",
+                "camera": "yolo_camera",
+                "zone": event["zone"],
                 "timestamp": t.strftime("%Y-%m-%d %H:%M:%S"),
                 "objects": [{
                     "name": d["name"],
                     "confidence": d["confidence"],
                     "coords": d["coords"]
-                } for d in detections_in_zone]
+                } for d in event["detections"].to_records(model.names)]
             }
 
-            with open("yolo_redzone_log.txt", "a") as f:
-                f.write(json.dumps(alert) + "\n")
+            event_writer.log_event(alert)
 
-            snap = f"redzone_capture_{t.strftime('%H%M%S')}.jpg"
-            cv2.imwrite(snap, frame)
-            print(f"[ALERT] Object entered red zone! Snapshot saved: {snap}")
-
-    else:
-        if alert_active:  # means object just left the zone
-            t = datetime.now()
+            if event["rules"]["snapshot"]:
+                snap = f"redzone_capture_{t.strftime('%H%M%S')}.jpg"
+                # Encode here, write in the background
+                ok, jpeg = cv2.imencode(".jpg", frame)
+                if ok:
+                    event_writer.save_snapshot(snap, jpeg.tobytes())
+                print(f"[ALERT] Object entered {event['zone']}! Snapshot saved: {snap}")
+            else:
+                print(f"[ALERT] Object entered {event['zone']}!")
 
+        else:
             # Exit log
             exit_event = {
                 "event": "Object LEFT red zone",
+                "camera": "yolo_camera",
+                "zone": event["zone"],
                 "timestamp": t.strftime("%Y-%m-%d %H:%M:%S")
             }
 
-            with open("yolo_redzone_log.txt", "a") as f:
-                f.write(json.dumps(exit_event) + "\n")
+            event_writer.log_event(exit_event)
+
+            print(f"[CLEARED] Object left {event['zone']}.")
 
-            print("[CLEARED] Object left red zone.")
-            alert_active = False
+    object_in_zone = bool(inside_zone.any())
+    alert_active = bool(zone_map.occupied_zones())
 
 
     # Overlay info
@@ -189,3 +176,4 @@ while True:
 
 cap.release()
 cv2.destroyAllWindows()
+event_writer.close()